@@ -3,59 +3,81 @@ import os
 
 from decimal import Decimal, getcontext
 from trusted_computation.input import parse_expression
-from trusted_computation.main import Main, format_sig_digits
-from trusted_computation.pi import get_pi
+from trusted_computation.main import format_sig_digits
 from trusted_computation.log_util import clear_log, get_log
+from trusted_computation.cache import get_cache_stats
+from trusted_computation.lazy import LazyReal
 from llm_helper import explain_expression
 import traceback
 
 
+def more_digits(lazy):
+    """
+    "更多位数" 命令：加深上一个表达式的精度，复用已算出的子树近似值
+    """
+    sig_digits_str = input(f"请输入新的有效数字位数 (默认 {2 * lazy.sig_digits}): ")
+    sig_digits = int(sig_digits_str.strip()) if sig_digits_str.strip() else None
+    result, ε = lazy.refine(sig_digits)
+    sig_digits = sig_digits or lazy.sig_digits
+    print(f"--- 目标精度 {sig_digits} 位，内部误差限 ε = {ε:.0e} ---")
+    print(f"最终结果 ({sig_digits}位有效数字): \n{format_sig_digits(result, sig_digits)}")
+    stats = get_cache_stats()
+    memory = lazy.memory_report()
+    print(f"子树缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次；"
+          f"{memory['entries']} 个节点共 {memory['bytes']} 字节，单节点最多 {memory['max_node_digits']} 位")
+
+
 def run_calculator():
     print("=== AI 可信计算器 (v1.2 Explainable) ===")
+    lazy = None  # 上一个表达式，供 "更多位数" 命令加深精度
 
     while True:
         print("\n" + "=" * 50)
-        user_input = input("请输入数学表达式 (q退出): ").replace("^", "**")
+        user_input = input("请输入数学表达式 (q退出，m 更多位数): ").replace("^", "**")
         if not user_input or user_input.lower() == 'q':
             break
+        if user_input.lower() == 'm':
+            if lazy is None:
+                print("还没有可以加深精度的表达式")
+                continue
+            try:
+                more_digits(lazy)
+            except Exception as e:
+                print(f"发生错误: {e}")
+                traceback.print_exc()
+            continue
 
         try:
             # 1. 获取精度设置
             sig_digits_str = input("请输入保留有效数字位数 (默认100): ")
             sig_digits = int(sig_digits_str.strip()) if sig_digits_str.strip() else 100
 
-            # 设置极高的内部计算精度，确保最后保留的有效数字是准确的
-            # ε (epsilon) 用于算法内部的误差控制
-            ε = Decimal(10) ** (-1000)
-
-            # Decimal 上下文精度要比目标有效数字大，这里设得非常大以防万一
-            getcontext().prec = sig_digits + 1000
-
-            print(f"--- 初始化: 目标精度 {sig_digits} 位，内部误差限 ε = 1E-1000 ---")
-
-            # 2. 预热/缓存常数
-            get_pi(ε)
-
-            # 3. 解析表达式
+            # 2. 解析表达式
             parsed_expr = parse_expression(user_input)
             print(f"解析结果: {parsed_expr}")
 
-            # 4. 执行计算（关键修改）
+            # 3. 执行计算（关键修改）
             # === Step 1: 清空旧日志 ===
             clear_log()
 
-            # === Step 2: 调用 Main，开启 explain 模式 ===
+            # === Step 2: 自适应精度求值，开启 explain 模式 ===
+            # 误差限 ε 和 Decimal 内部精度由所需有效数字位数和结果数量级推导，
+            # 结果过于接近舍入边界时自动提高精度重算
             # 这会自动记录 SUMMARY 级别的日志，而隐藏内部高精度逼近的 DETAIL 日志
             print("正在进行可信计算...")
-            result = Main(parsed_expr, ε, mode="explain")
+            lazy = LazyReal(parsed_expr)
+            result, ε = lazy.evaluate(sig_digits, mode="explain")
+            print(f"--- 目标精度 {sig_digits} 位，内部误差限 ε = {ε:.0e} ---")
 
-            # 5. 格式化结果
+            # 4. 格式化结果
             sig_result = format_sig_digits(result, sig_digits)
             print("-" * 30)
             print(f"计算结果 (前50位): {str(result)[:50]}...")
             print(f"最终结果 ({sig_digits}位有效数字): \n{sig_result}")
+            stats = get_cache_stats()
+            print(f"子树缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次")
 
-            # 6. 获取日志并调用 LLM
+            # 5. 获取日志并调用 LLM
             # 由于底层已经做了分级，这里直接获取的就是“摘要”
             log_steps = get_log()
 
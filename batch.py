@@ -0,0 +1,187 @@
+"""
+批量求值：从文件或标准输入读取 JSONL，每行一个请求，在进程池中并行计算
+
+输入的每一行是一个 JSON 对象:
+    {"expr": "sin(1) + e^2", "digits": 50}
+    {"id": "job-7", "expr": "ln(10)"}          # digits 省略时使用 --digits，id 原样带回
+
+输出按输入顺序逐行写出，每行一个 JSON 对象:
+    {"line": 1, "expr": "sin(1) + e^2", "digits": 50, "ok": true, "result": "...", "epsilon": "1e-61", "elapsed_ms": 3.2}
+    {"line": 2, "expr": "ln(0)", "digits": 100, "ok": false, "error": "ValueError: ...", "elapsed_ms": 0.4}
+
+同时在途的请求不超过 --window 个：输入边读边提交，结果按顺序边算边写，
+内存占用与输入的总行数无关。单个表达式出错（包括使工作进程崩溃）只影响该行的结果；
+给出 --timeout 时，每行从开始计算起最多用时该秒数，超时的行输出 EvaluationTimeout 错误。
+
+用法: python batch.py [输入文件|-] [-o 输出文件] [-j 进程数] [--digits 位数] [--window 在途数] [--warm-digits 位数] [--timeout 秒]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+from trusted_computation.worker import DEFAULT_DIGITS, WARM_DIGITS, create_pool, evaluate
+
+WINDOW_PER_WORKER = 4  # 默认每个工作进程的在途请求数
+
+
+def evaluate_within(expr, digits, timeout=None):
+    """
+    在工作进程中求值，timeout 秒后以 EvaluationTimeout 失败。截止时间在开始计算时才确定，
+    在窗口中排队的时间不计入该行的时间限制
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    return evaluate(expr, digits, deadline=deadline)
+
+
+def parse_request(line, line_no, default_digits):
+    """
+    解析一行输入，返回 (记录, 错误说明)；错误说明不为 None 时该行不计算，直接输出错误
+    """
+    record = {"line": line_no}
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return record, f"JSON 格式错误: {e}"
+    if not isinstance(request, dict) or not isinstance(request.get("expr"), str):
+        return record, "每行应为包含字符串字段 expr 的 JSON 对象"
+    if "id" in request:
+        record["id"] = request["id"]
+    record["expr"] = request["expr"]
+    record["digits"] = request.get("digits", default_digits)
+    return record, None
+
+
+class BatchRunner:
+    """
+    按输入顺序输出结果的有界窗口调度器
+
+    pending 中保存 (记录, future)，future 为字符串时表示该行的错误说明；
+    队首完成后才写出，队列长度不超过 window
+    """
+
+    def __init__(self, out, workers=None, window=None, warm_digits=WARM_DIGITS, timeout=None):
+        self.out = out
+        self.workers = workers or os.cpu_count() or 1
+        self.window = window or WINDOW_PER_WORKER * self.workers
+        self.warm_digits = warm_digits
+        self.timeout = timeout
+        self.pool = create_pool(self.workers, warm_digits)
+        self.pending = deque()
+        self.count = 0
+        self.errors = 0
+
+    def submit(self, record):
+        self._enqueue(record, self._submit(record))
+
+    def _submit(self, record):
+        return self.pool.submit(evaluate_within, record["expr"], record["digits"], self.timeout)
+
+    def fail(self, record, error):
+        """不经计算输出一条错误（格式错误的输入行），同样排在之前的请求之后"""
+        self._enqueue(record, error)
+
+    def _enqueue(self, record, future):
+        self.pending.append((record, future))
+        while len(self.pending) >= self.window:
+            self._drain_one()
+
+    def _drain_one(self):
+        record, future = self.pending.popleft()
+        if isinstance(future, str):
+            self._write(record, {"ok": False, "error": future})
+            return
+        try:
+            response = future.result()
+        except BrokenProcessPool:
+            # 某个工作进程异常退出（如内存耗尽被系统终止），池内所有在途请求都已失败：
+            # 重建进程池，把这些请求逐个重新计算，找出导致崩溃的那一个
+            self.pending.appendleft((record, future))
+            self._isolate()
+            return
+        self._write(record, response)
+
+    def _isolate(self):
+        self._restart_pool()
+        retry = list(self.pending)
+        self.pending.clear()
+        for record, future in retry:
+            if isinstance(future, str):
+                self._write(record, {"ok": False, "error": future})
+                continue
+            try:
+                response = self._submit(record).result()
+            except BrokenProcessPool:
+                response = {"ok": False, "error": "工作进程异常退出"}
+                self._restart_pool()
+            self._write(record, response)
+
+    def _restart_pool(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = create_pool(self.workers, self.warm_digits)
+
+    def _write(self, record, response):
+        self.count += 1
+        if not response["ok"]:
+            self.errors += 1
+        self.out.write(json.dumps({**record, **response}, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def close(self):
+        while self.pending:
+            self._drain_one()
+        self.pool.shutdown()
+
+
+def run_batch(lines, out, workers=None, window=None, default_digits=DEFAULT_DIGITS, warm_digits=WARM_DIGITS,
+              timeout=None):
+    """
+    对 lines（可迭代的输入行）批量求值，结果按顺序写入 out，返回 (总条数, 出错条数)；
+    timeout 为每行的时间限制（秒），None 表示不限
+    """
+    runner = BatchRunner(out, workers, window, warm_digits, timeout)
+    try:
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            record, error = parse_request(line, line_no, default_digits)
+            if error is None:
+                runner.submit(record)
+            else:
+                runner.fail(record, error)
+    finally:
+        runner.close()
+    return runner.count, runner.errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量求值 JSONL 文件中的表达式")
+    parser.add_argument("input", nargs="?", default="-", help="输入文件，- 表示标准输入（默认）")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，- 表示标准输出（默认）")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="工作进程数（默认 CPU 核数）")
+    parser.add_argument("--digits", type=int, default=DEFAULT_DIGITS, help="请求未给出 digits 时的有效数字位数")
+    parser.add_argument("--window", type=int, default=None, help=f"最多同时在途的请求数（默认 {WINDOW_PER_WORKER}×进程数）")
+    parser.add_argument("--warm-digits", type=int, default=WARM_DIGITS, help="工作进程启动时预热的常数位数，0 表示不预热")
+    parser.add_argument("--timeout", type=float, default=None, help="每行的时间限制（秒），默认不限")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        count, errors = run_batch(source, out, args.workers, args.window, args.digits, args.warm_digits,
+                                  args.timeout)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    print(f"共 {count} 条，出错 {errors} 条，耗时 {elapsed:.2f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
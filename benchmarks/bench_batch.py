@@ -0,0 +1,54 @@
+"""
+基准测试：批量求值的吞吐量
+
+同一批表达式（默认 200 条、每条 300 位）分别：
+1. 在当前进程中逐条调用 worker.evaluate（顺序求值）
+2. 用 batch.run_batch 在 1、2、4……个预热的工作进程中求值（含进程启动与预热时间）
+
+用法: python benchmarks/bench_batch.py [条数] [位数]
+"""
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from batch import run_batch
+from trusted_computation.worker import evaluate
+
+TEMPLATES = ["sin({k})*e^({k}/7)", "ln({k}+1)/arctan({k}+0.5)", "sqrt({k}+2)+cosh({k}/10)", "tan({k}/3+0.1)-pi/{k1}"]
+
+
+def make_requests(count, digits):
+    return [json.dumps({"expr": TEMPLATES[k % len(TEMPLATES)].format(k=k, k1=k + 1), "digits": digits})
+            for k in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    digits = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    lines = make_requests(count, digits)
+
+    print(f"{count} 条表达式，每条 {digits} 位")
+    print(f"{'方式':<16}{'耗时(s)':>10}{'条/秒':>10}")
+
+    start = time.perf_counter()
+    for line in lines:
+        request = json.loads(line)
+        evaluate(request["expr"], request["digits"])
+    sequential = time.perf_counter() - start
+    print(f"{'顺序求值':<16}{sequential:>10.2f}{count / sequential:>10.1f}")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        run_batch(lines, io.StringIO(), workers=workers, warm_digits=digits)
+        elapsed = time.perf_counter() - start
+        print(f"{f'进程池 ×{workers}':<16}{elapsed:>10.2f}{count / elapsed:>10.1f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
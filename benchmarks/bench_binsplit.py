@@ -0,0 +1,52 @@
+"""
+基准测试：二分拆分计算常数 π（Chudnovsky）、e 和 ln2 的速度曲线
+
+在 1k、10k、100k、1M 位下分别计算各常数（不经过常数缓存），
+记录耗时与每秒位数（digits/s）。1M 位耗时较长，可用参数限制最大位数。
+
+用法: python benchmarks/bench_binsplit.py [最大位数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, localcontext, MAX_EMAX, MIN_EMIN
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.constants import _compute_e, _compute_ln2
+from trusted_computation.pi import _compute_pi
+from trusted_computation.precision import working_precision
+
+DIGITS = [1000, 10000, 100000, 1000000]
+CONSTANTS = [
+    ("π (Chudnovsky)", _compute_pi),
+    ("e", _compute_e),
+    ("ln2 (Machin 型)", _compute_ln2),
+]
+
+
+def time_constant(compute, digits):
+    """返回在 10^-digits 误差限下计算一次常数的耗时（秒）"""
+    epsilon = Decimal(10) ** (-digits)
+    with localcontext() as ctx:
+        ctx.prec = working_precision(0, epsilon)
+        ctx.Emax, ctx.Emin = MAX_EMAX, MIN_EMIN
+        start = time.perf_counter()
+        compute(epsilon)
+        return time.perf_counter() - start
+
+
+def main():
+    max_digits = int(sys.argv[1]) if len(sys.argv) > 1 else DIGITS[-1]
+
+    print(f"{'常数':<22}{'位数':>10}{'耗时 (s)':>12}{'位数/秒':>14}")
+    for name, compute in CONSTANTS:
+        for digits in DIGITS:
+            if digits > max_digits:
+                break
+            elapsed = time_constant(compute, digits)
+            print(f"{name:<22}{digits:>10}{elapsed:>12.3f}{digits / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+基准测试：常数的磁盘存储对进程启动开销的影响
+
+在全新的子进程中首次请求 π（模拟工作进程重启），比较
+  冷启动 —— 数字文件不存在，需要计算并写入
+  热启动 —— 数字文件已存在，内存映射后只读取所需前缀
+两种情况下的耗时。数字文件写在临时目录中，不影响默认的缓存目录。
+
+用法: python benchmarks/bench_constant_store.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+DIGITS = [1000, 10000, 100000]
+
+CHILD = """
+import sys, time
+from decimal import Decimal, getcontext
+sys.path.insert(0, {root!r})
+from trusted_computation.pi import get_pi
+digits = {digits}
+getcontext().prec = digits + 20
+start = time.perf_counter()
+get_pi(Decimal(10) ** (-digits))
+print(time.perf_counter() - start)
+"""
+
+
+def time_child(digits, store_dir):
+    """在子进程中首次请求 digits 位的 π，返回耗时（秒）"""
+    env = dict(os.environ, TRUSTED_COMPUTATION_CONSTANT_DIR=store_dir)
+    output = subprocess.run([sys.executable, "-c", CHILD.format(root=ROOT, digits=digits)],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return float(output)
+
+
+def main():
+    print(f"{'位数':>8}{'冷启动 (ms)':>14}{'热启动 (ms)':>14}{'加速比':>10}")
+    for digits in DIGITS:
+        with tempfile.TemporaryDirectory() as store_dir:
+            cold = time_child(digits, store_dir)
+            warm = time_child(digits, store_dir)
+        print(f"{digits:>8}{cold * 1000:>14.2f}{warm * 1000:>14.2f}{cold / warm:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
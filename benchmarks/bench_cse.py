@@ -0,0 +1,55 @@
+"""
+基准测试：公共子表达式共享（哈希共享 DAG）对含重复子树的表达式的加速
+
+tan、sec、sinh、cosh 等改写规则会复制参数，用户表达式（如 sin(x)^2 + cos(x)^2）
+本身也会重复出现同一个子树。分别在关闭和开启节点共享时计时，并给出加速比。
+
+用法: python benchmarks/bench_cse.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.dag import set_sharing
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.pi import get_pi
+
+DIGITS = [1000, 5000]
+EXPRESSIONS = [
+    "sin(e^5+ln(7)*arctan(3))^2+cos(e^5+ln(7)*arctan(3))^2",
+    "tan(e^3+ln(7))+sec(e^3+ln(7))",
+    "sinh(sqrt(7)+ln(3))*cosh(sqrt(7)+ln(3))",
+    "sin(123456789.123+e^7)^2+cos(123456789.123+e^7)^2",
+]
+
+
+def time_expr(expression, digits, sharing, repeat):
+    """返回 repeat 次求值的平均耗时（秒）；每次重新解析，使改写规则按当前设置构造子树"""
+    set_sharing(sharing)
+    getcontext().prec = digits + 30
+    epsilon = Decimal(10) ** (-digits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Main(parse_expression(expression), epsilon)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    get_pi(Decimal(10) ** (-max(DIGITS) - 20))  # 预先缓存 π，不计入耗时
+
+    print(f"{'表达式':<56}{'位数':>6}{'不共享 (ms)':>14}{'共享 (ms)':>12}{'加速比':>8}")
+    for expression in EXPRESSIONS:
+        for digits in DIGITS:
+            plain = time_expr(expression, digits, False, repeat)
+            shared = time_expr(expression, digits, True, repeat)
+            print(f"{expression:<56}{digits:>6}{plain * 1000:>14.2f}{shared * 1000:>12.2f}{plain / shared:>8.2f}x")
+    set_sharing(True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+基准测试：ε 反向分配引擎（backprop）、球算术引擎（ball）与静态计划引擎（plan）的耗时对比
+
+使用 tests/corpus.py 中与引擎一致性测试相同的语料，
+在 BENCH_DIGITS 给出的有效数字位数下分别计时，并给出各引擎相对 backprop 的加速比。
+plan 引擎的计划按 (表达式, ε) 缓存，重复计时中只有第一次包含编译计划的开销。
+
+用法: python benchmarks/bench_engines.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from corpus import CORPUS, BENCH_DIGITS
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main, ENGINES
+from trusted_computation.pi import get_pi
+
+
+def time_expr(expr, digits, engine, repeat):
+    """返回 repeat 次 Main(expr, 10^-digits) 的平均耗时（秒）"""
+    getcontext().prec = digits + 30
+    epsilon = Decimal(10) ** (-digits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Main(expr, epsilon, engine=engine)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    get_pi(Decimal(10) ** (-max(BENCH_DIGITS) - 20))  # 预先缓存 π，不计入耗时
+
+    totals = dict.fromkeys(ENGINES, 0.0)
+    header = "".join(f"{engine + ' (ms)':>16}" for engine in ENGINES)
+    print(f"{'表达式':<26}{'位数':>6}{header}")
+    for expression, _ in CORPUS:
+        expr = parse_expression(expression)
+        for digits in BENCH_DIGITS:
+            row = ""
+            for engine in ENGINES:
+                elapsed = time_expr(expr, digits, engine, repeat)
+                totals[engine] += elapsed
+                row += f"{elapsed * 1000:>16.2f}"
+            print(f"{expression:<26}{digits:>6}{row}")
+    row = "".join(f"{totals[engine] * 1000:>16.2f}" for engine in ENGINES)
+    print(f"{'合计':<26}{'':>6}{row}")
+    ratios = "，".join(f"{engine} {totals['backprop'] / totals[engine]:.1f}x" for engine in ENGINES[1:])
+    print(f"相对 backprop 的加速比：{ratios}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+基准测试：双曲函数内核
+
+原来 sinh(x)、cosh(x) 按 (e^x ∓ e^(-x))/2 展开为表达式求值：两个指数函数各自展开，
+外层的加减与除以 2 各走一次 Main。现在 e^|x| 只计算一次，|x| 较小时改为直接展开 sinh 的级数。
+这里把同一个函数分别写成展开式和内核调用，比较两者的耗时。
+
+用法: python benchmarks/bench_hyperbolic.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.input import parse_expression
+from trusted_computation import hyperbolic
+from trusted_computation.main import Main
+
+DIGITS = [50, 1000, 2000]
+# (内核写法, 原来的展开式)
+CASES = [
+    ("sinh(1.3)", "(e^(1.3)-e^(-1.3))/2"),
+    ("cosh(0.2)", "(e^(0.2)+e^(-0.2))/2"),
+    ("cosh(sqrt(2)/3)", "(e^(sqrt(2)/3)+e^(-(sqrt(2)/3)))/2"),
+    ("sinh(e)+cosh(e)", "(e^e-e^(-e))/2+(e^e+e^(-e))/2"),
+    ("tanh(2)", "(e^2-e^(-2))/(e^2+e^(-2))"),
+]
+
+
+def best_time(expr, digits, repeat):
+    """返回 repeat 次求值中最短的耗时（秒）"""
+    getcontext().prec = digits + 30
+    epsilon = Decimal(10) ** (-digits)
+    best = float("inf")
+    for _ in range(repeat):
+        hyperbolic._last_sinhcosh = None  # 不让重复计时命中上一次的 sinh/cosh 结果
+        start = time.perf_counter()
+        Main(expr, epsilon)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"{'表达式':<20}{'位数':>6}{'展开式 (ms)':>14}{'内核 (ms)':>12}{'加速比':>10}")
+    for kernel, expanded in CASES:
+        kernel_expr = parse_expression(kernel)
+        expanded_expr = parse_expression(expanded)
+        for digits in DIGITS:
+            old = best_time(expanded_expr, digits, repeat)
+            new = best_time(kernel_expr, digits, repeat)
+            print(f"{kernel:<20}{digits:>6}{old * 1000:>14.2f}{new * 1000:>12.2f}{old / new:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+基准测试：计算日志的开销
+
+日志记录为 TraceEvent（模板 + 参数），参数只在读取日志时格式化。
+1. 单次 add_log 的开销：日志关闭、记录但不读取、记录并渲染
+2. 深层乘法链在 compute 模式（日志关闭）下的求值耗时；
+   原来每个 mul/div 节点都对整个子树和上千位的操作数做 str()，耗时随树的大小平方增长
+
+用法: python benchmarks/bench_logging.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import add_log, clear_log, get_log, set_log_level
+from trusted_computation.main import Main
+
+CALLS = 100000
+CHAINS = [(100, 50), (300, 50), (100, 3000)]  # (因子个数, 位数)
+
+
+def time_add_log(level, render):
+    """返回每次 add_log（及渲染）的平均耗时（微秒）"""
+    getcontext().prec = 1000
+    value = Decimal(2).sqrt()
+    set_log_level(level)
+    clear_log()
+    start = time.perf_counter()
+    for k in range(CALLS):
+        add_log("Step {}: 近似值 ≈ {}", k, value, level="SUMMARY")
+    if render:
+        get_log()
+    elapsed = time.perf_counter() - start
+    clear_log()
+    return elapsed / CALLS * 1e6
+
+
+def time_chain(factors, digits, repeat):
+    """返回 compute 模式下求值乘法链的最短耗时（毫秒）"""
+    getcontext().prec = digits + 30
+    expr = parse_expression("*".join(f"(sqrt({k})+e)" for k in range(1, factors)))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Main(expr, Decimal(10) ** (-digits))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sys.setrecursionlimit(10000)
+
+    print(f"{'add_log':<24}{'每次 (µs)':>12}")
+    for name, level, render in [("日志关闭", "NONE", False), ("记录，不读取", "SUMMARY", False),
+                                ("记录并渲染", "SUMMARY", True)]:
+        print(f"{name:<24}{time_add_log(level, render):>12.3f}")
+
+    print()
+    print(f"{'乘法链':<24}{'位数':>6}{'耗时 (ms)':>12}")
+    for factors, digits in CHAINS:
+        print(f"{f'{factors - 1} 个因子':<24}{digits:>6}{time_chain(factors, digits, repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+基准测试：独立子树的并行求值
+
+每个表达式分别顺序求值和开启 parallel.set_parallel(n) 后求值，n = 1, 2, 4, ……（不超过 CPU 核数或给定的最大进程数），
+比较耗时并检查结果一致。set_parallel 返回时工作进程已经启动并预热，计时不含进程启动。
+
+用法: python benchmarks/bench_parallel.py [位数] [最大进程数]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation import parallel
+from trusted_computation.input import parse_expression
+from trusted_computation.main import adaptive_main, format_sig_digits
+
+EXPRESSIONS = [
+    "+".join(f"sin({k})*e^({k}/7)" for k in range(1, 17)),
+    "(ln(3)+arctan(0.7))/(sin(2)-cos(3))*(e^(1/3)-ln(7))",
+    "+".join(f"arctan({k}/3)" for k in range(1, 9)) + "-" + "*".join(f"ln({k})" for k in range(2, 6)),
+]
+
+
+def timed(expression, digits):
+    start = time.perf_counter()
+    result, _ = adaptive_main(parse_expression(expression), digits)
+    return time.perf_counter() - start, format_sig_digits(result, digits)
+
+
+def main():
+    digits = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    counts = []
+    n = 1
+    while n <= max_workers:
+        counts.append(n)
+        n *= 2
+
+    print(f"{digits} 位，CPU 核数 {os.cpu_count()}")
+    print(f"{'表达式':<40}{'顺序(s)':>10}" + "".join(f"{f'×{n}(s)':>10}" for n in counts))
+    for expression in EXPRESSIONS:
+        parallel.set_parallel(0)
+        sequential, expected = timed(expression, digits)
+        row = f"{expression[:38]:<40}{sequential:>10.2f}"
+        for n in counts:
+            parallel.set_parallel(n, warm_digits=digits + 50)
+            elapsed, result = timed(expression, digits)
+            assert result == expected, "并行求值的结果与顺序求值不一致"
+            row += f"{elapsed:>10.2f}"
+        print(row)
+    parallel.set_parallel(0)
+
+
+if __name__ == "__main__":
+    main()
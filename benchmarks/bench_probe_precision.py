@@ -0,0 +1,56 @@
+"""
+基准测试：按调用缩放工作精度前后，粗略估计 (ε = 0.1) 的耗时对比
+
+全局精度设为约 1100 位（与原先 app.py 的设置一致），分别在关闭/开启
+precision.set_call_precision 时计算 Main(expr, 0.1)，即 mul / div / Exp / ln
+中的粗略探测调用。
+
+用法: python benchmarks/bench_probe_precision.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.pi import get_pi
+from trusted_computation.precision import set_call_precision
+
+PROBE_EXPRESSIONS = [
+    "sin(1) * e^2",
+    "e^(sin(2) * 3)",
+    "ln(3) / arctan(0.5)",
+    "sinh(2) - cosh(2)",
+    "((1.5 * 2.5) * 3.5) * sin(4)",
+    "tan(1) + cot(2)",
+]
+
+
+def time_probe(expr, repeat):
+    """返回 repeat 次 Main(expr, 0.1) 的平均耗时（秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Main(expr, Decimal('0.1'))
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    getcontext().prec = 1100
+    get_pi(Decimal('1E-1000'))  # 预先缓存 π，不计入探测耗时
+
+    print(f"{'表达式':<32}{'全局精度 (ms)':>16}{'按调用缩放 (ms)':>18}{'加速比':>10}")
+    for text in PROBE_EXPRESSIONS:
+        expr = parse_expression(text)
+        set_call_precision(False)
+        before = time_probe(expr, repeat)
+        set_call_precision(True)
+        after = time_probe(expr, repeat)
+        print(f"{text:<32}{before * 1000:>16.2f}{after * 1000:>18.2f}{before / after:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
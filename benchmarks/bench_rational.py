@@ -0,0 +1,54 @@
+"""
+基准测试：精确有理数折叠对纯算术表达式的加速
+
+长的四则运算链和大的字面分数是常见输入。分别在关闭和开启有理数折叠时计时：
+关闭时每个 * 和 / 都走 mul/div 的多步 ε 分配协议，开启时整棵子树折叠为一个常数，只舍入一次。
+
+用法: python benchmarks/bench_rational.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.rational import set_rational_folding
+
+DIGITS = [50, 1000]
+EXPRESSIONS = [
+    ("40 项有理数链", "+".join(f"{k}/{k + 1}*{k + 2}/{k + 3}" for k in range(1, 41))),
+    ("大字面分数", "123456789012345678901234567890/987654321098765432109876543210*(1/7-2/13)"),
+    ("小数乘积与整数次幂", "((1.5*2.5)*3.5)^7/(0.125-1/3)"),
+    ("有理部分 + sin", "(1/3+2/7)*(5/11-1/13)*sin(1)"),
+]
+
+
+def time_expr(expr, digits, folding, repeat):
+    """返回 repeat 次求值的平均耗时（秒）"""
+    set_rational_folding(folding)
+    getcontext().prec = digits + 30
+    epsilon = Decimal(10) ** (-digits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Main(expr, epsilon)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print(f"{'表达式':<20}{'位数':>6}{'不折叠 (ms)':>14}{'折叠 (ms)':>12}{'加速比':>10}")
+    for name, expression in EXPRESSIONS:
+        expr = parse_expression(expression)
+        for digits in DIGITS:
+            plain = time_expr(expr, digits, False, repeat)
+            folded = time_expr(expr, digits, True, repeat)
+            print(f"{name:<20}{digits:>6}{plain * 1000:>14.2f}{folded * 1000:>12.3f}{plain / folded:>10.1f}x")
+    set_rational_folding(True)
+
+
+if __name__ == "__main__":
+    main()
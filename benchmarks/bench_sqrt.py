@@ -0,0 +1,52 @@
+"""
+基准测试：原生 sqrt / root 节点与 exp(ln(x)/n) 路线的耗时对比
+
+分别在 100 位与 1000 位有效数字下计算
+  sqrt(2)          —— ('sqrt', 2)
+  2^(1/2)          —— ('exp', 2, ('/', 1, 2))，即 Exp2 → exp(0.5·ln 2)
+以及对应的三次方根。
+
+用法: python benchmarks/bench_sqrt.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.main import Main
+from trusted_computation.pi import get_pi
+
+DIGITS = [100, 1000]
+CASES = [
+    ("sqrt(2)", ('sqrt', 2), ('exp', 2, ('/', 1, 2))),
+    ("sqrt(1 + sin(1))", ('sqrt', ('+', 1, ('sin', 1))), ('exp', ('+', 1, ('sin', 1)), ('/', 1, 2))),
+    ("root(7, 3)", ('root', 7, 3), ('exp', 7, ('/', 1, 3))),
+]
+
+
+def time_expr(expr, digits, repeat):
+    """返回 repeat 次 Main(expr, 10^-digits) 的平均耗时（秒）"""
+    getcontext().prec = digits + 20
+    epsilon = Decimal(10) ** (-digits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        Main(expr, epsilon)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    get_pi(Decimal('1E-1000'))  # 预先缓存 π（sin 的区间归一化会用到），不计入耗时
+
+    print(f"{'表达式':<22}{'位数':>6}{'原生节点 (ms)':>16}{'exp/ln (ms)':>14}{'加速比':>10}")
+    for name, native, via_exp in CASES:
+        for digits in DIGITS:
+            fast = time_expr(native, digits, repeat)
+            slow = time_expr(via_exp, digits, repeat)
+            print(f"{name:<22}{digits:>6}{fast * 1000:>16.2f}{slow * 1000:>14.2f}{slow / fast:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
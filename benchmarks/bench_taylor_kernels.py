@@ -0,0 +1,53 @@
+"""
+基准测试：泰勒展开内核 sin1 / Exp1 / arctan1 / ln1 在不同精度下的耗时
+
+每个内核在 50 / 500 / 5000 位有效数字下分别计时，
+Decimal 精度设为 位数 + 20，误差限 ε = 10^-位数。
+
+用法: python benchmarks/bench_taylor_kernels.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.sin import sin1
+from trusted_computation.Exp import Exp1
+from trusted_computation.arctan import arctan1
+from trusted_computation.ln import ln1
+from trusted_computation.pi import get_pi
+
+DIGITS = [50, 500, 5000]
+KERNELS = [
+    ("sin1(0.5)", sin1, Decimal('0.5')),
+    ("Exp1(2.5)", Exp1, Decimal('2.5')),
+    ("arctan1(0.5)", arctan1, Decimal('0.5')),
+    ("ln1(1.5)", ln1, Decimal('1.5')),
+]
+
+
+def time_kernel(kernel, arg, digits, repeat):
+    """返回 repeat 次 kernel(arg, 10^-digits) 的平均耗时（秒）"""
+    getcontext().prec = digits + 20
+    epsilon = Decimal(10) ** (-digits)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        kernel(arg, epsilon)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    getcontext().prec = 1100
+    get_pi(Decimal('1E-1000'))  # 预先缓存 π，不计入内核耗时
+
+    print(f"{'内核':<16}" + "".join(f"{str(d) + ' 位 (ms)':>16}" for d in DIGITS))
+    for name, kernel, arg in KERNELS:
+        timings = [time_kernel(kernel, arg, digits, repeat) for digits in DIGITS]
+        print(f"{name:<16}" + "".join(f"{t * 1000:>16.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
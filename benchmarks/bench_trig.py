@@ -0,0 +1,70 @@
+"""
+基准测试：sin 与 cos 的融合内核 sincos1
+
+原来 cos(x) 按 sin(π/2 - x) 计算，tan、cot 对参数求值三次、归约两次，再经过 div 的逐步收紧。
+现在 sincos1 只做一次归约，把参数缩小 2^j 倍后展开一次，用倍角公式同时得到 sin 与 cos。
+先比较内核（两次 sin1 与一次 sincos1），再给出三角函数表达式的端到端耗时。
+
+用法: python benchmarks/bench_trig.py [重复次数]
+"""
+import os
+import sys
+import time
+from decimal import Decimal, getcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.pi import get_pi
+from trusted_computation.sin import sin1, sincos1
+
+DIGITS = [50, 300, 1000, 2000]
+KERNEL_ARGUMENT = Decimal("1.234")
+EXPRESSIONS = [
+    "cos(1.234)",
+    "tan(2.5)+cot(0.7)",
+    "sec(1)*csc(1)",
+    "tan(e^3+ln(7))+sec(e^3+ln(7))",
+    "cos(123456.789)",
+]
+
+
+def best_time(fn, repeat):
+    """返回 repeat 次调用中最短的耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    get_pi(Decimal(10) ** -(max(DIGITS) + 100))  # π 预先算好，不计入耗时
+
+    print(f"{'内核':<24}{'位数':>6}{'2 × sin1 (ms)':>16}{'sincos1 (ms)':>16}{'加速比':>10}")
+    for digits in DIGITS:
+        getcontext().prec = digits + 30
+        epsilon = Decimal(10) ** (-digits)
+        x = KERNEL_ARGUMENT
+        separate = best_time(lambda: (sin1(x, epsilon), sin1(get_pi(epsilon) / 2 - x, epsilon)), repeat)
+        fused = best_time(lambda: sincos1(x, epsilon), repeat)
+        print(f"{'sin, cos of ' + str(x):<24}{digits:>6}{separate * 1000:>16.2f}{fused * 1000:>16.2f}"
+              f"{separate / fused:>10.1f}x")
+
+    print()
+    print(f"{'表达式':<32}" + "".join(f"{d:>10}" for d in DIGITS) + "   (ms)")
+    for expression in EXPRESSIONS:
+        expr = parse_expression(expression)
+        row = []
+        for digits in DIGITS:
+            getcontext().prec = digits + 30
+            epsilon = Decimal(10) ** (-digits)
+            row.append(best_time(lambda: Main(expr, epsilon), repeat))
+        print(f"{expression:<32}" + "".join(f"{t * 1000:>10.2f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+本地 HTTP/JSON 计算服务：在预热的工作进程池中求值，带排队上限、时间限制与取消
+
+接口（请求与响应都是 UTF-8 JSON）:
+    POST   /calculate           {"expr": "sin(1)", "digits": 50, "explain": false, "timeout": 10, "id": "可选"}
+                                200 {"id", "ok": true, "result", "epsilon", "elapsed_ms"[, "log", "explanation"]}
+                                422 表达式无法计算，504 超出时间限制，409 已被取消，500 工作进程异常退出，
+                                503 服务繁忙或进程池正在重启
+    GET    /explanations/<id>   explain 为真时的自然语言解释：202 尚在生成，200 {"explanation": ...}
+    DELETE /jobs/<id>           取消正在计算的请求或尚未生成的解释
+    GET    /health              工作进程数、在途请求数与容量
+
+计算结果一算出就返回；解释由语言模型在后台另行生成（较慢），客户端随后按 explanation 给出的地址获取。
+同时在途的计算不超过 capacity 个，超出时立即返回 503 而不是排队等待。
+每个请求的时间限制与取消都传递给工作进程，在 Main 的每次调用处协作式地检查（见 context.py）。
+
+用法: python server.py [--host 地址] [--port 端口] [-j 进程数] [--capacity 在途上限] [--timeout 秒] [--warm-digits 位数] [--quiet]
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from trusted_computation.worker import DEFAULT_DIGITS, WARM_DIGITS, create_pool, evaluate
+
+DEFAULT_TIMEOUT = 30  # 请求未给出 timeout 时的时间限制（秒）
+MAX_TIMEOUT = 300  # 请求可以申请的最长时间限制（秒）
+MAX_DIGITS = 100000  # 单个请求的最大有效数字位数
+MAX_BODY = 1 << 20  # 请求体的最大字节数
+KEEP_EXPLANATIONS = 1000  # 保留的解释数，超出时丢弃最早的
+TIMEOUT_GRACE = 1  # 工作进程在截止时间后仍未返回时，再等待的秒数
+
+# 工作进程返回的错误类型对应的 HTTP 状态码，其余错误为 422
+_ERROR_STATUS = {"EvaluationTimeout": 504, "EvaluationCancelled": 409}
+
+
+def default_explainer(expr, result, log_steps):
+    """
+    默认的解释器：调用语言模型生成自然语言解释。llm_helper 在导入时加载模型，
+    因此只在第一次需要解释时才导入
+    """
+    from llm_helper import explain_expression
+    return explain_expression(expr, result, log_steps)
+
+
+class RequestError(Exception):
+    """请求本身不合法（返回 400）"""
+
+
+class _Job:
+    """一个在途的计算请求"""
+    __slots__ = ("slot", "pool", "future", "wake", "cancelled")
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.pool = None  # 提交到的进程池：只有它仍是当前的进程池时，它的异常才需要重启
+        self.future = None
+        self.wake = threading.Event()  # 计算完成或被取消时置位
+        self.cancelled = False
+
+
+class CalculationService:
+    """
+    计算服务本身（与 HTTP 无关）：进程池、在途请求、取消标志与解释
+
+    每个在途请求占用一个槽位（0 ~ capacity-1），槽位同时是共享取消标志数组的下标；
+    槽位在工作进程真正结束该请求后才归还，因此被取消或超时的请求在停止之前仍计入容量
+    """
+
+    def __init__(self, workers=None, capacity=None, default_timeout=DEFAULT_TIMEOUT, max_timeout=MAX_TIMEOUT,
+                 warm_digits=WARM_DIGITS, explainer=default_explainer, keep_explanations=KEEP_EXPLANATIONS):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.capacity = capacity or 2 * self.workers
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.warm_digits = warm_digits
+        self.explainer = explainer
+        self.keep_explanations = keep_explanations
+
+        self._cancel_flags = multiprocessing.Array("b", self.capacity, lock=False)
+        self._free_slots = queue.SimpleQueue()
+        for slot in range(self.capacity):
+            self._free_slots.put(slot)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._explanations = OrderedDict()
+        self._explain_pool = ThreadPoolExecutor(max_workers=1)  # 语言模型一次只生成一个解释
+        self.pool = create_pool(self.workers, warm_digits, self._cancel_flags)
+
+    # === 计算 ===
+
+    def _parse(self, request):
+        if not isinstance(request, dict) or not isinstance(request.get("expr"), str):
+            raise RequestError("请求应为包含字符串字段 expr 的 JSON 对象")
+        digits = request.get("digits", DEFAULT_DIGITS)
+        if not isinstance(digits, int) or not 0 < digits <= MAX_DIGITS:
+            raise RequestError(f"digits 应为 1 ~ {MAX_DIGITS} 之间的整数")
+        timeout = request.get("timeout", self.default_timeout)
+        if not isinstance(timeout, (int, float)) or not 0 < timeout <= self.max_timeout:
+            raise RequestError(f"timeout 应为 (0, {self.max_timeout}] 秒")
+        job_id = str(request.get("id") or uuid.uuid4().hex)
+        return request["expr"], digits, bool(request.get("explain", False)), timeout, job_id
+
+    def calculate(self, request):
+        """
+        处理一个计算请求，返回 (HTTP 状态码, 响应字典)；计算完成（或超时、被取消）后才返回
+        """
+        try:
+            expr, digits, explain, timeout, job_id = self._parse(request)
+        except RequestError as e:
+            return 400, {"ok": False, "error": str(e)}
+
+        try:
+            slot = self._free_slots.get_nowait()
+        except queue.Empty:
+            return 503, {"ok": False, "error": "服务繁忙，请稍后重试"}
+        job = _Job(slot)
+        with self._lock:
+            if job_id in self._jobs:
+                self._free_slots.put(slot)
+                return 400, {"ok": False, "error": f"id {job_id} 正在计算中"}
+            self._jobs[job_id] = job
+
+        self._cancel_flags[slot] = 0
+        deadline = time.monotonic() + timeout
+        job.pool = self.pool
+        try:
+            job.future = job.pool.submit(evaluate, expr, digits, explain, deadline, slot)
+        except (BrokenProcessPool, RuntimeError):  # RuntimeError: 读取之后该池已被其他请求替换并关闭
+            self._finish(job_id, job)
+            self._restart_pool(job.pool)
+            return 503, {"id": job_id, "ok": False, "error": "工作进程池正在重启，请稍后重试"}
+        job.future.add_done_callback(lambda _: self._finish(job_id, job))
+
+        finished = job.wake.wait(timeout + TIMEOUT_GRACE)
+        if job.cancelled:
+            return 409, {"id": job_id, "ok": False, "error": "计算已取消"}
+        if not finished:
+            # 单个算子内部的长循环不检查截止时间：通知工作进程尽快停止，不再等待
+            self._interrupt(job)
+            return 504, {"id": job_id, "ok": False, "error": "计算超出时间限制"}
+        try:
+            response = job.future.result()
+        except BrokenProcessPool:
+            self._restart_pool(job.pool)
+            return 500, {"id": job_id, "ok": False, "error": "工作进程异常退出"}
+        except CancelledError:
+            # 进程池在计算开始前被关闭（例如另一个请求发现它已损坏）
+            return 503, {"id": job_id, "ok": False, "error": "工作进程池正在重启，请稍后重试"}
+
+        response = {"id": job_id, **response}
+        if not response["ok"]:
+            return _ERROR_STATUS.get(response.pop("error_type"), 422), response
+        if explain:
+            self._explain(job_id, expr, response["result"], response.get("log", []))
+            response["explanation"] = f"/explanations/{job_id}"
+        return 200, response
+
+    def _finish(self, job_id, job):
+        """请求在工作进程中结束（或未开始就被取消）：归还槽位并唤醒等待的请求"""
+        with self._lock:
+            if self._jobs.get(job_id) is job:
+                del self._jobs[job_id]
+        self._free_slots.put(job.slot)
+        job.wake.set()
+
+    def _interrupt(self, job):
+        self._cancel_flags[job.slot] = 1
+        job.future.cancel()  # 尚未开始计算时直接从队列中移除
+
+    def _restart_pool(self, broken):
+        """
+        替换损坏的进程池 broken。同一个池损坏时它的所有在途请求都会来重启，
+        只有第一个真正替换；其余请求看到池已换新，不能再关闭新池（那会取消新池中的请求）
+        """
+        with self._lock:
+            if self.pool is not broken:
+                return
+            self.pool = create_pool(self.workers, self.warm_digits, self._cancel_flags)
+        broken.shutdown(wait=False, cancel_futures=True)  # 取消的请求的回调会获取 _lock，因此在锁外关闭
+
+    # === 取消 ===
+
+    def cancel(self, job_id):
+        """
+        取消正在计算的请求或尚未完成的解释，返回 (HTTP 状态码, 响应字典)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            explanation = self._explanations.get(job_id)
+        if job is not None and job.future is not None:
+            job.cancelled = True
+            self._interrupt(job)
+            job.wake.set()
+            return 200, {"id": job_id, "cancelled": "calculation"}
+        if explanation is not None and explanation.cancel():
+            return 200, {"id": job_id, "cancelled": "explanation"}
+        return 404, {"id": job_id, "error": "没有正在进行的计算或解释"}
+
+    # === 解释 ===
+
+    def _explain(self, job_id, expr, result, log_steps):
+        future = self._explain_pool.submit(self.explainer, expr, result, log_steps)
+        with self._lock:
+            self._explanations[job_id] = future
+            self._explanations.move_to_end(job_id)
+            while len(self._explanations) > self.keep_explanations:
+                _, dropped = self._explanations.popitem(last=False)
+                dropped.cancel()
+
+    def explanation(self, job_id):
+        """
+        查询解释，返回 (HTTP 状态码, 响应字典)
+        """
+        with self._lock:
+            future = self._explanations.get(job_id)
+        if future is None:
+            return 404, {"id": job_id, "error": "没有该请求的解释"}
+        if future.cancelled():
+            return 409, {"id": job_id, "ok": False, "error": "解释已取消"}
+        if not future.done():
+            return 202, {"id": job_id, "status": "pending"}
+        try:
+            return 200, {"id": job_id, "ok": True, "explanation": future.result()}
+        except Exception as e:
+            return 500, {"id": job_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    # === 状态 ===
+
+    def health(self):
+        with self._lock:
+            in_flight = len(self._jobs)
+        return 200, {"workers": self.workers, "capacity": self.capacity, "in_flight": in_flight}
+
+    def close(self):
+        """停止服务：中止所有在途计算并关闭进程池"""
+        for slot in range(self.capacity):
+            self._cancel_flags[slot] = 1
+        self._explain_pool.shutdown(wait=False, cancel_futures=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class CalculationHandler(BaseHTTPRequestHandler):
+    """把 HTTP 请求转交给 server.service"""
+
+    def do_POST(self):
+        if self.path != "/calculate":
+            return self._send(404, {"error": "未知的路径"})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            return self._send(413, {"ok": False, "error": "请求体过大"})
+        try:
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return self._send(400, {"ok": False, "error": f"JSON 格式错误: {e}"})
+        self._send(*self.server.service.calculate(request))
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(*self.server.service.health())
+        if self.path.startswith("/explanations/"):
+            return self._send(*self.server.service.explanation(self.path[len("/explanations/"):]))
+        self._send(404, {"error": "未知的路径"})
+
+    def do_DELETE(self):
+        if self.path.startswith("/jobs/"):
+            return self._send(*self.server.service.cancel(self.path[len("/jobs/"):]))
+        self._send(404, {"error": "未知的路径"})
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def create_server(service, host="127.0.0.1", port=8000, quiet=False):
+    """
+    创建 HTTP 服务器（尚未开始监听循环）；port 为 0 时由系统分配端口，见 server.server_address。
+    quiet 为真时不打印访问日志
+    """
+    server = ThreadingHTTPServer((host, port), CalculationHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地 HTTP/JSON 计算服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认只接受本机连接）")
+    parser.add_argument("--port", type=int, default=8000, help="监听端口")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="工作进程数（默认 CPU 核数）")
+    parser.add_argument("--capacity", type=int, default=None, help="同时在途的计算上限（默认 2×进程数）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="默认时间限制（秒）")
+    parser.add_argument("--warm-digits", type=int, default=WARM_DIGITS, help="工作进程启动时预热的常数位数")
+    parser.add_argument("--quiet", action="store_true", help="不打印访问日志")
+    args = parser.parse_args(argv)
+
+    service = CalculationService(args.workers, args.capacity, args.timeout, max(args.timeout, MAX_TIMEOUT),
+                                 args.warm_digits)
+    server = create_server(service, args.host, args.port, args.quiet)
+    print(f"计算服务已启动: http://{args.host}:{server.server_address[1]}  "
+          f"（{service.workers} 个工作进程，在途上限 {service.capacity}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from trusted_computation.constant_store import STORE_DIR_ENV, get_store_directory, set_store_directory
+
+
+@pytest.fixture(scope="session", autouse=True)
+def constant_store_root(tmp_path_factory):
+    """
+    整个测试会话的常数存储目录：模块级的进程池在单个测试的目录建立之前就启动，
+    其工作进程（及新启动的进程读取的环境变量）也不写入用户主目录
+    """
+    directory, environ = get_store_directory(), os.environ.get(STORE_DIR_ENV)
+    path = tmp_path_factory.mktemp("constants")
+    os.environ[STORE_DIR_ENV] = str(path)
+    set_store_directory(str(path))
+    yield path
+    set_store_directory(directory)
+    if environ is None:
+        os.environ.pop(STORE_DIR_ENV, None)
+    else:
+        os.environ[STORE_DIR_ENV] = environ
+
+
+@pytest.fixture(autouse=True)
+def constant_store_directory(constant_store_root, tmp_path):
+    """每个测试的常数文件写入自己的临时目录"""
+    path = tmp_path / "constants"
+    set_store_directory(str(path))
+    yield path
+    set_store_directory(str(constant_store_root))
@@ -0,0 +1,46 @@
+"""
+求值引擎的共享测试与基准语料
+
+每一项为 (表达式字符串, 参考值)：参考值取自 Python decimal 模块或已知的解析结果，
+给出 100 位有效数字；为 None 时只比较两个引擎的结果是否一致。
+tests/test_engines.py 与 benchmarks/bench_engines.py 使用同一份语料。
+"""
+
+CORPUS = [
+    ("1+2", "3"),
+    ("7/3-1/3", "2"),
+    ("((1.5*2.5)*3.5)*sin(4)", None),
+    ("sin(1)", "0.8414709848078965066525023216302989996225630607983710656727517099919104043912396689486397435430526959"),
+    ("cos(1)", None),
+    ("tan(1)+cot(2)", None),
+    ("sec(1)*csc(1)", None),
+    ("sin(100)", None),
+    ("cos(1)^2+sin(1)^2", "1"),
+    ("arcsin(0.5)", None),
+    ("arccos(0.3)", None),
+    ("arctan(3)", None),
+    ("arccot(2)", None),
+    ("pi", "3.141592653589793238462643383279502884197169399375105820974944592307816406286208998628034825342117068"),
+    ("e", "2.718281828459045235360287471352662497757247093699959574966967627724076630353547594571382178525166427"),
+    ("ln(3)/arctan(0.5)", None),
+    ("ln(10)+ln(0.5)", None),
+    ("ln(1000000)", None),
+    ("ln(0.001)", None),
+    ("log(2,8)", "3"),
+    ("e^50/e^49", None),
+    ("e^-3", None),
+    ("e^(sin(2)*3)", None),
+    ("sinh(2)-cosh(2)", None),
+    ("sinh(0.001)", None),
+    ("2^10", "1024"),
+    ("(-2)^3", "-8"),
+    ("2^0.5*3^0.5", None),
+    ("7^(1/3)", None),
+    ("sqrt(2)", "1.414213562373095048801688724209698078569671875376948073176679737990732478462107038850387534327641573"),
+    ("root(7,3)", None),
+    ("e^20", None),
+    ("arcsin(1)", None),
+]
+
+# 基准测试使用的有效数字位数
+BENCH_DIGITS = [50, 300, 1000]
@@ -0,0 +1,83 @@
+"""
+测试用的高精度参考值
+
+只使用 decimal 模块自带的 exp、ln、sqrt 与朴素的泰勒级数（不经过 trusted_computation 的任何代码），
+在远高于被测位数的精度下计算，作为精度测试的独立参考。
+"""
+from decimal import Decimal, localcontext
+
+GUARD = 30  # 参考值比所需位数多算的位数
+
+
+def _with_prec(digits):
+    return localcontext(prec=digits + GUARD)
+
+
+def pi(digits):
+    """π（Python decimal 文档中的级数）"""
+    with _with_prec(digits):
+        lasts, t, s, n, na, d, da = 0, Decimal(3), 3, 1, 0, 0, 24
+        while s != lasts:
+            lasts = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+        return +s
+
+
+def exp(x, digits):
+    with _with_prec(digits):
+        return Decimal(x).exp()
+
+
+def ln(x, digits):
+    with _with_prec(digits):
+        return Decimal(x).ln()
+
+
+def sqrt(x, digits):
+    with _with_prec(digits):
+        return Decimal(x).sqrt()
+
+
+def sin(x, digits):
+    """|x| 不太大时的泰勒级数；先按 2π 约简"""
+    with _with_prec(digits + len(str(int(abs(Decimal(x)))))):
+        x = Decimal(x)
+        two_pi = 2 * pi(digits + 20)
+        x -= two_pi * (x / two_pi).to_integral_value()
+        i, lasts, s, fact, num, sign = 1, 0, x, 1, x, 1
+        while s != lasts:
+            lasts = s
+            i += 2
+            fact *= i * (i - 1)
+            num *= x * x
+            sign *= -1
+            s += num / fact * sign
+        return +s
+
+
+def cos(x, digits):
+    with _with_prec(digits):
+        return sin(pi(digits + 10) / 2 - Decimal(x), digits)
+
+
+def atan(x, digits):
+    """|x| ≤ 1 时用 atan(x) = 2·atan(x / (1 + sqrt(1 + x²))) 缩小后展开，|x| > 1 时用 π/2 - atan(1/x)"""
+    with _with_prec(digits):
+        x = Decimal(x)
+        if abs(x) > 1:
+            half_pi = pi(digits + 10) / 2
+            return (half_pi if x > 0 else -half_pi) - atan(1 / x, digits)
+        halvings = 0
+        while abs(x) > Decimal("0.1"):
+            x = x / (1 + (1 + x * x).sqrt())
+            halvings += 1
+        s, term, k, lasts = x, x, 1, None
+        while s != lasts:
+            lasts = s
+            term *= -x * x
+            k += 2
+            s += term / k
+        return s * 2 ** halvings
@@ -0,0 +1,32 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import clear_log, get_log
+from trusted_computation.main import Main
+
+
+@pytest.mark.parametrize("x", ["0.124", "0.125", "0.9", "1", "-1", "1.5", "-7", "1e6", "-1e40"])
+@pytest.mark.parametrize("ε", ["0.1", "1e-20", "1e-150"])
+def test_half_angle_reduction_within_epsilon(x, ε):
+    ε = Decimal(ε)
+    expected = reference.atan(x, 200)
+    assert abs(Decimal(Main(parse_expression(f"arctan({x})"), ε)) - expected) < ε
+
+
+def test_reduction_stays_numeric():
+    """|x| > 1 时不再构造新的表达式树（原来经 Main 用 exp(ln(x)/2) 开方）"""
+    clear_log()
+    Main(parse_expression("arctan(50)"), Decimal("1e-30"), mode="explain")
+    log = get_log()
+    assert any("半角约简" in line for line in log)
+    assert not any("【exp】" in line or "【ln】" in line for line in log)
+
+
+def test_arctan_of_expression():
+    ε = Decimal("1e-40")
+    with localcontext(prec=80):
+        expected = reference.atan(reference.sqrt(3, 60), 60)  # π/3
+    assert abs(Decimal(Main(parse_expression("arctan(sqrt(3))"), ε)) - expected) < ε
@@ -0,0 +1,69 @@
+import io
+import json
+import time
+
+from batch import run_batch
+from trusted_computation.input import parse_expression
+from trusted_computation.main import adaptive_main, format_sig_digits
+from trusted_computation.worker import evaluate
+
+
+def test_evaluate_returns_result_or_error():
+    response = evaluate("sqrt(2)", 40)
+    direct, _ = adaptive_main(parse_expression("sqrt(2)"), 40)
+    assert response["ok"] and response["result"] == format_sig_digits(direct, 40)
+    assert response["elapsed_ms"] >= 0
+
+    response = evaluate("ln(0)", 40)
+    assert not response["ok"] and response["error"].startswith("ValueError")
+
+    response = evaluate("sin(", 40)
+    assert not response["ok"] and response["error"].startswith("SyntaxError")
+
+
+def test_evaluate_explain_returns_log():
+    response = evaluate("sin(1)+e", 30, explain=True)
+    assert response["ok"] and response["log"]
+    assert "log" not in evaluate("sin(1)+e", 30)
+
+
+def test_batch_keeps_input_order_and_survives_bad_lines():
+    expressions = [f"sin({k})+ln({k + 1})" for k in range(20)]
+    lines = [json.dumps({"id": k, "expr": expression, "digits": 30 + k})
+             for k, expression in enumerate(expressions)]
+    lines[3] = "{不是 JSON"
+    lines[7] = json.dumps({"id": 7, "expr": "1/0"})
+    lines[11] = json.dumps({"digits": 10})
+    lines.insert(15, "")
+
+    out = io.StringIO()
+    count, errors = run_batch(lines, out, workers=2, window=3, default_digits=25, warm_digits=100)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert (count, errors) == (20, 3)
+    assert [r["line"] for r in records] == [n for n in range(1, 22) if n != 16]
+    assert not records[3]["ok"] and "JSON" in records[3]["error"]
+    assert not records[7]["ok"] and records[7]["id"] == 7 and records[7]["digits"] == 25
+    assert not records[11]["ok"] and "expr" in records[11]["error"]
+    for record in records:
+        if record["ok"]:
+            k = record["id"]
+            direct, _ = adaptive_main(parse_expression(expressions[k]), 30 + k)
+            assert record["result"] == format_sig_digits(direct, 30 + k)
+
+
+def test_batch_timeout_fails_only_the_slow_line():
+    slow = "+".join(f"sin({k})*e^({k}/7)" for k in range(1, 41))
+    lines = [json.dumps({"expr": "sqrt(2)"}),
+             json.dumps({"expr": slow, "digits": 3000}),
+             json.dumps({"expr": "ln(3)"})]
+
+    out = io.StringIO()
+    start = time.perf_counter()
+    count, errors = run_batch(lines, out, workers=2, window=3, default_digits=25, warm_digits=100, timeout=0.3)
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert (count, errors) == (3, 1)
+    assert time.perf_counter() - start < 10
+    assert records[0]["ok"] and records[2]["ok"]
+    assert not records[1]["ok"] and records[1]["error"].startswith("EvaluationTimeout")
@@ -0,0 +1,68 @@
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from math import factorial
+
+import pytest
+
+import reference
+from trusted_computation.binsplit import atanh_inverse, binary_split, e_series, series_sum
+from trusted_computation.pi import _compute_pi
+from trusted_computation.precision import working_precision
+
+
+def exact_sum(a, b, p, q, terms):
+    total, product = Fraction(0), Fraction(1)
+    for n in range(terms):
+        product *= Fraction(p(n), q(n))
+        total += Fraction(a(n), b(n)) * product
+    return total
+
+
+@pytest.mark.parametrize("terms", [1, 2, 7, 128, 129, 300])
+def test_binary_split_is_exact(terms):
+    """短区间用 Python 整数、长区间用精确的 Decimal 整数合并，部分和 T/(B·Q) 都与逐项求和一致"""
+    a, b = (lambda n: 3 * n + 1), (lambda n: 2 * n + 1)
+    p, q = (lambda n: -(n + 2)), (lambda n: 5 * n + 3)
+    _, big_q, big_b, big_t = binary_split(a, b, p, q, 0, terms)
+    assert Fraction(int(big_t), int(big_b) * int(big_q)) == exact_sum(a, b, p, q, terms)
+
+
+def test_series_sum_divides_once_in_current_context():
+    with localcontext(prec=50):
+        value = series_sum(lambda n: 1, lambda n: 1, lambda n: 1, lambda n: n if n else 1, 30)
+        expected = sum(Decimal(1) / factorial(n) for n in range(30))
+    assert abs(value - expected) < Decimal("1e-48")
+
+
+def in_context(func, epsilon):
+    with localcontext(prec=working_precision(1, epsilon)):
+        return func(epsilon)
+
+
+@pytest.mark.parametrize("digits", [10, 1000, 5000])
+def test_e_series(digits):
+    ε = Decimal(10) ** -digits
+    assert abs(in_context(e_series, ε) - reference.exp(1, digits + 10)) < ε
+
+
+@pytest.mark.parametrize("m", [2, 9, 26, 4801])
+@pytest.mark.parametrize("digits", [10, 1000, 3000])
+def test_atanh_inverse(m, digits):
+    ε = Decimal(10) ** -digits
+    with localcontext(prec=digits + 40):
+        expected = reference.ln(Decimal(m + 1) / Decimal(m - 1), digits + 10)
+    assert abs(in_context(lambda e: atanh_inverse(m, e), ε) - expected) < ε
+
+
+@pytest.mark.parametrize("digits", [10, 1000, 3000])
+def test_chudnovsky_pi(digits):
+    ε = Decimal(10) ** -digits
+    assert abs(in_context(_compute_pi, ε) - reference.pi(digits + 10)) < ε
+
+
+def test_pi_at_100000_digits_is_self_consistent():
+    """10^5 位时参考级数太慢：与多算 100 位的结果比较"""
+    ε = Decimal(10) ** -100000
+    value = in_context(_compute_pi, ε)
+    finer = in_context(_compute_pi, ε / Decimal(10) ** 100)
+    assert abs(value - finer) < ε
@@ -0,0 +1,52 @@
+from decimal import Decimal, localcontext
+
+import reference
+from trusted_computation.cache import ApproxCache, get_cache_stats
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+
+
+def test_lookup_serves_looser_requests_only():
+    cache = ApproxCache()
+    key = ('sin', Decimal(1))
+    cache.store(key, Decimal("1e-20"), Decimal("0.84147098480789650665"))
+    assert cache.lookup(key, Decimal("1e-10")) == Decimal("0.84147098480789650665")
+    assert cache.lookup(key, Decimal("1e-20")) is not None
+    assert cache.lookup(key, Decimal("1e-21")) is None
+    assert cache.stats() == {"hits": 2, "misses": 1, "entries": 1}
+
+
+def test_store_keeps_tightest_value():
+    cache = ApproxCache()
+    key = ('ln', Decimal(2))
+    cache.store(key, Decimal("1e-5"), Decimal("0.69315"))
+    cache.store(key, Decimal("1e-10"), Decimal("0.6931471806"))
+    cache.store(key, Decimal("1e-3"), Decimal("0.693"))  # 更宽松的值不覆盖
+    assert cache.approximation(key) == Decimal("0.6931471806")
+    assert cache.lookup(key, Decimal("1e-9")) == Decimal("0.6931471806")
+    cache.clear()
+    assert cache.stats() == {"hits": 0, "misses": 0, "entries": 0}
+
+
+def test_repeated_subtree_hits_cache():
+    expression = "sin(e^2)*ln(3) + sin(e^2)/ln(3)"
+    epsilon = Decimal(10) ** -50
+    with localcontext(prec=80):
+        value = Main(parse_expression(expression), epsilon)
+    stats = get_cache_stats()
+    assert stats["hits"] > 0 and stats["entries"] > 0
+
+    s = reference.sin(reference.exp(2, 80), 80)
+    l3 = reference.ln(3, 80)
+    with localcontext(prec=100):
+        expected = s * l3 + s / l3
+    assert abs(value - expected) < epsilon
+
+
+def test_each_evaluation_starts_with_a_fresh_cache():
+    with localcontext(prec=60):
+        Main(parse_expression("arctan(2)+arctan(2)"), Decimal(10) ** -40)
+        first = get_cache_stats()
+        Main(parse_expression("arctan(2)+arctan(2)"), Decimal(10) ** -40)
+        second = get_cache_stats()
+    assert first == second
@@ -0,0 +1,103 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+import reference
+from trusted_computation import constants
+from trusted_computation.constant_store import close_store, load_constant, save_constant, set_store_directory
+from trusted_computation.constants import get_pi, reset_constant_cache
+
+PI_TEXT = format(reference.pi(1200), "f")[:1202]  # 小数点后 1200 位，截断误差 < 1e-1200
+PI = Decimal(PI_TEXT)
+
+
+@pytest.fixture
+def pi_file(constant_store_directory):
+    save_constant("pi", Decimal("1e-1200"), PI)
+    close_store()
+    return constant_store_directory / "pi.digits"
+
+
+@pytest.fixture
+def recompute_count(monkeypatch):
+    """清空内存缓存，记录 π 的重新计算次数"""
+    reset_constant_cache()
+    calls = []
+    compute = constants._CONSTANT_COMPUTERS["pi"]
+    monkeypatch.setitem(constants._CONSTANT_COMPUTERS, "pi", lambda ε: calls.append(ε) or compute(ε))
+    yield calls
+    reset_constant_cache()
+
+
+def test_load_reads_prefix_within_epsilon(pi_file):
+    error, value = load_constant("pi", Decimal("1e-50"))
+    assert error < Decimal("1e-50")
+    assert abs(value - PI) < error
+    assert len(str(value)) < 60  # 只读取所需的前缀
+    assert load_constant("pi", Decimal("1e-1300")) is None  # 位数不足
+
+
+def test_get_constant_reads_file_instead_of_computing(pi_file, recompute_count):
+    assert abs(get_pi(Decimal("1e-500")) - PI) < Decimal("1e-500")
+    assert recompute_count == []
+
+
+def test_less_precise_value_does_not_overwrite(pi_file):
+    save_constant("pi", Decimal("1e-20"), Decimal("3.14159265358979323846"))
+    close_store()
+    assert load_constant("pi", Decimal("1e-1000")) is not None
+
+
+def test_store_disabled():
+    set_store_directory(None)
+    save_constant("pi", Decimal("1e-1200"), PI)
+    assert load_constant("pi", Decimal("1e-10")) is None
+
+
+def test_crc_mismatch_removes_file_and_recomputes(pi_file, recompute_count):
+    raw = bytearray(pi_file.read_bytes())
+    raw[-300] = ord("1") if raw[-300] == ord("0") else ord("0")  # 改动最后一块中的一位数字
+    pi_file.write_bytes(raw)
+    assert load_constant("pi", Decimal("1e-1150")) is None
+    assert not pi_file.exists()
+
+    value = get_pi(Decimal("1e-1150"))
+    assert len(recompute_count) == 1
+    assert abs(value - PI) < Decimal("1e-1150")
+    assert pi_file.exists()  # 重新计算后写入新文件
+    close_store()
+    assert load_constant("pi", Decimal("1e-1150")) is not None
+
+
+def test_truncated_file_is_ignored_and_replaced(pi_file, recompute_count):
+    pi_file.write_bytes(pi_file.read_bytes()[:-100])
+    assert load_constant("pi", Decimal("1e-10")) is None
+
+    value = get_pi(Decimal("1e-100"))
+    assert len(recompute_count) == 1
+    assert abs(value - PI) < Decimal("1e-100")
+    close_store()
+    assert load_constant("pi", Decimal("1e-100")) is not None
+
+
+@pytest.mark.parametrize("header", [
+    b"not json",
+    json.dumps({"format": "something-else", "version": 1}).encode(),
+    json.dumps({"format": "trusted-computation-constant", "version": 1, "name": "pi"}).encode(),
+])
+def test_corrupt_header_is_ignored_and_replaced(pi_file, recompute_count, header):
+    raw = pi_file.read_bytes()
+    pi_file.write_bytes(header + raw[raw.index(b"\n"):])
+    assert load_constant("pi", Decimal("1e-10")) is None
+
+    value = get_pi(Decimal("1e-100"))
+    assert len(recompute_count) == 1
+    assert abs(value - PI) < Decimal("1e-100")
+    close_store()
+    assert load_constant("pi", Decimal("1e-100")) is not None
+
+
+def test_empty_file_is_ignored(pi_file):
+    pi_file.write_bytes(b"")
+    assert load_constant("pi", Decimal("1e-10")) is None
@@ -0,0 +1,96 @@
+import threading
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation import constants
+from trusted_computation.constant_store import get_store_directory, set_store_directory
+from trusted_computation.constants import get_constant, get_e, get_ln10, get_ln2, get_pi, reset_constant_cache
+
+REFERENCES = {
+    "pi": reference.pi,
+    "e": lambda digits: reference.exp(1, digits),
+    "ln2": lambda digits: reference.ln(2, digits),
+    "ln10": lambda digits: reference.ln(10, digits),
+}
+
+
+@pytest.fixture
+def memory_only():
+    """只测试内存中的缓存：关闭磁盘存储并清空缓存，记录每个常数的计算次数"""
+    directory = get_store_directory()
+    set_store_directory(None)
+    reset_constant_cache()
+    calls = []
+    computers = dict(constants._CONSTANT_COMPUTERS)
+
+    def counting(name):
+        def compute(epsilon):
+            calls.append((name, epsilon))
+            return computers[name](epsilon)
+        return compute
+
+    for name in computers:
+        constants._CONSTANT_COMPUTERS[name] = counting(name)
+    yield calls
+    constants._CONSTANT_COMPUTERS.update(computers)
+    reset_constant_cache()
+    set_store_directory(directory)
+
+
+@pytest.mark.parametrize("name", list(REFERENCES))
+@pytest.mark.parametrize("digits", [5, 100, 1500])
+def test_constant_within_epsilon(memory_only, name, digits):
+    ε = Decimal(10) ** -digits
+    assert abs(get_constant(name, ε) - REFERENCES[name](digits + 10)) < ε
+
+
+def test_looser_requests_reuse_cached_value(memory_only):
+    value = get_pi(Decimal("1e-200"))
+    assert [name for name, _ in memory_only] == ["pi"]
+    assert get_pi(Decimal("1e-50")) is value
+    assert get_pi(Decimal("3e-201")) is value  # 取为不大于它的 10 的整数次幂后仍被缓存值满足
+    assert len(memory_only) == 1
+
+    tighter = get_pi(Decimal("1e-400"))
+    assert len(memory_only) == 2
+    assert get_pi(Decimal("1e-200")) is tighter
+
+
+def test_ln10_reuses_cached_ln2(memory_only):
+    get_ln2(Decimal("1e-300"))
+    get_ln10(Decimal("1e-100"))
+    assert [name for name, _ in memory_only] == ["ln2", "ln10"]
+
+
+def test_reset_single_constant(memory_only):
+    get_e(Decimal("1e-30"))
+    get_pi(Decimal("1e-30"))
+    reset_constant_cache("e")
+    get_e(Decimal("1e-30"))
+    get_pi(Decimal("1e-30"))
+    assert [name for name, _ in memory_only] == ["e", "pi", "e"]
+
+
+def test_concurrent_requests_compute_once(memory_only):
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(get_pi(Decimal("1e-3000")))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(memory_only) == 1
+    assert all(value is results[0] for value in results)
+
+
+def test_constant_does_not_depend_on_caller_precision(memory_only):
+    with localcontext(prec=5):
+        value = get_e(Decimal("1e-60"))
+    assert abs(value - reference.exp(1, 70)) < Decimal("1e-60")
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, localcontext
+
+import pytest
+
+from trusted_computation.cache import get_cache_stats
+from trusted_computation.constants import get_pi, reset_constant_cache
+from trusted_computation.context import (EvaluationCancelled, EvaluationTimeout, evaluation_context,
+                                         get_context)
+from trusted_computation.dag import set_sharing, sharing_enabled
+from trusted_computation.hyperbolic import sinhcosh1
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import add_log, get_log, get_log_level, set_log_level
+from trusted_computation.main import Main, prepare_expression
+from trusted_computation.precision import call_precision_enabled
+from trusted_computation.rational import rational_folding_enabled
+from trusted_computation.simplify import simplification_enabled
+
+PI_100 = Decimal("3.141592653589793238462643383279502884197169399375105820974944592307816406286"
+                 "208998628034825342117068")
+
+CASES = [("sin(1)", 40), ("ln(7)", 120), ("e^(1/3)", 300), ("arctan(2)", 60)]
+
+
+def reference(expression, digits):
+    with localcontext() as ctx:
+        ctx.prec = digits + 60
+        return Main(parse_expression(expression), Decimal(10) ** -(digits + 40))
+
+
+def calculate(expression, digits):
+    """在独立的上下文中以 explain 模式计算，返回 (结果, 日志, 工作精度)"""
+    with evaluation_context(prec=digits + 30):
+        for _ in range(3):
+            result = Main(parse_expression(expression), Decimal(10) ** -digits, mode="explain")
+        add_log("完成 {}", expression, level="SUMMARY")
+        return result, get_log(), get_context()
+
+
+def test_threads_do_not_share_logs_or_precision():
+    references = {expression: reference(expression, digits) for expression, digits in CASES}
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [(expression, digits, pool.submit(calculate, expression, digits))
+                   for expression, digits in CASES * 8]
+        for expression, digits, future in futures:
+            result, log, _ = future.result()
+            assert abs(result - references[expression]) < Decimal(10) ** -digits
+            finished = [step for step in log if step.startswith("完成")]
+            assert finished == [f"完成 {expression}"]
+
+
+def test_asyncio_tasks_use_separate_contexts():
+    async def task(expression, digits):
+        with evaluation_context(log_level="SUMMARY", prec=digits + 30):
+            add_log("开始 {}", expression, level="SUMMARY")
+            await asyncio.sleep(0)  # 让其他任务在中途运行
+            result = Main(parse_expression(expression), Decimal(10) ** -digits, mode=None)
+            await asyncio.sleep(0)
+            return result, get_log()
+
+    async def run():
+        return await asyncio.gather(*(task(expression, digits) for expression, digits in CASES))
+
+    for (expression, digits), (result, log) in zip(CASES, asyncio.run(run())):
+        assert abs(result - reference(expression, digits)) < Decimal(10) ** -digits
+        assert [step for step in log if step.startswith("开始")] == [f"开始 {expression}"]
+
+
+def test_evaluation_context_restores_previous_state():
+    set_log_level("DETAIL")
+    outer = get_context()
+    with evaluation_context(log_level="NONE") as inner:
+        assert get_context() is inner
+        assert get_log_level() == "NONE"
+        Main(parse_expression("sin(1)+sin(1)"), Decimal(10) ** -20)
+        inner_stats = get_cache_stats()
+    assert get_context() is outer
+    assert get_log_level() == "DETAIL"
+    assert inner_stats["entries"] > 0
+
+
+def test_concurrent_constant_requests():
+    reset_constant_cache("pi")
+
+    def request(digits):
+        with localcontext() as ctx:
+            ctx.prec = digits + 20
+            return digits, get_pi(Decimal(10) ** -digits)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for digits, value in pool.map(request, [10, 50, 90] * 10):
+            assert abs(value - PI_100) < Decimal(10) ** -digits
+
+
+def test_deadline_and_cancellation_stop_evaluation():
+    expression = parse_expression("sin(1)+ln(2)")
+    with evaluation_context(deadline=time.monotonic() - 1):
+        with pytest.raises(EvaluationTimeout):
+            Main(expression, Decimal(10) ** -20)
+    with evaluation_context(cancelled=lambda: True):
+        with pytest.raises(EvaluationCancelled):
+            Main(expression, Decimal(10) ** -20)
+    with evaluation_context(deadline=time.monotonic() + 60, cancelled=lambda: False):
+        assert abs(Main(expression, Decimal(10) ** -20) - reference("sin(1)+ln(2)", 20)) < Decimal(10) ** -20
+
+
+def test_options_belong_to_the_current_context():
+    barrier = threading.Barrier(2)
+
+    def run(simplify):
+        with evaluation_context(options={"simplification": simplify, "rational_folding": simplify}):
+            barrier.wait()  # 两个线程的选项同时生效
+            result = prepare_expression(parse_expression("ln(e^(1/3))*1"))[0]
+            barrier.wait()
+            return result, simplification_enabled(), rational_folding_enabled()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        simplified, plain = pool.map(run, [True, False])
+    assert simplified[1:] == (True, True) and plain[1:] == (False, False)
+    assert simplified[0] != plain[0]
+    assert simplification_enabled() and rational_folding_enabled()
+
+
+def test_nested_context_inherits_and_overrides_options():
+    with evaluation_context(options={"call_precision": False}):
+        set_sharing(False)
+        with evaluation_context(options={"sharing": True}):
+            assert not call_precision_enabled()
+            assert sharing_enabled()
+        assert not sharing_enabled()
+    assert call_precision_enabled() and sharing_enabled()
+    with pytest.raises(ValueError):
+        with evaluation_context(options={"no_such_option": True}):
+            pass
+
+
+def test_sinhcosh_memo_is_per_context():
+    x, ε = Decimal("1.75"), Decimal(10) ** -40
+
+    def run(_):
+        with evaluation_context(prec=60):
+            s, c = sinhcosh1(x, ε)
+            return s, c, get_context().last_sinhcosh[0]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(run, range(8)))
+    with localcontext(prec=100):
+        y = reference("e^1.75", 60)
+        expected = ((y - 1 / y) / 2, (y + 1 / y) / 2)
+    for s, c, key in results:
+        assert abs(s - expected[0]) < ε and abs(c - expected[1]) < ε
+        assert key == (x, ε, 60)
@@ -0,0 +1,60 @@
+import pickle
+from decimal import Decimal, localcontext
+
+from trusted_computation.dag import Node, count_parents, intern, is_shared, set_sharing
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+
+
+def test_repeated_subtrees_share_one_node():
+    expr = parse_expression("sin(e^5+ln(7))^2+cos(e^5+ln(7))^2")
+    sin_arg = expr[1][1][1]
+    cos_arg = expr[2][1][1]
+    assert isinstance(sin_arg, Node)
+    assert sin_arg is cos_arg
+    parents = {}
+    count_parents(expr, parents)
+    assert is_shared(sin_arg, parents)
+    assert parse_expression("e^5+ln(7)") is sin_arg
+
+
+def test_intern_is_idempotent_and_structural():
+    plain = ('+', ('sin', Decimal(1)), ('sin', Decimal(1)))
+    node = intern(plain)
+    assert node == plain and hash(node) == hash(plain)
+    assert intern(node) is node
+    assert node[1] is node[2]
+
+
+def test_pickle_reinterns():
+    node = parse_expression("sqrt(2)*ln(3)")
+    assert pickle.loads(pickle.dumps(node)) is node
+
+
+def test_results_independent_of_sharing():
+    expression = "tan(e^3+ln(7))+sec(e^3+ln(7))"
+    epsilon = Decimal(10) ** -60
+    results = []
+    for sharing in (False, True):
+        set_sharing(sharing)
+        try:
+            with localcontext() as ctx:
+                ctx.prec = 90
+                results.append(Main(parse_expression(expression), epsilon))
+        finally:
+            set_sharing(True)
+    assert abs(results[0] - results[1]) < 2 * epsilon
+
+
+def test_sharing_is_counted_per_expression():
+    """共享表在进程内共用，但一个节点是否共享只看本次求值的表达式"""
+    expr = parse_expression("sin(ln(11)+e^3)*2")
+    parse_expression("cos(ln(11)+e^3)")  # 无关的表达式也引用同一子树
+    parse_expression("tan(ln(11)+e^3)")
+    parents = {}
+    count_parents(expr, parents)
+    assert parents[expr[1][1]] == 1
+    assert not is_shared(expr[1][1], parents)
+
+    count_parents(intern(('+', expr[1][1], ('ln', expr[1][1]))), parents)  # 改写规则产生的新子树
+    assert is_shared(expr[1][1], parents)
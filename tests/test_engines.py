@@ -0,0 +1,71 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from corpus import CORPUS
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.planner import clear_plan_cache, dump_plan, get_plan
+
+DIGITS = 50
+EPSILON = Decimal(10) ** -DIGITS
+
+
+def evaluate(expression, engine):
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 30
+        return Main(parse_expression(expression), EPSILON, engine=engine)
+
+
+@pytest.mark.parametrize("expression, reference", CORPUS)
+def test_engines_agree(expression, reference):
+    backprop = evaluate(expression, "backprop")
+    ball = evaluate(expression, "ball")
+    assert abs(backprop - ball) < 2 * EPSILON
+    if reference is not None:
+        assert abs(ball - Decimal(reference)) < EPSILON
+
+
+def test_ball_division_by_zero():
+    with pytest.raises(ZeroDivisionError):
+        evaluate("1/(1-1)", "ball")
+
+
+def test_ball_unresolvable_divisor():
+    # e^1 - e 的球总是包含 0，加倍精度若干次后放弃（sin(pi) 在求值前已化简为 0）
+    with pytest.raises(ValueError):
+        evaluate("1/(e^1-e)", "ball")
+
+
+def test_plan_division_by_zero():
+    with pytest.raises(ZeroDivisionError):
+        evaluate("1/(1-1)", "plan")
+
+
+def test_plan_falls_back_to_ball():
+    # e^1 - e 的界无法与 0 分开，无法静态分配误差，改用球算术引擎后同样放弃
+    with pytest.raises(ValueError):
+        evaluate("1/(e^1-e)", "plan")
+
+
+def test_plan_reused():
+    clear_plan_cache()
+    expr = parse_expression("sin(1)^2+sin(1)*3")
+    plan = get_plan(expr, EPSILON)
+    assert get_plan(expr, EPSILON) is plan
+    assert get_plan(expr, EPSILON / 10) is not plan
+    # 共享子树 sin(1) 只有一步
+    assert sum(1 for step in plan.steps if step.op == "sin") == 1
+
+
+def test_dump_plan():
+    expr = parse_expression("ln(3)/arctan(0.5)")
+    text = dump_plan(expr, EPSILON)
+    assert "ln" in text and "arctan" in text
+    # 标题行、表头，加上每步一行
+    assert len(text.splitlines()) == 2 + len(get_plan(expr, EPSILON).steps)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        evaluate("1+2", "interval")
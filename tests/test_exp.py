@@ -0,0 +1,86 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.Exp import Exp1
+from trusted_computation.Exp2 import Exp2
+from trusted_computation.constants import reset_constant_cache
+from trusted_computation.dag import intern
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import clear_log, get_log
+from trusted_computation.main import Main
+
+
+@pytest.mark.parametrize("c", ["0.5", "-0.5", "1", "-3.25", "10", "-10", "57.3", "-57.3", "230.125"])
+@pytest.mark.parametrize("digits", [10, 50, 200])
+def test_exp1_within_epsilon(c, digits):
+    ε = Decimal(10) ** -digits
+    assert abs(Exp1(Decimal(c), ε) - reference.exp(c, digits + 110)) < ε
+
+
+@pytest.mark.parametrize("expr, x", [("e^(-40)", -40), ("e^(-100)", -100), ("e^(-300)", -300)])
+@pytest.mark.parametrize("ε", ["0.5", "0.1", "1e-10", "1e-20", "1e-30", "1e-50"])
+def test_large_negative_exponent_at_coarse_epsilon(expr, x, ε):
+    """2^(k+1) 远小于 ε 时相对误差预算不能超过 1，否则结果远离真值"""
+    reset_constant_cache()  # 缓存中更精确的 ln2 会掩盖误差分配的问题
+    ε = Decimal(ε)
+    assert abs(Decimal(Main(parse_expression(expr), ε)) - reference.exp(x, 200)) < ε
+
+
+@pytest.mark.parametrize("ε", ["1e-5", "1e-10", "1e-20", "1e-40"])
+def test_tanh_near_one_at_coarse_epsilon(ε):
+    ε = Decimal(ε)
+    reset_constant_cache()
+    with localcontext(prec=100):
+        e40 = reference.exp(40, 100)
+        expected = (e40 - 1) / (e40 + 1)
+    assert abs(Decimal(Main(parse_expression("tanh(20)"), ε)) - expected) < ε
+
+
+@pytest.mark.parametrize("expr, base, n", [
+    ("2^10", 2, 10), ("1.0001^100000", "1.0001", 100000), ("3^(-7)", 3, -7),
+    ("(-2)^31", -2, 31), ("(-1.5)^8", "-1.5", 8), ("e^7", None, 7), ("sin(1)^25", None, 25),
+])
+@pytest.mark.parametrize("ε", ["0.1", "1e-30", "1e-200"])
+def test_integer_power_within_epsilon(expr, base, n, ε):
+    ε = Decimal(ε)
+    with localcontext(prec=500):
+        if expr == "e^7":
+            expected = reference.exp(7, 400)
+        elif base is None:
+            expected = reference.sin(1, 400) ** n
+        else:
+            expected = Decimal(base) ** n
+    assert abs(Decimal(Main(parse_expression(expr), ε)) - expected) < ε
+
+
+def test_integer_power_avoids_exp_and_ln():
+    clear_log()
+    Main(parse_expression("sin(1)^40"), Decimal("1e-50"), mode="explain")
+    log = get_log()
+    assert any("二进制快速幂" in line for line in log)
+    assert not any("【ln】" in line for line in log)
+
+
+@pytest.mark.parametrize("expr, expected", [("8^(2/3)", 4), ("(-8)^(1/3)", -2), ("32^(-3/5)", Decimal("0.125"))])
+def test_small_rational_power(expr, expected):
+    ε = Decimal("1e-40")
+    assert abs(Decimal(Main(parse_expression(expr), ε)) - expected) < ε
+
+
+def test_zero_exponent_still_evaluates_base():
+    assert Main(parse_expression("sin(1)^0"), Decimal("1e-20")) == 1
+    with pytest.raises(ValueError):
+        Exp2(intern(('ln', Decimal(0))), Decimal(0), Decimal("1e-20"))
+
+
+@pytest.mark.parametrize("expr", ["0^(-1)", "(1-1)^(-2)", "(e-e)^(-1)", "(pi-pi)^(-2)"])
+def test_negative_power_of_exact_zero_raises(expr):
+    with pytest.raises(ZeroDivisionError):
+        Main(parse_expression(expr), Decimal("1e-20"))
+
+
+def test_negative_power_of_zero_without_folding():
+    with pytest.raises(ZeroDivisionError):
+        Exp2(intern(('-', Decimal(1), Decimal(1))), Decimal(-3), Decimal("1e-20"))
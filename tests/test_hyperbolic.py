@@ -0,0 +1,68 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from trusted_computation.hyperbolic import sinhcosh1, tanh1
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+
+DIGITS = 60
+EPSILON = Decimal(10) ** -DIGITS
+
+
+def reference(op, x):
+    """由 Decimal.exp 在足够高的精度下计算参考值"""
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 200
+        y = Decimal(x).exp()
+        inverse = 1 / y
+        return {"sinh": (y - inverse) / 2, "cosh": (y + inverse) / 2, "tanh": (y - inverse) / (y + inverse)}[op]
+
+
+def evaluate(expression, engine="backprop"):
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 30
+        return Main(parse_expression(expression), EPSILON, engine=engine)
+
+
+@pytest.mark.parametrize("x", ["1e-20", "0.001", "-0.3", "0.4999", "0.5", "-1.7", "12.5", "-40", "150"])
+@pytest.mark.parametrize("op", ["sinh", "cosh", "tanh"])
+def test_constant_argument(op, x):
+    assert abs(evaluate(f"{op}({x})") - reference(op, x)) < EPSILON
+
+
+@pytest.mark.parametrize("x", ["1/3+e", "-sqrt(2)/7", "ln(30)"])
+@pytest.mark.parametrize("op", ["sinh", "cosh", "tanh"])
+def test_expression_argument(op, x):
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 80
+        x_value = Main(parse_expression(x), EPSILON * Decimal(10) ** -40)
+    assert abs(evaluate(f"{op}({x})") - reference(op, x_value)) < EPSILON
+
+
+@pytest.mark.parametrize("x", ["0.0123456789012345678901234567890123", "0.3", "7"])
+@pytest.mark.parametrize("digits", [30, 500])
+def test_kernels(x, digits):
+    eps = Decimal(10) ** -digits
+    with localcontext() as ctx:
+        ctx.prec = digits + 20
+        s, c = sinhcosh1(Decimal(x), eps)
+        t = tanh1(Decimal(x), eps)
+    with localcontext() as ctx:
+        ctx.prec = digits + 60
+        y = Decimal(x).exp()
+        assert abs(s - (y - 1 / y) / 2) < eps
+        assert abs(c - (y + 1 / y) / 2) < eps
+        assert abs(t - (y - 1 / y) / (y + 1 / y)) < eps
+
+
+def test_tanh_of_zero_is_simplified():
+    assert evaluate("tanh(0)") == 0
+
+
+@pytest.mark.parametrize("engine", ["ball", "plan"])
+def test_tanh_on_other_engines(engine):
+    value = evaluate("tanh(1.5)+tanh(-0.2)", engine)
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 200
+        assert abs(value - reference("tanh", "1.5") - reference("tanh", "-0.2")) < EPSILON
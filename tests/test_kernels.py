@@ -0,0 +1,59 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.arctan import arctan1
+from trusted_computation.ln import ln1
+from trusted_computation.precision import working_precision
+from trusted_computation.series import log_abs, terms_needed
+from trusted_computation.sin import sin1
+
+DIGITS = [10, 60, 300]
+
+
+def kernel(func, x, digits):
+    """按 Main 为数值节点设置的精度调用底层展开函数"""
+    ε = Decimal(10) ** -digits
+    with localcontext(prec=working_precision(max(Decimal(x).adjusted(), 0), ε)):
+        return func(Decimal(x), ε), ε
+
+
+def test_log_abs_handles_values_beyond_float_range():
+    assert log_abs(Decimal("1e-5000")) == pytest.approx(-5000 * 2.302585092994046)
+    assert log_abs(Decimal("-2.5")) == pytest.approx(0.9162907318741551)
+    assert log_abs(0) == float("-inf")
+
+
+def test_terms_needed_returns_smallest_n():
+    assert terms_needed(lambda n: 17.5 - n) == 18
+    assert terms_needed(lambda n: 3 - n, 5) == 5
+    assert terms_needed(lambda n: 1000 - n, 1) == 1001
+
+
+@pytest.mark.parametrize("x", ["0.001", "0.5", "-1", "3", "-3.1415", "100", "12345.678"])
+@pytest.mark.parametrize("digits", DIGITS)
+def test_sin1(x, digits):
+    value, ε = kernel(sin1, x, digits)
+    assert abs(value - reference.sin(x, digits + 10)) < ε
+
+
+@pytest.mark.parametrize("x", ["0.001", "0.1", "-0.5", "1", "-1", "2", "-30", "1e10"])
+@pytest.mark.parametrize("digits", DIGITS)
+def test_arctan1(x, digits):
+    value, ε = kernel(arctan1, x, digits)
+    assert abs(value - reference.atan(x, digits + 10)) < ε
+
+
+@pytest.mark.parametrize("x", ["0.001", "0.5", "0.9999", "1.0001", "2", "10", "1e50", "1e-50"])
+@pytest.mark.parametrize("digits", DIGITS)
+def test_ln1(x, digits):
+    value, ε = kernel(ln1, x, digits)
+    assert abs(value - reference.ln(x, digits + 10)) < ε
+
+
+def test_ln1_rejects_non_positive():
+    with pytest.raises(ValueError):
+        ln1(Decimal(0), Decimal("1e-10"))
+    with pytest.raises(ValueError):
+        ln1(Decimal(-2), Decimal("1e-10"))
@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+import reference
+from trusted_computation.input import parse_expression
+from trusted_computation.lazy import LazyReal, RefinementCache
+from trusted_computation.main import adaptive_main, format_sig_digits
+
+
+def test_refine_matches_direct_evaluation():
+    expression = "e^(sin(2)*3)+ln(3)/arctan(0.5)"
+    x = LazyReal(expression)
+    for sig_digits in (30, 120, 60):
+        direct, _ = adaptive_main(parse_expression(expression), sig_digits)
+        assert x.digits(sig_digits) == format_sig_digits(direct, sig_digits)
+    assert x.sig_digits == 120
+
+
+def test_refine_defaults_to_doubling():
+    x = LazyReal("sqrt(2)")
+    x.evaluate(40)
+    _, ε = x.refine()
+    assert x.sig_digits == 80
+    assert ε < Decimal(10) ** -80
+
+
+def test_fewer_digits_served_from_cache():
+    x = LazyReal("arcsin(0.5)+sqrt(2)")
+    x.evaluate(100)
+    x.evaluate(50)
+    assert x.cache.stats()["misses"] == 0
+
+
+def test_node_memory_bounded():
+    x = LazyReal("(1+sin(1))^100")
+    x.evaluate(200)
+    report = x.memory_report()
+    assert report["entries"] == len(x.cache._entries)
+    # 每个节点只保留与其误差限相称的位数：结果数量级 + 所需位数 + 保护位
+    assert report["max_node_digits"] < 200 + 60
+
+
+def test_rounded_value_keeps_its_error_bound():
+    """舍入到有限位数后记录的误差限包含舍入误差，原样的短值仍按 ε 记录"""
+    cache = RefinementCache()
+    key = ('sin', Decimal(1))
+    exact = reference.sin(1, 200)
+    ε = Decimal("1e-30")
+    cache.store(key, ε, exact)
+    recorded, value = cache._entries[key]
+    assert len(value.as_tuple().digits) < 60
+    assert recorded > ε
+    assert abs(value - exact) <= recorded - ε
+    assert cache.lookup(key, ε) is None
+    assert cache.lookup(key, Decimal("1.0001e-30")) == value
+
+    short = Decimal("0.8414709848078965066525023216302989996")
+    cache.store(('sin', Decimal(2)), ε, short)
+    assert cache._entries[('sin', Decimal(2))] == (ε, short)
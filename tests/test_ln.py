@@ -0,0 +1,32 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.constants import reset_constant_cache
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+
+
+@pytest.mark.parametrize("expr, x", [
+    ("ln(2^1000)", None),
+    ("ln(1e300)", "1e300"),
+    ("ln(3e-200)", "3e-200"),
+    ("ln(0.70710678)", "0.70710678"),
+    ("ln(1.41421357)", "1.41421357"),
+])
+@pytest.mark.parametrize("ε", ["0.1", "1e-30", "1e-200"])
+def test_reduced_ln_within_epsilon(expr, x, ε):
+    """约简 c = m·2^k 后 ln2 的误差被 k 放大，k 很大时仍满足误差限（常数缓存从空开始）"""
+    reset_constant_cache()
+    ε = Decimal(ε)
+    with localcontext(prec=300):
+        expected = 1000 * reference.ln(2, 250) if x is None else reference.ln(x, 250)
+    assert abs(Decimal(Main(parse_expression(expr), ε)) - expected) < ε
+
+
+def test_ln_of_expression():
+    ε = Decimal("1e-50")
+    with localcontext(prec=100):
+        expected = reference.ln(reference.exp(Decimal("0.5"), 80) + 2, 70)
+    assert abs(Decimal(Main(parse_expression("ln(e^0.5 + 2)"), ε)) - expected) < ε
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+import pytest
+
+from trusted_computation import log_util
+from trusted_computation.log_util import (TraceEvent, add_log, clear_log, get_log, get_trace,
+                                          log_enabled, set_log_level)
+
+
+class CountingArg:
+    """记录被转换为字符串的次数"""
+
+    def __init__(self):
+        self.conversions = 0
+
+    def __str__(self):
+        self.conversions += 1
+        return "arg"
+
+
+@pytest.fixture(autouse=True)
+def restore_level():
+    previous = log_util.get_log_level()
+    clear_log()
+    yield
+    set_log_level(previous)
+    clear_log()
+
+
+def test_arguments_formatted_only_when_read():
+    set_log_level("SUMMARY")
+    arg = CountingArg()
+    add_log("值 {}", arg, level="SUMMARY")
+    assert arg.conversions == 0
+    assert get_log() == ["值 arg"]
+    assert arg.conversions == 1
+
+
+@pytest.mark.parametrize("level, recorded", [
+    ("NONE", []),
+    ("SUMMARY", ["摘要"]),
+    ("DETAIL", ["摘要", "细节"]),
+])
+def test_levels(level, recorded):
+    set_log_level(level)
+    add_log("摘要", level="SUMMARY")
+    add_log("细节", level="DETAIL")
+    assert get_log() == recorded
+    assert log_enabled("DETAIL") == (level == "DETAIL")
+
+
+def test_disabled_level_records_nothing():
+    set_log_level("NONE")
+    arg = CountingArg()
+    add_log("值 {}", arg, level="SUMMARY")
+    assert get_trace() == []
+    assert arg.conversions == 0
+
+
+def test_rendering():
+    long_value = Decimal(2).sqrt() * Decimal(10) ** 5
+    event = TraceEvent("x = {}, r = {:.1e}, 规则 {}", (long_value, Decimal("0.000123"), "e^(ln x) = x（x > 0）"), "SUMMARY")
+    text = str(event)
+    assert text.startswith("x = 141421.35623730")
+    assert "..." in text
+    assert "r = 1.2e-4" in text
+    assert text.endswith("规则 e^(ln x) = x（x > 0）")  # 非数值参数不截断
+
+
+def test_literal_braces_without_arguments():
+    set_log_level("SUMMARY")
+    add_log("集合 {1, 2}", level="SUMMARY")
+    assert get_log() == ["集合 {1, 2}"]
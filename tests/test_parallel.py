@@ -0,0 +1,69 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from corpus import CORPUS
+from trusted_computation import parallel
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+
+DIGITS = 50
+EPSILON = Decimal(10) ** -DIGITS
+SUMS = [
+    "+".join(f"sin({k})*e^({k}/7)" for k in range(1, 9)),
+    "(ln(3)+arctan(0.7))/(sin(2)-cos(3))*(e^(1/3)-ln(7))",
+    "-(arctan(2)*ln(5))+e^(sin(1))/(2+cos(1))-sinh(0.3)",
+]
+
+
+def evaluate(expression):
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 30
+        return Main(parse_expression(expression), EPSILON)
+
+
+def test_disabled_by_default():
+    assert not parallel.parallel_enabled()
+    assert parallel.parallel_main(parse_expression("sin(1)+sin(2)"), EPSILON) is None
+
+
+@pytest.fixture(scope="module")
+def offloaded():
+    """开启并行求值，并把提交阈值降到 0，使 50 位的小表达式也拆分到进程池"""
+    parallel.set_parallel(2, min_cost_ms=0, warm_digits=100)
+    submitted = []
+    submit = parallel._pool.submit
+
+    def counting_submit(fn, *args):
+        submitted.append(args[0])
+        return submit(fn, *args)
+
+    parallel._pool.submit = counting_submit
+    yield submitted
+    parallel.set_parallel(0)
+
+
+@pytest.mark.parametrize("expression, reference", CORPUS + [(s, None) for s in SUMS])
+def test_parallel_matches_sequential(offloaded, expression, reference):
+    value = evaluate(expression)
+    enabled, parallel._pool = parallel._pool, None  # 临时关闭，顺序求值作对照
+    try:
+        sequential = evaluate(expression)
+    finally:
+        parallel._pool = enabled
+    assert abs(value - sequential) < 2 * EPSILON
+    if reference is not None:
+        assert abs(value - Decimal(reference)) < EPSILON
+
+
+def test_independent_subtrees_are_offloaded(offloaded):
+    offloaded.clear()
+    evaluate(SUMS[0])
+    assert len(offloaded) >= 8
+
+
+def test_errors_propagate(offloaded):
+    with pytest.raises(ValueError):
+        evaluate("sin(1)*e^2+ln(-1)")
+    with pytest.raises(ZeroDivisionError):
+        evaluate("(sin(1)+cos(1))/(1-1)")
@@ -0,0 +1,88 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import clear_log, get_log
+from trusted_computation.main import Main, adaptive_main, estimate_magnitude, format_sig_digits
+from trusted_computation.precision import (ZERO_SEARCH_DIGITS, epsilon_for_sig_digits, scaled_context,
+                                          set_call_precision, working_precision)
+
+
+def test_epsilon_and_working_precision_follow_magnitude():
+    assert epsilon_for_sig_digits(0, 20) == Decimal("1e-31")
+    assert epsilon_for_sig_digits(5, 20) == Decimal("1e-26")
+    assert epsilon_for_sig_digits(-40, 20) == Decimal("1e-71")
+    assert working_precision(5, Decimal("1e-26")) == 5 + 26 + 1 + 10
+    assert working_precision(-40, Decimal("1e-71")) == 71 + 1 + 10
+
+
+@pytest.mark.parametrize("expr, expected", [
+    ("e^10", lambda d: reference.exp(10, d)),
+    ("ln(2)", lambda d: reference.ln(2, d)),
+    ("sqrt(2)*1e30", lambda d: reference.sqrt(2, d) * Decimal("1e30")),
+    ("sin(1)/1e50", lambda d: reference.sin(1, d) / Decimal("1e50")),
+    ("e^(-300)", lambda d: reference.exp(-300, d)),
+    ("e^(-2000)", lambda d: reference.exp(-2000, d)),
+])
+@pytest.mark.parametrize("sig_digits", [5, 20, 100])
+def test_adaptive_main_gives_requested_significant_digits(expr, expected, sig_digits):
+    result, ε = adaptive_main(parse_expression(expr), sig_digits)
+    with localcontext(prec=sig_digits + 60):
+        reference_value = expected(sig_digits + 30)
+    assert abs(result - reference_value) < ε
+    assert ε < abs(reference_value) * Decimal(10) ** -sig_digits
+    assert format_sig_digits(result, sig_digits) == format_sig_digits(reference_value, sig_digits)
+
+
+def test_tiny_result_refines_magnitude():
+    """结果远小于 10^-(位数+保护位) 时仍按真实数量级推导 ε，而不是退回绝对误差"""
+    assert estimate_magnitude(parse_expression("e^(-300)"), 20) == -131
+    result, ε = adaptive_main(parse_expression("e^(-300)"), 20)
+    assert format_sig_digits(result, 20) == "5.1482002224120137812e-131"
+    assert ε <= Decimal("1e-161")
+
+
+def test_result_indistinguishable_from_zero_reports_absolute_epsilon():
+    assert estimate_magnitude(parse_expression("sin(0)+ln(1)"), 20) is None
+    clear_log()
+    result, ε = adaptive_main(parse_expression("sin(0)+ln(1)"), 20, mode="explain")
+    assert result == 0
+    assert ε == Decimal(10) ** -ZERO_SEARCH_DIGITS
+    assert any("无法保证" in line for line in get_log())
+
+
+def test_rounding_boundary_escalates():
+    """1/8 = 0.125 恰在 2 位有效数字的舍入边界上：提升若干次后仍返回满足误差限的结果"""
+    result, ε = adaptive_main(parse_expression("1/8 + e^(-30)"), 2)
+    assert abs(result - Decimal("0.125") - reference.exp(-30, 40)) < ε
+
+
+@pytest.mark.parametrize("outer_prec", [10, 28, 200])
+@pytest.mark.parametrize("enabled", [True, False])
+def test_scaled_precision_meets_epsilon_for_large_results(outer_prec, enabled):
+    """结果远大于 10^MAGNITUDE_ALLOWANCE 时按实际数量级重算，调用方的精度再低也不截断"""
+    set_call_precision(enabled)
+    try:
+        ε = Decimal("1e-20")
+        with localcontext(prec=outer_prec if enabled else 200):
+            result = Decimal(Main(parse_expression("sin(1)*1e29 + e^3*ln(7)"), ε))
+        with localcontext(prec=120):
+            expected = reference.sin(1, 80) * Decimal("1e29") + reference.exp(3, 80) * reference.ln(7, 80)
+        assert abs(result - expected) < ε
+    finally:
+        set_call_precision(True)
+
+
+def test_scaled_context_depends_only_on_epsilon():
+    with localcontext(prec=5):
+        with scaled_context(Decimal("1e-50"), 2) as ctx:
+            assert ctx.prec == working_precision(2, Decimal("1e-50"))
+    set_call_precision(False)
+    try:
+        with localcontext(prec=77):
+            with scaled_context(Decimal("1e-50")) as ctx:
+                assert ctx.prec == 77
+    finally:
+        set_call_precision(True)
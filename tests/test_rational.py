@@ -0,0 +1,46 @@
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+import pytest
+
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.rational import MAX_RATIONAL_BITS, fold_rationals
+
+EPSILON = Decimal(10) ** -50
+
+
+def evaluate(expression):
+    with localcontext() as ctx:
+        ctx.prec = 80
+        return Main(parse_expression(expression), EPSILON)
+
+
+def test_terminating_chain_folds_to_exact_decimal():
+    folded = fold_rationals(parse_expression("((1.5*2.5)*3.5)^2-0.125"))
+    assert folded == Decimal("172.140625")
+
+
+def test_repeating_fraction_folds_to_rational_node():
+    folded = fold_rationals(parse_expression("1/3+2/7*5/11"))
+    assert folded == ('rational', Fraction(1, 3) + Fraction(10, 77))
+    with localcontext() as ctx:
+        ctx.prec = 80
+        assert abs(evaluate("1/3+2/7*5/11") - Decimal(107) / Decimal(231)) < EPSILON
+
+
+def test_only_algebraic_subtrees_fold():
+    folded = fold_rationals(parse_expression("(1/3+1/6)*sin(2-1)"))
+    assert folded == ('*', Decimal("0.5"), ('sin', Decimal(1)))
+
+
+def test_size_cap():
+    exponent = MAX_RATIONAL_BITS  # 3^exponent 超出上限，不折叠，仍按快速幂计算
+    folded = fold_rationals(parse_expression(f"3^{exponent}/3^{exponent}"))
+    assert isinstance(folded, tuple) and folded[0] == '/'
+    assert abs(evaluate(f"3^{exponent // 8}/3^{exponent // 8 - 1}") - 3) < EPSILON
+
+
+def test_division_by_zero_not_folded():
+    with pytest.raises(ZeroDivisionError):
+        evaluate("1/(2/3-4/6)")
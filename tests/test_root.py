@@ -0,0 +1,56 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+import reference
+from trusted_computation.context import evaluation_context
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.root import root1
+
+
+@pytest.mark.parametrize("c", ["2", "0.5", "1e-300", "123456789.123", "1e400"])
+@pytest.mark.parametrize("n", [2, 3, 7])
+@pytest.mark.parametrize("digits", [10, 100, 1000])
+def test_newton_root_within_epsilon(c, n, digits):
+    ε = Decimal(10) ** -digits
+    with localcontext(prec=digits + 450):
+        c = Decimal(c)
+        expected = reference.sqrt(c, digits + 450) if n == 2 else reference.exp(reference.ln(c, digits + 450) / n, digits + 450)
+        assert abs(root1(c, n, ε) - expected) < ε
+
+
+def test_odd_root_of_negative_and_exact_roots():
+    assert root1(Decimal(-32), 5, Decimal("1e-30")) == -2
+    assert Decimal(Main(parse_expression("root(27, 3)"), Decimal("1e-40"))) == 3
+
+
+@pytest.mark.parametrize("expr", ["sqrt(-2)", "root(-16, 4)", "root(2, 0)", "root(2, 1.5)", "root(8, 1/3)",
+                                  "root(8, sqrt(2))"])
+def test_root_domain_errors(expr):
+    with pytest.raises(ValueError):
+        Main(parse_expression(expr), Decimal("1e-10"))
+
+
+@pytest.mark.parametrize("ε", ["0.1", "1e-30", "1e-300"])
+def test_sqrt_of_expression(ε):
+    ε = Decimal(ε)
+    with localcontext(prec=400):
+        expected = reference.sqrt(reference.exp(1, 350), 350)
+    assert abs(Decimal(Main(parse_expression("sqrt(e)"), ε)) - expected) < ε
+
+
+def test_sqrt_of_argument_near_zero():
+    """被开方数的近似值可能略小于 0：与 0 的距离在误差限内时按 0 处理"""
+    ε = Decimal("1e-20")
+    value = Decimal(Main(parse_expression("sqrt(sin(1)^2 + cos(1)^2 - 1)"), ε))
+    assert abs(value) < ε
+
+
+def test_root_degree_given_by_expression():
+    ε = Decimal("1e-40")
+    assert Decimal(Main(parse_expression("root(8, sqrt(9))"), ε)) == 2
+    with evaluation_context(options={"rational_folding": False}):
+        assert Decimal(Main(parse_expression("root(8, 2+1)"), ε)) == 2
+    with pytest.raises(ValueError, match="开方次数必须是正整数"):
+        Main(parse_expression("root(8, 1/3)"), ε)
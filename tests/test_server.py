@@ -0,0 +1,153 @@
+import json
+import os
+import signal
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import server
+from server import CalculationService, create_server
+from trusted_computation.input import parse_expression
+from trusted_computation.main import adaptive_main, format_sig_digits
+
+SLOW = "+".join(f"sin({k})*e^({k}/7)" for k in range(1, 41))  # 3000 位时需要数秒
+
+
+class FakeExplainer:
+    """代替语言模型：等到 release 之后才给出解释"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def __call__(self, expr, result, log_steps):
+        self.release.wait(10)
+        return f"{expr} = {result}（{len(log_steps)} 步）"
+
+
+@pytest.fixture
+def service():
+    explainer = FakeExplainer()
+    service = CalculationService(workers=2, capacity=2, warm_digits=100, explainer=explainer)
+    server = create_server(service, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    service.url = f"http://127.0.0.1:{server.server_address[1]}"
+    service.fake_explainer = explainer
+    yield service
+    explainer.release.set()
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def call(service, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    request = urllib.request.Request(service.url + path, data=data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_calculate(service):
+    status, body = call(service, "POST", "/calculate", {"expr": "ln(3)/arctan(0.5)", "digits": 60})
+    direct, _ = adaptive_main(parse_expression("ln(3)/arctan(0.5)"), 60)
+    assert status == 200 and body["ok"]
+    assert body["result"] == format_sig_digits(direct, 60)
+    assert "explanation" not in body
+
+
+def test_errors(service):
+    assert call(service, "POST", "/calculate", {"expr": "ln(0)"})[0] == 422
+    assert call(service, "POST", "/calculate", {"digits": 10})[0] == 400
+    assert call(service, "POST", "/calculate", {"expr": "1", "digits": 0})[0] == 400
+    assert call(service, "GET", "/explanations/none")[0] == 404
+    assert call(service, "DELETE", "/jobs/none")[0] == 404
+
+
+def test_explanation_arrives_after_result(service):
+    status, body = call(service, "POST", "/calculate", {"expr": "sin(1)+e", "digits": 30, "explain": True, "id": "a"})
+    assert status == 200 and body["log"]
+    assert body["explanation"] == "/explanations/a"
+    assert call(service, "GET", "/explanations/a")[0] == 202  # 结果已返回，解释仍在生成
+
+    service.fake_explainer.release.set()
+    for _ in range(100):
+        status, explanation = call(service, "GET", "/explanations/a")
+        if status == 200:
+            break
+        time.sleep(0.05)
+    assert explanation["explanation"].startswith(f"sin(1)+e = {body['result']}")
+
+
+def test_admission_control(service):
+    slots = [service._free_slots.get_nowait() for _ in range(service.capacity)]
+    status, body = call(service, "POST", "/calculate", {"expr": "1+1"})
+    assert status == 503 and not body["ok"]
+    for slot in slots:
+        service._free_slots.put(slot)
+    assert call(service, "POST", "/calculate", {"expr": "1+1"})[0] == 200
+
+
+def wait_idle(service):
+    for _ in range(200):
+        if call(service, "GET", "/health")[1]["in_flight"] == 0:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_timeout_stops_the_worker(service):
+    start = time.perf_counter()
+    status, body = call(service, "POST", "/calculate", {"expr": SLOW, "digits": 3000, "timeout": 0.3})
+    assert status == 504 and not body["ok"]
+    assert wait_idle(service)
+    assert time.perf_counter() - start < 5
+
+
+def test_cancel(service):
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(
+        call(service, "POST", "/calculate", {"expr": SLOW, "digits": 3000, "id": "slow"})))
+    thread.start()
+    for _ in range(100):
+        if call(service, "GET", "/health")[1]["in_flight"]:
+            break
+        time.sleep(0.02)
+    time.sleep(0.1)
+    assert call(service, "DELETE", "/jobs/slow")[0] == 200
+    thread.join(5)
+    assert responses[0][0] == 409
+    assert wait_idle(service)  # 工作进程已在下一次调用 Main 时停止
+
+
+def test_worker_crash_restarts_the_pool_once(monkeypatch):
+    service = CalculationService(workers=2, capacity=4, warm_digits=100, explainer=FakeExplainer())
+    restarts = []
+    create_pool = server.create_pool
+    monkeypatch.setattr(server, "create_pool", lambda *args: restarts.append(args) or create_pool(*args))
+    try:
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(
+            service.calculate({"expr": SLOW, "digits": 3000}))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for _ in range(100):
+            if service.health()[1]["in_flight"] == 4:
+                break
+            time.sleep(0.02)
+        time.sleep(0.2)
+        os.kill(next(iter(service.pool._processes)), signal.SIGKILL)
+        for thread in threads:
+            thread.join(30)
+        # 每个在途请求都得到 JSON 响应，损坏的进程池只重启一次
+        assert len(responses) == 4
+        assert all(status in (500, 503) and not body["ok"] for status, body in responses)
+        assert len(restarts) == 1
+        assert service.calculate({"expr": "1+1", "digits": 10})[0] == 200
+    finally:
+        service.close()
@@ -0,0 +1,90 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from trusted_computation.input import parse_expression
+from trusted_computation.log_util import clear_log, get_log
+from trusted_computation.main import Main
+from trusted_computation.rational import fold_rationals
+from trusted_computation.simplify import simplify, simplify_with_trace
+
+EPSILON = Decimal(10) ** -50
+
+
+def prepared(expression):
+    return fold_rationals(simplify(fold_rationals(parse_expression(expression))))
+
+
+def evaluate(expression, mode="compute"):
+    with localcontext() as ctx:
+        ctx.prec = 80
+        return Main(parse_expression(expression), EPSILON, mode=mode)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("sin(pi/2+pi)", Decimal(-1)),
+    ("cos(3*pi)", Decimal(-1)),
+    ("sin(-2*pi)", Decimal(0)),
+    ("tan(pi)", Decimal(0)),
+    ("sec(2*pi)+csc(pi/2)", Decimal(2)),
+    ("ln(e)", Decimal(1)),
+    ("ln(e^(3/4))", Decimal("0.75")),
+])
+def test_exact_values(expression, expected):
+    assert prepared(expression) == expected
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("sin(1+pi/2)", "cos(1)"),
+    ("cos(1-pi/2)", "sin(1)"),
+    ("tan(1+pi/2)", "-cot(1)"),
+    ("sin(1+7*pi/3)", "sin(1+1/3*pi)"),
+    ("--sin(1)", "sin(1)"),
+    ("sin(1)^1*1", "sin(1)"),
+    ("ln(2)-ln(2)", "0"),
+    ("e^(ln(pi))", "pi"),
+])
+def test_rewrites(expression, expected):
+    assert prepared(expression) == prepared(expected)
+
+
+def test_rewritten_values_agree():
+    for expression in ("sin(1+pi/2)", "tan(1+pi/2)", "sin(1+7*pi/3)", "csc(2-3*pi/2)"):
+        assert abs(evaluate(expression) - evaluate(expression.replace("pi", "(1+pi-1.0)"))) < 2 * EPSILON
+
+
+def test_undefined_inputs_still_fail():
+    with pytest.raises(ValueError):
+        evaluate("e^(ln(0-2))")
+    with pytest.raises(ValueError):
+        evaluate("tan(pi/2)")
+    with pytest.raises(ZeroDivisionError):
+        evaluate("1/sin(pi)")
+
+
+@pytest.mark.parametrize("expression", [
+    "ln(-1)-ln(-1)", "arcsin(2)-arcsin(2)", "sqrt(-2)-sqrt(-2)", "ln(0)^0", "1^arcsin(3)", "(ln(1-2)+sin(1))^0",
+])
+def test_rules_that_drop_a_subtree_keep_domain_errors(expression):
+    """x - x = 0、x^0 = 1、1^x = 1 只用于处处有定义的子树"""
+    assert prepared(expression) != Decimal(0) and prepared(expression) != Decimal(1)
+    with pytest.raises(ValueError):
+        evaluate(expression)
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("(sin(1)*e+arctan(2))-(sin(1)*e+arctan(2))", Decimal(0)),
+    ("ln(pi)-ln(pi)", Decimal(0)),
+    ("sqrt(e^2)^0", Decimal(1)),
+    ("1^cosh(3)", Decimal(1)),
+])
+def test_rules_that_drop_a_subtree_on_defined_inputs(expression, expected):
+    assert prepared(expression) == expected
+
+
+def test_trace_in_explain_log():
+    _, trace = simplify_with_trace(parse_expression("ln(e^(sin(1)))"))
+    assert [name for name, _, _ in trace] == ["ln(e^x) = x"]
+    clear_log()
+    evaluate("ln(e^(sin(1)))", mode="explain")
+    assert any("ln(e^x) = x" in step for step in get_log())
@@ -0,0 +1,73 @@
+from decimal import Decimal, localcontext
+
+import pytest
+
+from trusted_computation.input import parse_expression
+from trusted_computation.main import Main
+from trusted_computation.pi import get_pi
+from trusted_computation.sin import sin1, sincos1
+
+DIGITS = 60
+EPSILON = Decimal(10) ** -DIGITS
+
+
+def reference_sincos(x, digits=DIGITS + 40):
+    """用 sin1 在更高精度下分别计算 sin(x) 与 cos(x) = sin(π/2 - x)"""
+    eps = Decimal(10) ** -digits
+    with localcontext() as ctx:
+        ctx.prec = digits + 20
+        return sin1(x, eps), sin1(get_pi(eps / 10) / 2 - x, eps)
+
+
+def evaluate(expression):
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 30
+        return Main(parse_expression(expression), EPSILON)
+
+
+@pytest.mark.parametrize("x", ["1.234", "-0.7", "0.000123", "3.14159", "-1000", "123456.789"])
+@pytest.mark.parametrize("digits", [20, 60, 400])
+def test_sincos1_matches_sin1(x, digits):
+    x = Decimal(x)
+    eps = Decimal(10) ** -digits
+    with localcontext() as ctx:
+        ctx.prec = digits + 15
+        s, c = sincos1(x, eps)
+    ref_s, ref_c = reference_sincos(x, digits + 40)
+    assert abs(s - ref_s) < eps
+    assert abs(c - ref_c) < eps
+
+
+@pytest.mark.parametrize("expression, numerator, denominator", [
+    ("tan(2.5)", "sin", "cos"),
+    ("cot(0.7)", "cos", "sin"),
+    ("sec(1)", None, "cos"),
+    ("csc(-3)", None, "sin"),
+])
+def test_ratios(expression, numerator, denominator):
+    x = Decimal(expression[4:-1])
+    s, c = reference_sincos(x)
+    parts = {"sin": s, "cos": c, None: Decimal(1)}
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 40
+        expected = parts[numerator] / parts[denominator]
+    assert abs(evaluate(expression) - expected) < EPSILON
+
+
+def test_cos_of_expression():
+    _, c = reference_sincos(Decimal("1.5"))
+    assert abs(evaluate("cos(3/2)") - c) < EPSILON
+
+
+def test_tan_near_pole_is_large_but_finite():
+    value = evaluate("tan(1.5707)")
+    s, c = reference_sincos(Decimal("1.5707"))
+    with localcontext() as ctx:
+        ctx.prec = DIGITS + 40
+        assert abs(value - s / c) < EPSILON
+
+
+@pytest.mark.parametrize("expression", ["tan(pi/2)", "cot(pi)", "sec(3*pi/2)", "csc(2*pi)", "cot(pi-pi)"])
+def test_poles_raise(expression):
+    with pytest.raises(ValueError, match="未定义"):
+        evaluate(expression)
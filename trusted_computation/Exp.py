@@ -1,7 +1,12 @@
-from decimal import Decimal, ROUND_HALF_EVEN, InvalidOperation, ROUND_CEILING
-from .factorial import factorial
+from decimal import Decimal, ROUND_HALF_EVEN, InvalidOperation, ROUND_CEILING, localcontext
+import math
+from .series import log_abs, terms_needed
 from .cons import cons
 from .log_util import add_log, get_log_level, format_val
+from .precision import scaled_context, GUARD_DIGITS
+from .constants import get_ln2
+
+_LN2_ESTIMATE = Decimal('0.6931471805599453')  # 仅用于确定约简倍数 k
 
 def Exp(a, epsilon):
     from .main import Main
@@ -28,7 +33,9 @@ def Exp(a, epsilon):
         # add_log(f"【Exp】a 是表达式，粗略计算得到 ã ≈ {a_tilde}（ε′ = 0.1）")
 
         epsilon_double_prime = Decimal('0.2')  # 初始化 ε′′ 为 0.2
-        y1 = Exp1(a_tilde + epsilon_prime, epsilon_double_prime)  # 计算 Exp1
+        # 粗略估计只需与 ε′′ 和 e^(ã+ε′) 的数量级相称的精度
+        with scaled_context(epsilon_double_prime, _exp_magnitude(a_tilde + epsilon_prime)):
+            y1 = Exp1(a_tilde + epsilon_prime, epsilon_double_prime)  # 计算 Exp1
         # add_log(f"用 ã + ε′ = {a_tilde + epsilon_prime} 估算 y1 ≈ {y1}")
 
         # 更新 a_tilde，并调用 Exp1 计算最终结果
@@ -38,10 +45,56 @@ def Exp(a, epsilon):
 
         return Exp1(a_tilde, epsilon / 2)
 
+def _exp_magnitude(c):
+    """
+    e^c 的数量级上界：floor(c · log10(e)) + 1
+    """
+    return max(int(Decimal(c) * Decimal('0.4343')) + 1, 0)
+
+def _exp_terms(c, epsilon):
+    """
+    e^c 泰勒展开所需的项数 n：使 |c|^(n+1)/(n+1)! · (n+2)/(n+2-|c|) < ε
+    """
+    c = abs(c)
+    log_c = log_abs(c)
+    log_eps = log_abs(epsilon)
+
+    def log_bound(n):
+        return ((n + 1) * log_c - math.lgamma(n + 2)
+                + math.log((n + 2) / (n + 2 - float(c))) - log_eps)
+
+    return terms_needed(log_bound, max(int(c.to_integral_exact(rounding=ROUND_CEILING)), 1))
+
+def _exp_series(t, epsilon):
+    """
+    直接对 t 做泰勒展开计算 e^t（t 可正可负，|t| 越小项数越少），满足误差限 epsilon
+    """
+    if t == 0:
+        return Decimal(1), 0
+
+    # 由余项上界 R_n ≤ |t|^(n+1)/(n+1)! · (n+2)/(n+2-|t|) < ε 直接估计项数 n
+    n = _exp_terms(t, epsilon)
+    # add_log(f"根据余项上界估计展开项数 n = {n}")
+    term = Decimal(1)  # 初始化第一项为 1
+    result = term  # 初始化结果为第一项
+
+    # 每一项由前一项递推：t^i/i! = t^(i-1)/(i-1)! · t / i
+    for i in range(1, n + 1):
+        term = term * t / i
+        result += term  # 累加每一项
+        # add_log(f"第 {i} 项: {term}，累计结果: {result}")
+    return result, n
+
 def Exp1(c, epsilon):
-    from .main import Main
     """
-    计算 e^c，使用泰勒展开，满足误差限 epsilon。
+    计算 e^c，先做参数约简再泰勒展开，满足误差限 epsilon。
+
+    约简：c = k·ln2 + r（|r| ≤ ln2/2），再令 t = r / 2^s，
+    e^c = 2^k · (e^t)^(2^s)。展开项数只取决于 |t|，与 |c| 无关；负指数无需再做除法。
+
+    误差分配（相对误差 η = min(ε / 2^(k+1), 0.01)，2^(k+1) 是 e^c 的上界；2^(k+1) < ε/2 时直接返回 0）：
+    ln2 的误差经 k 放大不超过 η/8，e^t 的截断误差经 s 次平方放大不超过 η/4，
+    平方与乘 2^k 的舍入误差由额外的 s·log10(2) 位保护位吸收。
 
     参数:
     c -- 输入值
@@ -53,44 +106,38 @@ def Exp1(c, epsilon):
     c = Decimal(c)  # 将输入值转换为 Decimal 类型，以便进行高精度计算
     log_level = get_log_level()
 
-    if c < 0:
-        add_log("【exp】指数为负，转化为 1 / exp(|c|)", level="SUMMARY")
-        y = Exp1(-c, epsilon)
-        result = Decimal(Main(('/', 1, y), epsilon))
-        # add_log(f"最终结果：1 / {y} = {result}")
-        return Decimal(result)
+    if c == 0:
+        return Decimal(1)
 
     # ========= 日志摘要 =========
     if log_level != "NONE":
-        # 【修改这里】截断 c 的显示长度，避免打印几百位小数
-        c_str = str(c)
-        if len(c_str) > 20:
-            c_str = c_str[:20] + "..."
+        add_log("【exp】使用泰勒展开计算 e^{}", c, level="SUMMARY")
+
+    # k = round(c / ln2)，只需粗略的 ln2 即可确定
+    k = int((c / _LN2_ESTIMATE).to_integral_value())
+    bound = Decimal(2) ** (k + 1)
+    if 2 * bound < epsilon:
+        # 负指数很大时 0 < e^c < 2^(k+1) < ε/2，直接返回 0 即满足误差限
+        return Decimal(0)
+    # 相对误差预算，至多 1%（否则粗略 ε 下负指数的 η 远大于 1，约简与平方的误差分析不再成立）
+    eta = min(Decimal(epsilon) / bound, Decimal('0.01'))
+    digits = max(-eta.adjusted(), 1)
+    s = int(math.sqrt(digits))  # 平方次数：在展开项数与平方次数之间折中
+
+    with localcontext() as ctx:
+        # c - k·ln2 需容纳 c 的整数位，平方放大舍入误差需额外 s·log10(2) 位
+        ctx.prec = digits + max(c.adjusted(), 0) + 1 + int(s * 0.302) + GUARD_DIGITS
+        ln2 = get_ln2(eta / (8 * max(abs(k), 1)))
+        t = (c - k * ln2) / (2 ** s)
+        y, n = _exp_series(t, eta / (4 * 2 ** s))
+        for _ in range(s):
+            y *= y
+        result = y * Decimal(2) ** k
 
-        add_log(f"【exp】使用泰勒展开计算 e^{c_str}", level="SUMMARY")
-
-    # 初始化 n 为 max(|c|向上取整, 1)
-    n = max(int(abs(c).to_integral_exact(rounding=ROUND_CEILING)), 1)
-    # add_log(f"根据 |c| 估计初始展开项数上限 n = {n}")
-    i = Decimal(1)  # 初始化求和循环次数为 1
-    term = Decimal(1)  # 初始化第一项为 1
-    result = term  # 初始化结果为第一项
-
-    # 计算满足误差条件的n
-    while 2 * c ** n >= factorial(n - 1) * (n - c) * epsilon:
-        # print(f"left right: {2 * c ** n} {factorial(n - 1) * (n - c) * epsilon}")
-        # add_log(f"误差校验不通过：n = {n}，扩大 n")
-        n += 1
-    while i <= n:
-        term = c ** i / factorial(i)  # 更新每一项的计算
-        result += term  # 累加每一项
-        # add_log(f"第 {int(i)} 项: {term}，累计结果: {result}")
-        i += 1
+    if log_level != "NONE":
+        add_log("【exp】参数约简：e^c = 2^{0} · (e^t)^(2^{1})，t = (c - {0}·ln2) / 2^{1}", k, s, level="SUMMARY")
 
     # ========= 日志：只记录项数 =========
     if log_level == "SUMMARY":
-        add_log(
-            f"【exp】泰勒展开 {n} 项，满足误差界 |R_n| < ε",
-            level="SUMMARY"
-        )
-    return Decimal(result)
\ No newline at end of file
+        add_log("【exp】泰勒展开 {} 项，满足误差界 |R_n| < ε", n, level="SUMMARY")
+    return Decimal(result)
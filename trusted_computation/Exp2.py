@@ -1,6 +1,12 @@
 from fractions import Fraction
-from decimal import Decimal
+from decimal import Decimal, localcontext
+from .cons import cons
+from .div import div
 from .log_util import add_log, get_log_level
+from .precision import working_precision
+from .rational import exact_rational
+
+_MAX_ROOT_DEGREE = 32  # 有理指数 p/q 走开方路线的最大分母
 
 def get_fraction(a2):
     """
@@ -21,6 +27,57 @@ def get_fraction(a2):
     return n, m
 
 
+def _binary_power(x, n):
+    """
+    二进制快速幂（平方-乘），n 为非负整数，在当前 Decimal 上下文中计算
+    """
+    result = Decimal(1)
+    while n:
+        if n & 1:
+            result *= x
+        n >>= 1
+        if n:
+            x *= x
+    return result
+
+
+def _integer_power(a1, n, epsilon):
+    from .main import Main
+    """
+    计算 a1^n（n 为整数），满足误差限 epsilon。
+
+    误差传播：|a^n - b^n| ≤ n·M^(n-1)·|a - b|，其中 M 是 |a| 与 |b| 的共同上界。
+    先以 0.1 粗略估计底数得到 M = |ã| + 0.2，再给底数分配 δ = ε / (2·n·M^(n-1))；
+    快速幂在足以使舍入误差小于 ε/2 的精度下进行。负整数次幂转化为 1 / a^|n|。
+    """
+    if n == 0:
+        if not isinstance(a1, (int, float, Decimal)):
+            Main(a1, Decimal('0.1'))  # 底数无定义（如 ln(0)^0）时照常报错
+        return Decimal(1)
+    if n < 0:
+        # 底数精确为 0（折叠与化简后的 0^(-1)、(pi-pi)^(-2) 等）：除数是表达式，div 的 Step 3 无法把它与 0 分开
+        if exact_rational(a1) == 0:
+            raise ZeroDivisionError("除数为 0")
+        return div(1, ('exp', a1, Decimal(-n)), epsilon)
+
+    epsilon = Decimal(epsilon)
+    if isinstance(a1, (int, float, Decimal)):
+        base = Decimal(a1)  # 常数底数是精确的
+    else:
+        bound = abs(Decimal(Main(a1, Decimal('0.1')))) + Decimal('0.2')
+        delta = cons(epsilon / (2 * n * bound ** (n - 1)))
+        base = Decimal(Main(a1, delta))
+
+    if base.is_zero():
+        return Decimal(0)
+
+    # 结果数量级约为 n·log10|base|；每次乘法的相对舍入误差要乘以乘法次数，多留 log10(2·bit_length) 位
+    magnitude = int(n * (base.adjusted() + 1))
+    with localcontext() as ctx:
+        ctx.prec = working_precision(magnitude, epsilon / 2) + len(str(2 * n.bit_length()))
+        return +_binary_power(base, n)
+
+
 def Exp2(a1, a2, epsilon):
     from .main import Main
     """
@@ -35,39 +92,44 @@ def Exp2(a1, a2, epsilon):
     近似值 y ≈ a1^a2，满足 |y - a1^a2| < epsilon
     """
 
-    # 【修改】同时截断底数和指数
-    a1_str = str(a1)
-    if len(a1_str) > 20: a1_str = a1_str[:20] + "..."
-
-    a2_str = str(a2)
-    if len(a2_str) > 20: a2_str = a2_str[:20] + "..."
-
-    add_log(f"【Exp2】计算 {a1_str}^{a2_str}", level="SUMMARY")
+    # 底数和指数由日志在读取时截断显示，这里不做字符串转换
+    add_log("【Exp2】计算 {}^{}", a1, a2, level="SUMMARY")
+
+    # 指数是精确的整数或小分母有理数时，不经过 exp/ln
+    exponent = exact_rational(a2)
+    if exponent is not None:
+        if exponent.denominator == 1:
+            add_log("指数为整数 {}，使用二进制快速幂", exponent, level="SUMMARY")
+            return _integer_power(a1, exponent.numerator, epsilon)
+        if exponent.denominator <= _MAX_ROOT_DEGREE:
+            # a^(p/q) = (a^(1/q))^p，负底数配奇数 q 时结果为实数，偶数 q 由 root 报定义域错误
+            add_log("指数为有理数 {}，转化为开 {} 次方后再求整数次幂", exponent, exponent.denominator, level="SUMMARY")
+            return Main(('exp', ('root', a1, Decimal(exponent.denominator)),
+                         Decimal(exponent.numerator)), epsilon)
 
     a1_val = Decimal(Main(a1, epsilon))  # 正确获取 a1 的值
-    a2_val = Decimal(Main(a2, epsilon))  # 同理处理 a2
 
-    add_log(f"底数 ≈ {a1_str}, 指数 ≈ {a2_str}", level="DETAIL")
+    add_log("底数 ≈ {}, 指数 ≈ {}", a1_val, a2, level="DETAIL")
 
     # 特殊情况：如果 a1 = 0，直接返回 0
     if a1_val == 0:
-        add_log(f"特例：底数为 0 ⇒ 结果为 0", level="SUMMARY")
+        add_log("特例：底数为 0 ⇒ 结果为 0", level="SUMMARY")
         return Decimal(0)
 
     # 如果 a1 > 0，直接计算 exp(a2 * ln(a1))
     if a1_val > 0:
-        add_log(f"底数 > 0，转化为 exp(a2 × ln(a1)) 计算", level="SUMMARY")
+        add_log("底数 > 0，转化为 exp(a2 × ln(a1)) 计算", level="SUMMARY")
         return Main(('exp1', ('*', a2, ('ln', a1))), epsilon)
 
     # 如果 a1 < 0，根据 n 和 m 的奇偶性分别处理
     if a1_val < 0:
         # 计算 a2 的简分数表示 n/m
         n, m = get_fraction(a2)
-        add_log(f"底数 < 0，指数化为分数 {n}/{m}", level="SUMMARY")
+        add_log("底数 < 0，指数化为分数 {}/{}", n, m, level="SUMMARY")
 
         if n % 2 == 0:  # 如果 n 是偶数
-            add_log(f"分子为偶数 ⇒ 结果为实数：exp(a2 × ln(-a1))", level="SUMMARY")
+            add_log("分子为偶数 ⇒ 结果为实数：exp(a2 × ln(-a1))", level="SUMMARY")
             return Main(('exp1', ('*', a2, ('ln', ('-', a1)))), epsilon)
         else:  # 如果 n 是奇数
-            add_log(f"分子为奇数 ⇒ 结果为负数：-exp(a2 × ln(-a1))", level="SUMMARY")
+            add_log("分子为奇数 ⇒ 结果为负数：-exp(a2 × ln(-a1))", level="SUMMARY")
             return -Main(('exp1', ('*', a2, ('ln', ('-', a1)))), epsilon)
\ No newline at end of file
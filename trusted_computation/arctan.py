@@ -1,7 +1,11 @@
-from decimal import Decimal, getcontext
+from decimal import Decimal, getcontext, localcontext
 from .pi import get_pi
 from .log_util import add_log, get_log_level
 import math
+from .series import log_abs, terms_needed
+from .precision import working_precision
+
+_REDUCTION_THRESHOLD = Decimal('0.125')  # 半角约简的目标：|c| < 1/8
 
 def arctan(a, epsilon):
     """
@@ -29,9 +33,21 @@ def arctan(a, epsilon):
         return Main(('arctan', a_tilde), epsilon / 2)  # 返回 arctan(a_tilde) 的结果
         # return Main(Decimal(math.atan(a_tilde)), epsilon / 2)
 
+def _arctan_terms(c, epsilon):
+    """
+    arctan(c)（|c| < 1）泰勒展开的首个可舍去项序号 n：|c|^(2n+1)/(2n+1) < ε/2
+    """
+    log_c = log_abs(c)
+    log_eps = log_abs(Decimal(epsilon) / 2)
+
+    def log_bound(n):
+        return (2 * n + 1) * log_c - math.log(2 * n + 1) - log_eps
+
+    return terms_needed(log_bound, 1)
+
 def arctan1(c, epsilon):
     """
-    计算反正切 arctan(c)，使用泰勒展开，满足误差限 epsilon。
+    计算反正切 arctan(c)，先用半角公式约简到 |c| < 1/8 再泰勒展开，满足误差限 epsilon。
 
     参数:
     c -- 输入值，是一个数值
@@ -44,48 +60,60 @@ def arctan1(c, epsilon):
     from .main import Main  # **在函数内部导入 Main，避免循环导入**
 
     c = Decimal(c)  # 将输入值转换为 Decimal 类型，以便进行高精度计算
-    epsilon_high = Decimal('1E-1000')
     log_level = get_log_level()  # 获取当前日志等级
 
     if c == Decimal('1'):
-        # 快速路径：arctan(1) = π/4
-        pi_val = get_pi(epsilon_high)
-        add_log(f"【arctan】特例 arctan(1) = π/4", level="SUMMARY")
-        return Main(('/', pi_val, 4), epsilon)
-
-    # 如果 c 不在区间 [-1, 1]，使用变换公式
-    if abs(c) > 1:
-        # 使用公式：arctan(c) = 2 * arctan(c / (1 + sqrt(1 + c^2)))
-        add_log(f"【arctan】|x| > 1，使用变换公式 arctan(x) = 2*arctan(x/(1+sqrt(1+x^2)))", level="SUMMARY")
-        transformed_c = c / (1 + (1 + c ** 2).sqrt())  # 计算 c / (1 + sqrt(1 + c^2))
-        # add_log(f"变换后 c̃ ≈ {transformed_c}，递归调用 arctan")
-        return Main(('*', 2, ('arctan', ('/', c, ('+', 1, ('exp', ('+', 1, ('exp', c, 2)), ('/', 1, 2)))))), epsilon)  # 递归调用计算反正切(错误版)
-
-    # 泰勒展开路径
-    if log_level != "NONE":
-        # 【修改】截断过长的 c
-        c_str = str(c)
-        if len(c_str) > 20:
-            c_str = c_str[:20] + "..."
-
-        add_log(f"【arctan】使用泰勒展开计算 arctan({c_str})", level="SUMMARY")
-
-    # 如果 c 在区间 [-1, 1] 内，使用泰勒级数展开计算反正切
-    n = 1
-    term = c  # 第一项是 c
-    result = term  # 初始化结果为第一项
-    # add_log(f"【arctan1】使用泰勒展开计算 arctan({c})，初始项: {term}")
-
-    # 循环计算每一项，直到满足误差条件
-    while abs(c ** (2 * n + 1) / (2 * n + 1)) >= epsilon / 2:  # 判断当前项是否满足精度要求
-        # print(f"term, {term}")
-        term = Decimal((-1) ** n * c ** (2 * n + 1) / (2 * n + 1))  # 更新项：(-1)^n * x^(2n+1) / (2n+1)!
-        result += term  # 累加当前项
-        # add_log(f"第 {n} 项: {term}，累计结果: {result}")
-        n += 1
+        # 快速路径：arctan(1) = π/4（π 的误差除以 4 后不超过 ε/4，除法再分配 ε/2）
+        pi_val = get_pi(epsilon)
+        add_log("【arctan】特例 arctan(1) = π/4", level="SUMMARY")
+        return Main(('/', pi_val, 4), epsilon / 2)
+
+    if c == Decimal('-1'):
+        # 快速路径：arctan(-1) = -π/4（|c| = 1 时级数不收敛）
+        pi_val = get_pi(epsilon)
+        add_log("【arctan】特例 arctan(-1) = -π/4", level="SUMMARY")
+        return -Main(('/', pi_val, 4), epsilon / 2)
+
+    if c.is_zero():
+        return Decimal(0)
+
+    with localcontext() as ctx:
+        # 半角约简的每一步都有舍入误差，最终还要乘 2^j，多留几位保护位
+        ctx.prec = working_precision(0, epsilon) + 5
+
+        # 半角约简：arctan(c) = 2·arctan(c / (1 + sqrt(1 + c^2)))，直接用 Decimal 开方，
+        # 重复到 |c| < 1/8。即使 |c| 很大，第一步后也不超过 1，一般只需 4~5 步
+        doublings = 0
+        while abs(c) >= _REDUCTION_THRESHOLD:
+            c = c / (1 + (1 + c * c).sqrt())
+            doublings += 1
+
+        if doublings and log_level != "NONE":
+            add_log("【arctan】半角约简 {} 次：arctan(x) = 2*arctan(x/(1+sqrt(1+x^2)))", doublings, level="SUMMARY")
+
+        # 泰勒展开路径
+        if log_level != "NONE":
+            add_log("【arctan】使用泰勒展开计算 arctan({})", c, level="SUMMARY")
+
+        # 约简后的级数误差要乘 2^j，因此分配 ε / 2^j
+        series_epsilon = Decimal(epsilon) / 2 ** doublings
+
+        # 由 |c|^(2n+1)/(2n+1) < ε/2 直接估计首个可舍去项序号 n（交错级数）
+        n = _arctan_terms(c, series_epsilon)
+        c_squared = c * c
+        power = c  # (-1)^k c^(2k+1)，由前一项乘以 -c^2 递推
+        result = c  # 初始化结果为第一项
+        # add_log(f"【arctan1】使用泰勒展开计算 arctan({c})，初始项: {c}")
+
+        for k in range(1, n):
+            power = -power * c_squared
+            result += power / (2 * k + 1)  # 累加当前项 (-1)^k c^(2k+1)/(2k+1)
+            # add_log(f"第 {k} 项: {power / (2 * k + 1)}，累计结果: {result}")
+
+        result *= 2 ** doublings
 
     # === 关键修改：循环结束后只记录一条总结 ===
     if log_level == "SUMMARY":
-        add_log(f"【arctan】展开 {n} 项，满足误差限，结果收敛", level="SUMMARY")
+        add_log("【arctan】展开 {} 项，满足误差限，结果收敛", n, level="SUMMARY")
 
-    return Main(Decimal(result), epsilon / 2)  # 通过 main 函数计算前 n 项的和，精度为 epsilon/2
\ No newline at end of file
+    return Decimal(result)
@@ -0,0 +1,301 @@
+from decimal import (Decimal, Context, localcontext, getcontext, ROUND_CEILING, ROUND_FLOOR,
+                     MAX_EMAX, MIN_EMIN, Inexact)
+import math
+from .series import log_abs
+from .log_util import add_log
+from .precision import GUARD_DIGITS, working_precision, MAGNITUDE_ALLOWANCE
+
+# 中点-半径（球）算术求值引擎：与 Main 的 ε 反向分配不同，
+# 每个节点只按当前工作精度前向求值一次，得到 [mid - rad, mid + rad] 形式的球，
+# 半径按运算规则向上传播（包含子节点的半径、内核的截断误差和舍入误差）。
+# 整棵树求值后若根节点半径不小于 ε，则将工作精度加倍后整棵树重算。
+
+MAX_RESTARTS = 6  # 工作精度最多加倍的次数，超过后认为结果无法确定
+
+# 半径只需要几位有效数字，在低精度下按定向舍入计算，保证得到的是上界（或下界）
+_UP = Context(prec=10, rounding=ROUND_CEILING, Emax=MAX_EMAX, Emin=MIN_EMIN)
+_DOWN = Context(prec=10, rounding=ROUND_FLOOR, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+class BallPrecisionError(ArithmeticError):
+    """
+    当前工作精度下球太宽，无法继续运算（如除数的球包含 0、对数的参数球越过 0）
+    """
+
+
+class Ball:
+    """
+    中点-半径形式的区间：真值 x 满足 |x - mid| ≤ rad
+    """
+    __slots__ = ("mid", "rad")
+
+    def __init__(self, mid, rad=Decimal(0)):
+        self.mid = mid
+        self.rad = rad
+
+    def __repr__(self):
+        return f"Ball({self.mid} ± {self.rad})"
+
+    def lower(self):
+        """|x| 的下界（球包含 0 时为 0）"""
+        return max(_DOWN.subtract(abs(self.mid), self.rad), Decimal(0))
+
+    def exact(self):
+        return self.rad.is_zero()
+
+
+def _ulp(x):
+    """
+    当前上下文中把某个精确结果舍入为 x 的误差上界
+    """
+    if x.is_zero():
+        return Decimal(0)
+    return Decimal(1).scaleb(x.adjusted() - getcontext().prec + 1)
+
+
+def _rounded(compute):
+    """
+    执行一次 Decimal 运算，返回 (结果, 舍入误差上界)；运算精确时误差为 0
+    """
+    flags = getcontext().flags
+    flags[Inexact] = False
+    value = compute()
+    return value, (_ulp(value) if flags[Inexact] else Decimal(0))
+
+
+def _kernel_epsilon(magnitude, prec):
+    """
+    数量级为 magnitude 的内核结果在 prec 位精度下的目标绝对误差
+    """
+    return Decimal(1).scaleb(magnitude - prec)
+
+
+class BallEvaluator:
+    """
+    以给定工作精度 prec（有效数字位数）对表达式树做一次前向球求值
+
+    同一次求值中相同的子树只计算一次
+    """
+
+    def __init__(self, prec):
+        self.prec = prec
+        self.memo = {}
+
+    def evaluate(self, a):
+        if isinstance(a, tuple):
+            ball = self.memo.get(a)
+            if ball is None:
+                ball = self._evaluate(a)
+                self.memo[a] = ball
+            return ball
+        return self._evaluate(a)
+
+    def _evaluate(self, a):
+        if isinstance(a, (int, float, Decimal)):
+            value = Decimal(str(a)) if isinstance(a, float) else Decimal(a)
+            return Ball(*_rounded(lambda: +value))  # 超出工作精度的常数在这里舍入
+
+        if isinstance(a, str):
+            from .constants import get_pi, get_e
+            getter = {'pi': get_pi, 'e': get_e}.get(a.lower())
+            if getter is None:
+                raise ValueError(f"计算时无法解析的表达式: {a}")
+            eta = _kernel_epsilon(0, self.prec)
+            return Ball(getter(eta), eta)
+
+        if not isinstance(a, tuple):
+            raise ValueError(f"计算时无法解析的表达式: {a}")
+
+        op = a[0]
+        handler = _HANDLERS.get(op)
+        if handler is not None:
+            return handler(self, *a[1:])
+        rewrite = _REWRITES.get(op)
+        if rewrite is not None:
+            return self.evaluate(rewrite(*a[1:]))
+        raise ValueError(f"无法解析的操作: {op}")
+
+    # === 算术运算 ===
+
+    def add(self, x, y):
+        mid, error = _rounded(lambda: x.mid + y.mid)
+        return Ball(mid, _UP.add(_UP.add(x.rad, y.rad), error))
+
+    def neg(self, x):
+        return Ball(-x.mid, x.rad)
+
+    def multiply(self, x, y):
+        # |xy - x'y'| ≤ |x|·r_y + |y|·r_x + r_x·r_y
+        mid, error = _rounded(lambda: x.mid * y.mid)
+        rad = _UP.add(_UP.multiply(abs(x.mid), y.rad), _UP.multiply(abs(y.mid), x.rad))
+        rad = _UP.add(_UP.add(rad, _UP.multiply(x.rad, y.rad)), error)
+        return Ball(mid, rad)
+
+    def divide(self, x, y):
+        # |x/y - x'/y'| ≤ (r_x + |x/y|·r_y) / (|y| - r_y)
+        if y.lower().is_zero():
+            if y.exact():
+                raise ZeroDivisionError("除数为 0")
+            raise BallPrecisionError("除数的球包含 0")
+        mid, error = _rounded(lambda: x.mid / y.mid)
+        quotient = _UP.add(abs(mid), error)
+        rad = _UP.divide(_UP.add(x.rad, _UP.multiply(quotient, y.rad)), y.lower())
+        return Ball(mid, _UP.add(rad, error))
+
+    def power(self, x, n):
+        """
+        整数次幂：二进制快速幂，每次乘法都按球乘法传播半径
+        """
+        if n < 0:
+            return self.divide(Ball(Decimal(1)), self.power(x, -n))
+        result = Ball(Decimal(1))
+        while n:
+            if n & 1:
+                result = self.multiply(result, x)
+            n >>= 1
+            if n:
+                x = self.multiply(x, x)
+        return result
+
+    def rational(self, value):
+        """折叠后的精确有理数：一次除法，半径为舍入误差"""
+        return Ball(*_rounded(lambda: Decimal(value.numerator) / Decimal(value.denominator)))
+
+    # === 初等函数：mid 由内核在目标误差 η 下计算，半径加上参数半径的传播 ===
+
+    def exp(self, x):
+        from .Exp import Exp1
+        # e^(m±r) - e^m ≤ e^m·(e^r - 1) ≤ e^m·r·(1 + 2r)（r ≤ 1）
+        if x.rad > 1:
+            raise BallPrecisionError("指数的球半径过大")
+        magnitude = math.floor(float(x.mid) / math.log(10)) if abs(x.mid) < 10 ** 15 else 0
+        eta = _kernel_epsilon(magnitude, self.prec)
+        mid = Decimal(Exp1(x.mid, eta))
+        growth = _UP.multiply(x.rad, _UP.add(1, _UP.multiply(2, x.rad)))
+        rad = _UP.add(_UP.multiply(_UP.add(abs(mid), eta), growth), eta)
+        return Ball(mid, rad)
+
+    def ln(self, x):
+        from .ln import ln1
+        # ln 在 [m - r, ∞) 上的导数不超过 1/(m - r)
+        if x.mid + x.rad <= 0:
+            raise ValueError(f"ln({x.mid}) 未定义，ln(x),x必须为正数")
+        if x.mid - x.rad <= 0:
+            raise BallPrecisionError("对数的参数球越过 0")
+        log_value = log_abs(x.mid)
+        magnitude = math.floor(math.log10(abs(log_value))) if abs(log_value) > 1 else 0
+        eta = _kernel_epsilon(magnitude, self.prec)
+        mid = Decimal(ln1(x.mid, eta))
+        rad = _UP.add(_UP.divide(x.rad, x.lower()), eta) if not x.exact() else eta
+        return Ball(mid, rad)
+
+    def sin(self, x):
+        from .sin import sin1
+        eta = _kernel_epsilon(0, self.prec)
+        mid = Decimal(sin1(x.mid, eta))
+        return Ball(mid, _UP.add(min(x.rad, Decimal(2)), eta))
+
+    def arctan(self, x):
+        from .arctan import arctan1
+        eta = _kernel_epsilon(0, self.prec)
+        mid = Decimal(arctan1(x.mid, eta))
+        return Ball(mid, _UP.add(x.rad, eta))
+
+    def root(self, x, n):
+        from .root import root1, _root_degree
+        # x^(1/n) 在 [L, ∞) 上的导数 L^(1/n) / (n·L) ≤ (y + η) / (n·L)，y 为中点的根
+        n = _root_degree(n)
+        if x.exact() and x.mid.is_zero():
+            return Ball(Decimal(0))
+        if n % 2 == 0 and x.mid + x.rad < 0:
+            raise ValueError(f"偶次方根的被开方数必须非负: {x.mid}")
+        if x.lower().is_zero():
+            raise BallPrecisionError("被开方数的球包含 0")
+        eta = _kernel_epsilon(x.mid.adjusted() // n, self.prec)
+        mid = Decimal(root1(x.mid, n, eta))
+        if x.exact():
+            return Ball(mid, eta)
+        slope = _UP.divide(_UP.add(abs(mid), eta), _DOWN.multiply(n, x.lower()))
+        return Ball(mid, _UP.add(_UP.multiply(x.rad, slope), eta))
+
+    def general_power(self, a1, a2):
+        """
+        a1^a2：指数为精确整数时用快速幂，小分母有理数时先开方，否则 exp(a2·ln a1)
+        """
+        from .Exp2 import _MAX_ROOT_DEGREE
+        from .rational import exact_rational
+        exponent = exact_rational(a2)
+        base = self.evaluate(a1)
+        if exponent is not None and exponent.denominator == 1:
+            if exponent == 0:
+                return Ball(Decimal(1))
+            return self.power(base, exponent.numerator)
+        if exponent is not None and exponent.denominator <= _MAX_ROOT_DEGREE:
+            return self.power(self.root(base, exponent.denominator), exponent.numerator)
+
+        power = self.evaluate(a2)
+        if base.exact() and base.mid.is_zero():
+            if power.mid - power.rad > 0:
+                return Ball(Decimal(0))
+            raise ValueError("0 的非正数次幂没有定义")
+        if base.mid + base.rad < 0:
+            raise ValueError(f"负底数 {base.mid} 的非有理数次幂没有实数结果")
+        return self.exp(self.multiply(power, self.ln(base)))
+
+
+_HANDLERS = {
+    '+': lambda ev, x, y: ev.add(ev.evaluate(x), ev.evaluate(y)),
+    '-': lambda ev, x, y=None: (ev.neg(ev.evaluate(x)) if y is None
+                                else ev.add(ev.evaluate(x), ev.neg(ev.evaluate(y)))),
+    '*': lambda ev, x, y: ev.multiply(ev.evaluate(x), ev.evaluate(y)),
+    '/': lambda ev, x, y: ev.divide(ev.evaluate(x), ev.evaluate(y)),
+    'exp1': lambda ev, x: ev.exp(ev.evaluate(x)),
+    'exp': lambda ev, x, y: ev.general_power(x, y),
+    'ln': lambda ev, x: ev.ln(ev.evaluate(x)),
+    'sin': lambda ev, x: ev.sin(ev.evaluate(x)),
+    'arctan': lambda ev, x: ev.arctan(ev.evaluate(x)),
+    'sqrt': lambda ev, x: ev.root(ev.evaluate(x), 2),
+    'root': lambda ev, x, n: ev.root(ev.evaluate(x), n),
+    'rational': lambda ev, value: ev.rational(value),
+}
+
+# 其余运算与 _Main 一样改写为基本运算
+_REWRITES = {
+    'log': lambda x, y: ('/', ('ln', y), ('ln', x)),
+    'cos': lambda x: ('sin', ('+', x, ('/', 'pi', 2))),
+    'tan': lambda x: ('/', ('sin', x), ('cos', x)),
+    'cot': lambda x: ('/', ('cos', x), ('sin', x)),
+    'sec': lambda x: ('/', 1, ('cos', x)),
+    'csc': lambda x: ('/', 1, ('sin', x)),
+    'arcsin': lambda x: ('*', 2, ('arctan', ('/', x, ('+', 1, ('sqrt', ('-', 1, ('exp', x, 2))))))),
+    'arccos': lambda x: ('-', ('/', 'pi', 2), ('arcsin', x)),
+    'arccot': lambda x: ('-', ('/', 'pi', 2), ('arctan', x)),
+    'sinh': lambda x: ('/', ('-', ('exp1', x), ('exp1', ('-', x))), 2),
+    'cosh': lambda x: ('/', ('+', ('exp1', x), ('exp1', ('-', x))), 2),
+    'tanh': lambda x: ('-', 1, ('/', 2, ('+', ('exp1', ('*', 2, x)), 1))),  # x 只出现一次，球不会因相关性变宽
+}
+
+
+def ball_main(a, ε):
+    """
+    用球算术计算表达式 a，返回满足 |y - 真值| < ε 的近似值 y
+
+    工作精度从 ε 与结果数量级余量推导，每次整棵树求值一次；
+    根节点半径不小于 ε（或中途某个球太宽）时精度加倍重算
+    """
+    ε = Decimal(ε)
+    prec = working_precision(MAGNITUDE_ALLOWANCE, ε)
+    for attempt in range(MAX_RESTARTS + 1):
+        try:
+            with localcontext() as ctx:
+                ctx.prec = prec
+                ball = BallEvaluator(prec - GUARD_DIGITS).evaluate(a)
+            add_log("【ball】以 {} 位精度求值，结果半径 {:.1e}", prec, ball.rad, level="SUMMARY")
+            if ball.rad < ε:
+                return ball.mid
+        except BallPrecisionError as error:
+            add_log("【ball】以 {} 位精度求值失败：{}", prec, error, level="SUMMARY")
+            if attempt == MAX_RESTARTS:
+                raise ValueError(f"精度提高到 {prec} 位仍无法确定结果：{error}")
+        prec *= 2
+    raise ValueError(f"精度提高到 {prec // 2} 位仍无法使结果半径小于 ε")
@@ -0,0 +1,93 @@
+from decimal import Decimal, Context, localcontext, MAX_PREC, MAX_EMAX, MIN_EMIN, Inexact, Rounded
+import math
+from .series import log_abs, terms_needed
+
+# 二分拆分（binary splitting）求超几何型级数：
+#   S = Σ_{n=0}^{N-1} a(n)/b(n) · p(0)·p(1)···p(n) / (q(0)·q(1)···q(n))
+# 其中 a, b, p, q 都是返回整数的函数。区间 [n1, n2) 的部分和用四个整数 P, Q, B, T 表示：
+#   P = Π p(n)，Q = Π q(n)，B = Π b(n)，部分和 = T / (B·Q)
+# 合并左右两半只需整数乘法，全程精确，最后只做一次 Decimal 除法。
+# 这样计算 10^5 位以上的常数时，乘法在大整数上进行，不会在每一项上付出整段精度的代价。
+#
+# 区间较短时用 Python 整数；区间更长时整数已有数千位，改用精度为 MAX_PREC 的 Decimal 整数：
+# 运算同样精确（Inexact/Rounded 被设为陷阱），但大数乘法走 libmpdec 的数论变换，
+# 也避免了在最后把百万位的 Python 整数转换成 Decimal（该转换是平方复杂度）。
+
+_INTEGER_RANGE = 128  # 不超过该项数的区间用 Python 整数合并
+
+_EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN, traps=[Inexact, Rounded])
+
+
+def _merge(left, right):
+    """
+    合并左右两半（左半 l = [n1, m)，右半 r = [m, n2)）：
+    P = Pl·Pr，Q = Ql·Qr，B = Bl·Br，T = Br·Qr·Tl + Bl·Pl·Tr
+    """
+    pl, ql, bl, tl = left
+    pr, qr, br, tr = right
+    return pl * pr, ql * qr, bl * br, br * qr * tl + bl * pl * tr
+
+
+def binary_split(a, b, p, q, n1, n2):
+    """
+    返回区间 [n1, n2) 上级数的 (P, Q, B, T)，满足部分和 = T / (B·Q)
+
+    短区间返回 Python 整数，长区间返回精确的 Decimal 整数
+    """
+    if n2 - n1 == 1:
+        pn = p(n1)
+        return pn, q(n1), b(n1), a(n1) * pn
+
+    m = (n1 + n2) // 2
+    left = binary_split(a, b, p, q, n1, m)
+    right = binary_split(a, b, p, q, m, n2)
+    if n2 - n1 <= _INTEGER_RANGE:
+        return _merge(left, right)
+    with localcontext(_EXACT_CONTEXT):
+        return _merge([Decimal(x) for x in left], [Decimal(x) for x in right])
+
+
+def series_sum(a, b, p, q, terms):
+    """
+    用二分拆分求级数前 terms 项之和，在当前 Decimal 上下文中做唯一的一次除法
+    """
+    _, big_q, big_b, big_t = binary_split(a, b, p, q, 0, terms)
+    with localcontext(_EXACT_CONTEXT):
+        denominator = Decimal(big_b) * Decimal(big_q)
+    return Decimal(big_t) / denominator
+
+
+def _one(n):
+    return 1
+
+
+def e_series(epsilon):
+    """
+    e = Σ 1/n!（p(n) = 1，q(0) = 1，q(n) = n），余项 Σ_{n≥N} 1/n! < 2/N! < ε/2
+    """
+    log_eps = log_abs(Decimal(epsilon) / 2)
+
+    def log_bound(n):
+        return math.log(2) - math.lgamma(n + 1) - log_eps
+
+    terms = terms_needed(log_bound, 1)
+    return series_sum(_one, _one, _one, lambda n: n if n else 1, terms)
+
+
+def atanh_inverse(m, epsilon):
+    """
+    计算 2·atanh(1/m) = ln((m+1)/(m-1))（整数 m ≥ 2），满足误差限 epsilon
+
+    2·atanh(1/m) = 2 Σ 1/((2n+1)·m^(2n+1))：a(n) = 2，b(n) = 2n+1，q(0) = m，q(n) = m²。
+    余项不超过 2 / ((2N+1)·m^(2N+1)·(1 - 1/m²)) < ε/2
+    """
+    m = int(m)
+    log_m = math.log(m)
+    log_rest = math.log(2) - math.log1p(-1 / m ** 2) - log_abs(Decimal(epsilon) / 2)
+
+    def log_bound(n):
+        return log_rest - (2 * n + 1) * log_m - math.log(2 * n + 1)
+
+    terms = terms_needed(log_bound, 1)
+    return series_sum(lambda n: 2, lambda n: 2 * n + 1, _one,
+                      lambda n: m * m if n else m, terms)
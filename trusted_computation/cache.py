@@ -0,0 +1,96 @@
+from decimal import Decimal
+from .context import get_context
+
+# 一次求值（一次顶层 Main 调用）内的近似值缓存：
+# 以子树为键，保存目前算出的最紧近似 (ε, 值)。
+# 对更宽松的 ε 请求直接返回缓存值，只有请求更紧的 ε 时才重新计算。
+# 当前使用的缓存和最近一次的命中统计保存在求值上下文中（见 context.py）
+
+
+class ApproxCache:
+    """
+    子树近似值缓存
+
+    键为表达式子树（元组或常数名），值为 (ε, 近似值)，
+    保证 |近似值 - 子树真值| < ε。
+    parents 记录本次求值中各共享节点的父节点个数（见 dag.count_parents）。
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.parents = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, a, ε):
+        """
+        查找满足误差限 ε 的近似值，命中返回 Decimal，否则返回 None
+        """
+        entry = self._entries.get(a)
+        if entry is not None and entry[0] <= ε:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def approximation(self, a):
+        """
+        返回子树 a 已缓存的近似值（不论其误差限），没有时返回 None；
+        可用于预先得知子树结果的数量级
+        """
+        entry = self._entries.get(a)
+        return entry[1] if entry is not None else None
+
+    def store(self, a, ε, value):
+        """
+        记录子树 a 在误差限 ε 下的近似值，只保留最紧的那一个
+        """
+        entry = self._entries.get(a)
+        if entry is None or ε < entry[0]:
+            self._entries[a] = (Decimal(ε), value)
+
+    def stats(self):
+        """
+        返回命中/未命中次数及缓存条目数
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self):
+        self._entries.clear()
+        self.parents.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def is_cacheable(a):
+    """
+    只有表达式子树和常数名值得缓存，纯数值直接转换即可
+    """
+    return isinstance(a, (tuple, str))
+
+
+def get_active_cache():
+    """
+    获取当前求值使用的缓存（没有正在进行的求值时为 None）
+    """
+    return get_context().cache
+
+
+def set_active_cache(cache):
+    """
+    设置当前求值使用的缓存；结束求值时传入 None，并保存本次的统计结果
+    """
+    context = get_context()
+    if cache is None and context.cache is not None:
+        context.last_stats = context.cache.stats()
+    context.cache = cache
+
+
+def get_cache_stats():
+    """
+    获取缓存命中统计：正在求值时返回当前统计，否则返回最近一次顶层求值的统计
+    """
+    context = get_context()
+    if context.cache is not None:
+        return context.cache.stats()
+    return dict(context.last_stats)
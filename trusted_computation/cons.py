@@ -14,18 +14,9 @@ def cons(value):
     if value <= 0:
         raise ValueError("Cons 函数输入值必须为正数")
 
-    # 使用 math.log10(value) 计算 value 的以 10 为底的对数，这表示 value 的数量级。
-    # 使用 math.floor 将对数值向下取整，获取 value 所在的数量级
-    power = -int(value.log10())  # 使用 Decimal 类型的 log10 方法
-
-    # 计算候选值 10 的 −power 次方，即 10 的负整数次幂
-    candidate = Decimal(10) ** (-power)
-
-    # 如果候选值不大于 value，直接返回它。如果候选值大于 value，选择下一个更小的次幂 10^−(power+1)
-    if candidate <= value:
-        chosen = candidate
-    else:
-        chosen = Decimal(10) ** (-(power + 1))
+    # value 的十进制指数（科学计数法中首位数字的指数）就是 floor(log10(value))，
+    # 10 的该次方即为不大于 value 的最大 10 的整数次幂；无需按上下文精度计算 log10
+    chosen = Decimal(1).scaleb(value.adjusted())
 
     # add_log(f"【cons】cons({value}) = {chosen}，选取的不大于该值的最大 10 的负整数次幂")
     return chosen
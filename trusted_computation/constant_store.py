@@ -0,0 +1,229 @@
+from decimal import Decimal
+import json
+import mmap
+import os
+import tempfile
+import zlib
+
+# 常数的磁盘存储：每个常数一个数字文件，进程启动后以内存映射方式打开，
+# 只读取（并校验）请求所需的前缀，不必重新计算。
+#
+# 文件格式（版本 1）：
+#   第一行是 JSON 头：{"format", "version", "name", "error", "length", "block_size", "crc32"}
+#     error      -- 所存数值与真值之差的上界（字符串形式的 Decimal）
+#     length     -- 数字部分的字节数
+#     crc32      -- 数字部分按 block_size 分块的 CRC32 列表
+#   其后是数值的定点十进制表示（如 "3.14159..."），没有换行
+# 写入时先写临时文件再原子替换，多个进程同时写入也不会读到半个文件。
+
+STORE_FORMAT = "trusted-computation-constant"
+STORE_VERSION = 1
+STORE_BLOCK_SIZE = 1 << 16
+STORE_MIN_DIGITS = 1000  # 写入磁盘时至少保存的小数位数，使常见请求第一次计算后即可直接读取
+STORE_DIR_ENV = "TRUSTED_COMPUTATION_CONSTANT_DIR"  # 设为空字符串可关闭磁盘存储
+
+_store_dir = os.environ.get(STORE_DIR_ENV, os.path.join(os.path.expanduser("~"), ".cache", "trusted_computation"))
+_mapped = {}  # 常数名 -> _MappedConstant
+
+
+class _MappedConstant:
+    """
+    一个已内存映射的常数文件：解析好的文件头、数字部分的偏移，以及已校验过的块
+    """
+
+    def __init__(self, file, mapping, header, offset):
+        self.file = file
+        self.mapping = mapping
+        self.header = header
+        self.offset = offset
+        self.error = Decimal(header["error"])
+        self.length = header["length"]
+        self.point = mapping.find(b".", offset, offset + min(self.length, STORE_BLOCK_SIZE))
+        self.verified = set()
+
+    def integer_length(self):
+        """数字部分中小数点之前的字节数"""
+        if self.point < 0:
+            return self.length
+        return self.point - self.offset
+
+    def fraction_digits(self):
+        """文件中小数点后的位数"""
+        if self.point < 0:
+            return 0
+        return self.length - self.integer_length() - 1
+
+    def read(self, end):
+        """
+        读取数字部分的前 end 个字节，所涉及的块在首次读取时校验 CRC，校验失败返回 None
+        """
+        block_size = self.header["block_size"]
+        for index in range((end - 1) // block_size + 1):
+            if index in self.verified:
+                continue
+            start = self.offset + index * block_size
+            block = self.mapping[start:min(start + block_size, self.offset + self.length)]
+            if zlib.crc32(block) != self.header["crc32"][index]:
+                return None
+            self.verified.add(index)
+        return self.mapping[self.offset:self.offset + end].decode("ascii")
+
+    def close(self):
+        self.mapping.close()
+        self.file.close()
+
+
+def set_store_directory(path):
+    """
+    设置常数文件所在目录；传入 None 或空字符串关闭磁盘存储
+    """
+    global _store_dir
+    close_store()
+    _store_dir = path or ""
+
+
+def get_store_directory():
+    """
+    获取常数文件所在目录（关闭磁盘存储时为空字符串）
+    """
+    return _store_dir
+
+
+def store_enabled():
+    return bool(_store_dir)
+
+
+def _store_path(name):
+    return os.path.join(_store_dir, f"{name}.digits")
+
+
+def _open_mapped(name):
+    """
+    打开并内存映射常数文件，文件不存在、版本不符或头部损坏时返回 None
+    """
+    mapped = _mapped.get(name)
+    if mapped is not None:
+        return mapped
+
+    try:
+        file = open(_store_path(name), "rb")
+    except OSError:
+        return None
+    try:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # 空文件无法映射
+        file.close()
+        return None
+
+    try:
+        newline = mapping.find(b"\n")
+        header = json.loads(mapping[:newline].decode("utf-8"))
+        valid = (newline > 0 and header.get("format") == STORE_FORMAT
+                 and header.get("version") == STORE_VERSION and header.get("name") == name
+                 and newline + 1 + header["length"] == len(mapping)
+                 and len(header["crc32"]) == -(-header["length"] // header["block_size"]))
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        mapping.close()
+        file.close()
+        return None
+
+    mapped = _MappedConstant(file, mapping, header, newline + 1)
+    _mapped[name] = mapped
+    return mapped
+
+
+def _enough_digits(mapped, ε):
+    """
+    返回 (文件是否足够, 需读取的小数位数 k, 读取后的误差上界)
+    """
+    digits = min(max(-ε.adjusted() + 1, 0), mapped.fraction_digits())
+    error = 2 * max(mapped.error, Decimal(1).scaleb(-digits))  # 两项误差之和的上界，保持简短的表示
+    return error < ε, digits, error
+
+
+def load_constant(name, ε):
+    """
+    从磁盘读取常数 name 的前缀，返回 (误差上界, 值)，误差上界小于 ε；
+    文件不存在、校验失败或位数不足时返回 None
+
+    取小数点后 k 位时截断误差小于 10^-k，与文件本身的误差相加后必须小于 ε
+    """
+    if not store_enabled():
+        return None
+    ε = Decimal(ε)
+    mapped = _open_mapped(name)
+    if mapped is not None and not _enough_digits(mapped, ε)[0]:
+        # 其他进程可能已写入位数更多的文件，重新映射一次
+        _mapped.pop(name).close()
+        mapped = _open_mapped(name)
+    if mapped is None:
+        return None
+
+    enough, digits, error = _enough_digits(mapped, ε)
+    if not enough:
+        return None
+
+    end = mapped.integer_length() + (1 + digits if digits else 0)
+    text = mapped.read(end)
+    if text is None:
+        # 校验失败：删除损坏的文件，随后重新计算时会写入新文件
+        _mapped.pop(name).close()
+        try:
+            os.remove(_store_path(name))
+        except OSError:
+            pass
+        return None
+    return error, Decimal(text)
+
+
+def save_constant(name, error, value):
+    """
+    把常数 name 的近似值（误差上界 error）写入磁盘；已有文件更精确时不覆盖。
+    写入失败（如目录只读）时静默放弃，常数仍可在内存中使用
+    """
+    if not store_enabled():
+        return
+    error = Decimal(error)
+    existing = _open_mapped(name)
+    if existing is not None and existing.error <= error:
+        return
+
+    text = format(Decimal(value), "f").encode("ascii")
+    crcs = [zlib.crc32(text[i:i + STORE_BLOCK_SIZE]) for i in range(0, len(text), STORE_BLOCK_SIZE)]
+    header = {
+        "format": STORE_FORMAT,
+        "version": STORE_VERSION,
+        "name": name,
+        "error": str(error),
+        "length": len(text),
+        "block_size": STORE_BLOCK_SIZE,
+        "crc32": crcs,
+    }
+
+    try:
+        os.makedirs(_store_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=_store_dir)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(json.dumps(header).encode("utf-8") + b"\n")
+                file.write(text)
+            # 替换前先关闭本进程对旧文件的映射
+            if existing is not None:
+                _mapped.pop(name).close()
+            os.replace(temp_path, _store_path(name))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass
+
+
+def close_store():
+    """
+    关闭所有已映射的常数文件
+    """
+    for mapped in _mapped.values():
+        mapped.close()
+    _mapped.clear()
@@ -0,0 +1,128 @@
+from decimal import Decimal, localcontext
+import threading
+from .binsplit import atanh_inverse, e_series
+from .cons import cons
+from .constant_store import load_constant, save_constant, store_enabled, STORE_MIN_DIGITS
+from .precision import working_precision
+from .log_util import get_log_level, set_log_level
+
+# 精度感知的常数缓存：每个常数保存目前算出的最紧近似 (ε, 值)，
+# 更宽松的请求直接复用缓存值，更紧的请求才重新计算并覆盖缓存。
+# 常数按名字注册计算函数 f(ε)，f 在与 ε 相称的精度下返回满足 |值 - 真值| < ε 的近似
+_constant_cache = {}
+# 常数缓存由进程内的所有计算共享：读取已有的足够精确的值不加锁，
+# 计算、读盘与写回在锁内进行（可重入：ln10 的计算会请求 ln2），同一常数不会被并发地重复计算
+_constant_lock = threading.RLock()
+
+CONSTANT_GUARD = Decimal('0.1')  # 计算时的误差限比请求再紧一位，便于后续略紧的请求直接命中
+
+
+def _compute_ln2(epsilon):
+    """
+    ln2 = 18·atanh(1/26) - 2·atanh(1/4801) + 8·atanh(1/8749)，各项用二分拆分求和
+    （不能走 ln1 的约简，否则循环依赖）。三项的误差经系数放大后各不超过 ε/3
+    """
+    return (9 * atanh_inverse(26, epsilon / 27) - atanh_inverse(4801, epsilon / 3)
+            + 4 * atanh_inverse(8749, epsilon / 12))
+
+
+def _compute_pi(epsilon):
+    from .pi import _compute_pi
+    return _compute_pi(epsilon)
+
+
+def _compute_e(epsilon):
+    """
+    e = Σ 1/n!，用二分拆分求和（不走 Exp1 的约简，否则依赖 ln2）
+    """
+    return e_series(epsilon)
+
+
+def _compute_ln10(epsilon):
+    """
+    ln10 = 3·ln2 + ln(1.25)，其中 ln(1.25) = 2·atanh(1/9)，收敛很快
+    """
+    return 3 * get_ln2(epsilon / 8) + atanh_inverse(9, epsilon / 2)
+
+
+_CONSTANT_COMPUTERS = {
+    "pi": _compute_pi,
+    "e": _compute_e,
+    "ln2": _compute_ln2,
+    "ln10": _compute_ln10,
+}
+
+
+def get_constant(name, ε):
+    """
+    返回常数 name 的近似值，满足 |值 - 真值| < ε
+
+    缓存值的误差限不大于 ε 时直接返回；否则先尝试从磁盘的数字文件读取所需前缀，
+    文件不存在或位数不足时在与 ε 相称的独立精度下重新计算，并写回磁盘。
+    ε 先取为不大于它的 10 的整数次幂，使相近的请求共享同一个缓存值
+    """
+    ε = cons(Decimal(ε))
+    entry = _constant_cache.get(name)
+    if entry is not None and entry[0] <= ε:
+        return entry[1]
+    with _constant_lock:
+        return _load_or_compute(name, ε)
+
+
+def _load_or_compute(name, ε):
+    """get_constant 的慢路径（持有 _constant_lock）"""
+    entry = _constant_cache.get(name)  # 等待锁期间可能已由其他线程算好
+    if entry is not None and entry[0] <= ε:
+        return entry[1]
+
+    stored = load_constant(name, ε)
+    if stored is not None:
+        _constant_cache[name] = stored
+        return stored[1]
+
+    target = ε * CONSTANT_GUARD
+    if store_enabled():
+        # 写入磁盘的数字文件至少保存 STORE_MIN_DIGITS 位，之后的常见请求都直接读取文件
+        target = min(target, Decimal(1).scaleb(-STORE_MIN_DIGITS))
+    previous_level = get_log_level()
+    set_log_level("NONE")  # 常数的计算过程不写入解释日志
+    try:
+        with localcontext() as ctx:
+            ctx.prec = working_precision(0, target)
+            value = _CONSTANT_COMPUTERS[name](target)
+    finally:
+        set_log_level(previous_level)
+    _constant_cache[name] = (target, value)
+    save_constant(name, target, value)
+    return value
+
+
+def get_pi(ε):
+    """返回满足误差限 ε 的 π"""
+    return get_constant("pi", ε)
+
+
+def get_e(ε):
+    """返回满足误差限 ε 的 e"""
+    return get_constant("e", ε)
+
+
+def get_ln2(ε):
+    """返回满足误差限 ε 的 ln2"""
+    return get_constant("ln2", ε)
+
+
+def get_ln10(ε):
+    """返回满足误差限 ε 的 ln10"""
+    return get_constant("ln10", ε)
+
+
+def reset_constant_cache(name=None):
+    """
+    清空常数缓存；给出 name 时只清空该常数
+    """
+    with _constant_lock:
+        if name is None:
+            _constant_cache.clear()
+        else:
+            _constant_cache.pop(name, None)
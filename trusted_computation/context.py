@@ -0,0 +1,160 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import localcontext
+
+# 求值上下文：一次计算的全部可变状态（日志、日志等级、子树缓存及其统计），
+# 由 contextvars 携带，不再是模块级全局变量。
+#
+# 每个线程第一次使用时得到自己的上下文；同一线程或同一事件循环中并发的计算
+# （如 asyncio 的多个任务）用 evaluation_context() 各自开启新的上下文，互不干扰。
+# Decimal 的工作精度本身就保存在按线程、按任务隔离的 decimal 上下文中，
+# evaluation_context(prec=...) 只是同时为本次计算设定它。
+#
+# 求值选项（按调用缩放精度、代数化简、有理数折叠、节点共享的开关）同样属于上下文：
+# 各模块的 set_xxx 只改变当前上下文，不影响其他线程或任务中同时进行的计算。
+# evaluation_context() 开启的新上下文沿用外层上下文的选项，线程第一次使用时取 DEFAULT_OPTIONS。
+#
+# 进程级的共享数据（常数缓存、表达式共享表、求值计划缓存）由各自模块加锁保护，
+# 它们只保存与选项无关的结果。
+#
+# 上下文还可以带有截止时间与取消检查：Main 每次被调用时检查一次（check_interrupt），
+# 超时或被取消时抛出异常，整个求值随之中止。这是协作式的，单个算子内部的长循环不会被打断。
+
+DEFAULT_LOG_LEVEL = "DETAIL"
+
+# 求值选项的默认值
+DEFAULT_OPTIONS = {
+    "call_precision": True,    # 按调用缩放的工作精度（precision.py）
+    "simplification": True,    # 求值前的代数化简（simplify.py）
+    "rational_folding": True,  # 精确有理数折叠（rational.py）
+    "sharing": True,           # 表达式节点共享（dag.py）
+}
+
+# 各日志等级下记录的事件等级
+LOG_LEVELS = {
+    "NONE": frozenset(),
+    "SUMMARY": frozenset({"SUMMARY"}),
+    "DETAIL": frozenset({"SUMMARY", "DETAIL"}),
+}
+
+
+class EvaluationTimeout(TimeoutError):
+    """计算超出了时间限制"""
+
+
+class EvaluationCancelled(Exception):
+    """计算被取消"""
+
+
+class EvaluationContext:
+    """
+    一次（或同一调用方连续几次）计算的状态
+
+    log_steps  -- 计算日志（TraceEvent 列表）
+    log_level  -- 日志等级：NONE / SUMMARY / DETAIL
+    recorded   -- 当前等级下记录的事件等级（add_log 的快速判断用）
+    cache      -- 正在进行的顶层求值所使用的子树缓存，没有时为 None
+    last_stats -- 最近一次顶层求值的缓存命中统计
+    deadline   -- 截止时间（time.monotonic() 的值），None 表示不限时
+    cancelled  -- 无参数的函数，返回真值表示计算已被取消；None 表示不可取消
+    options    -- 求值选项（键见 DEFAULT_OPTIONS）
+    last_sinhcosh -- 最近一次 sinhcosh1 的 ((x, ε, 精度), 结果)，见 hyperbolic.py
+    """
+    __slots__ = ("log_steps", "log_level", "recorded", "cache", "last_stats", "deadline", "cancelled",
+                 "options", "last_sinhcosh")
+
+    def __init__(self, log_level=DEFAULT_LOG_LEVEL, deadline=None, cancelled=None, options=None):
+        if log_level not in LOG_LEVELS:
+            raise ValueError("Invalid log level")
+        self.log_steps = []
+        self.log_level = log_level
+        self.recorded = LOG_LEVELS[log_level]
+        self.cache = None
+        self.last_stats = {"hits": 0, "misses": 0, "entries": 0}
+        self.deadline = deadline
+        self.cancelled = cancelled
+        self.options = dict(DEFAULT_OPTIONS)
+        if options:
+            self.set_options(options)
+        self.last_sinhcosh = None
+
+    def set_log_level(self, level):
+        if level not in LOG_LEVELS:
+            raise ValueError("Invalid log level")
+        self.log_level = level
+        self.recorded = LOG_LEVELS[level]
+
+    def set_options(self, options):
+        unknown = set(options) - set(DEFAULT_OPTIONS)
+        if unknown:
+            raise ValueError(f"未知的求值选项: {', '.join(sorted(unknown))}")
+        self.options.update((name, bool(value)) for name, value in options.items())
+
+
+_current = ContextVar("trusted_computation_context")
+
+
+def get_context():
+    """
+    获取当前的求值上下文；当前线程（或任务）还没有时新建一个
+    """
+    try:
+        return _current.get()
+    except LookupError:
+        context = EvaluationContext()
+        _current.set(context)
+        return context
+
+
+def get_option(name):
+    """
+    读取当前上下文中的求值选项
+    """
+    return get_context().options[name]
+
+
+def set_option(name, value):
+    """
+    设置当前上下文中的求值选项（只影响当前线程或任务中的计算）
+    """
+    get_context().set_options({name: value})
+
+
+def check_interrupt():
+    """
+    当前计算已超过截止时间时抛出 EvaluationTimeout，已被取消时抛出 EvaluationCancelled
+    """
+    context = get_context()
+    if context.deadline is not None and time.monotonic() > context.deadline:
+        raise EvaluationTimeout("计算超出时间限制")
+    if context.cancelled is not None and context.cancelled():
+        raise EvaluationCancelled("计算已取消")
+
+
+@contextmanager
+def evaluation_context(log_level=DEFAULT_LOG_LEVEL, prec=None, deadline=None, cancelled=None, options=None):
+    """
+    在新的求值上下文中执行一段计算，退出时恢复原来的上下文
+
+        with evaluation_context(log_level="SUMMARY", prec=60) as context:
+            result = Main(parse_expression("sin(1)"), Decimal(10) ** -50, mode=None)
+            steps = get_log()
+
+    prec 不为 None 时同时在局部 decimal 上下文中设定工作精度；
+    deadline、cancelled 见 EvaluationContext，由 Main 通过 check_interrupt 检查；
+    新上下文沿用外层上下文的求值选项，options（如 {"simplification": False}）覆盖其中的部分选项
+    """
+    context = EvaluationContext(log_level, deadline, cancelled, get_context().options)
+    if options:
+        context.set_options(options)
+    token = _current.set(context)
+    try:
+        if prec is None:
+            yield context
+        else:
+            with localcontext() as ctx:
+                ctx.prec = prec
+                yield context
+    finally:
+        _current.reset(token)
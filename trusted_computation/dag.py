@@ -0,0 +1,142 @@
+from itertools import count
+import threading
+from .context import get_option, set_option
+
+# 表达式的哈希共享（hash-consing）表示：结构相同的子树只对应一个节点对象。
+#
+# 解析器和 _Main 的改写规则（log、arcsin 等把参数复制两三份）都经过 intern，
+# 同一个参数在 DAG 中只有一个节点，子树缓存因此能识别出共享，
+# 被多个父节点引用的节点在第一次计算时就取更紧的误差限，后续父节点直接命中。
+# 共享表在进程内的所有表达式之间共用，引用计数因此按每次求值统计（count_parents），
+# 而不是记录在节点上：无关的表达式用到同一子树，不会使本次求值中只出现一次的节点被当作共享。
+#
+# 节点是 tuple 的子类，与原来的嵌套元组表示完全兼容（a[0]、a[1:]、isinstance(a, tuple) 照常可用），
+# 只是哈希值在创建时算好并缓存；字典查找先比较同一性，缓存查找不再随树的大小增长。
+
+MAX_NODES = 100000  # 共享表的最大节点数，超过后清空重建（已有节点仍然有效，只是不再参与共享）
+
+
+class Node(tuple):
+    """
+    哈希共享的表达式节点
+
+    id -- 节点编号，在进程内唯一
+    """
+
+    def __new__(cls, items, node_id):
+        self = super().__new__(cls, items)
+        self.id = node_id
+        self._hash = tuple.__hash__(self)
+        return self
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # 跨进程传递时在目标进程中重新共享
+        return intern, (tuple(self),)
+
+
+class ExprDAG:
+    """
+    节点共享表：键为 (运算, 子节点...)，子节点本身已经共享，因此查找只需常数时间
+    """
+
+    def __init__(self, max_nodes=MAX_NODES):
+        self.max_nodes = max_nodes
+        self._nodes = {}
+        self._ids = count()
+        self._lock = threading.Lock()  # 多个线程同时解析时，同一结构只创建一个节点
+
+    def node(self, op, *args):
+        """
+        返回运算 op 作用于 args 的共享节点，args 中的子表达式应已共享
+        """
+        key = (op,) + args
+        existing = self._nodes.get(key)
+        if existing is not None:
+            return existing
+        with self._lock:
+            existing = self._nodes.get(key)
+            if existing is not None:
+                return existing
+            if len(self._nodes) >= self.max_nodes:
+                self._nodes.clear()
+            new = Node(key, next(self._ids))
+            self._nodes[key] = new
+            return new
+
+    def intern(self, a):
+        """
+        把嵌套元组表示的表达式转换为共享节点；数值与常数名原样返回
+        """
+        if not isinstance(a, tuple) or isinstance(a, Node):
+            return a
+        return self.node(a[0], *(self.intern(x) for x in a[1:]))
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def clear(self):
+        with self._lock:
+            self._nodes.clear()
+
+
+_dag = ExprDAG()
+
+
+def set_sharing(enabled: bool):
+    """
+    在当前求值上下文中开启或关闭节点共享（关闭时 intern 原样返回普通元组，用于基准对比）
+    """
+    set_option("sharing", enabled)
+
+
+def sharing_enabled():
+    return get_option("sharing")
+
+
+def get_dag():
+    """
+    获取进程内使用的节点共享表
+    """
+    return _dag
+
+
+def node(op, *args):
+    if not get_option("sharing"):
+        return (op,) + args
+    return _dag.node(op, *args)
+
+
+def intern(a):
+    if not get_option("sharing"):
+        return a
+    return _dag.intern(a)
+
+
+def count_parents(a, parents):
+    """
+    统计表达式 a 中每个节点被多少个不同的父节点引用，累加到 parents（节点 -> 父节点个数）
+
+    已在 parents 中的子树之前已经统计过，不再展开：同一次求值中改写规则产生的新子树
+    只需在求值前调用一次，即可把它对已有节点的引用计入
+    """
+    if not isinstance(a, Node) or a in parents:
+        return
+    parents[a] = 0
+    stack = [a]
+    while stack:
+        for arg in set(x for x in stack.pop()[1:] if isinstance(x, Node)):
+            if arg in parents:
+                parents[arg] += 1
+            else:
+                parents[arg] = 1
+                stack.append(arg)
+
+
+def is_shared(a, parents):
+    """
+    节点在本次求值中是否被多个父节点引用（表达式或改写规则中出现多次），parents 由 count_parents 统计
+    """
+    return parents.get(a, 0) > 1
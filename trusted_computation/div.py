@@ -16,14 +16,12 @@ def div(a1, a2, epsilon):
     """
     from .main import Main  # **在函数内部导入 Main，避免循环导入**
 
-    # 【修改】截断操作数
-    a1_str = str(a1)
-    if len(a1_str) > 20: a1_str = a1_str[:20] + "..."
+    # 操作数由日志在读取时截断显示，这里不做字符串转换
+    add_log("【Div】执行除法 {} ÷ {}", a1, a2, level="SUMMARY")
 
-    a2_str = str(a2)
-    if len(a2_str) > 20: a2_str = a2_str[:20] + "..."
-
-    add_log(f"【Div】执行除法 {a1_str} ÷ {a2_str}", level="SUMMARY")
+    # 精确的 0 除数（如折叠后的 2/3 - 4/6）：Step 3 的循环永远无法把它与 0 分开
+    if isinstance(a2, (int, float, Decimal)) and Decimal(a2) == 0:
+        raise ZeroDivisionError("除数为 0")
 
     # Step 1: 初步估算分子 a1
     a1_tilde = Decimal(Main(a1, Decimal('0.1')))  # 将结果转换为 Decimal 类型
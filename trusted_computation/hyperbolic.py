@@ -0,0 +1,176 @@
+from decimal import Decimal, getcontext, localcontext
+from .Exp import Exp1, _exp_magnitude
+from .sin import _sin_terms, _halvings
+from .cons import cons
+from .context import get_context
+from .log_util import add_log, get_log_level
+from .precision import scaled_context, GUARD_DIGITS
+
+# 双曲函数 sinh、cosh、tanh：e^|x| 只计算一次，sinh 与 cosh 都由它得到。
+#
+# 原来 sinh(x) 按 (e^x - e^(-x))/2 展开成表达式，两个指数函数各自展开、各自分配误差，
+# 外层的减法和除以 2 又各走一次 Main。现在：
+#   |x| ≥ SERIES_THRESHOLD：y = e^|x|，sinh = (y - 1/y)/2，cosh = (y + 1/y)/2，tanh = (1 - u)/(1 + u)（u = e^(-2|x|)）；
+#   |x| < SERIES_THRESHOLD：展开 sinh 的泰勒级数（只有奇次项，收敛很快），
+#   cosh = sqrt(1 + sinh²)，tanh = sinh / cosh，避免在 0 附近先算两个接近 1 的数再相减。
+
+SERIES_THRESHOLD = Decimal("0.5")  # 低于此值时 sinh 级数比指数函数的约简与平方更快
+
+# 同一参数的 sinh 与 cosh（如 sinh(x) + cosh(x)）共用一次计算：最近一次 sinhcosh1 的
+# ((x, ε, 精度), 结果) 保存在求值上下文中（EvaluationContext.last_sinhcosh），并发的计算互不干扰
+
+
+def _sinh_series(x, epsilon):
+    """
+    sinh(x) 的泰勒展开（0 < |x| < 1），返回 (近似值, 项数)，满足误差限 epsilon
+
+    各项同号，余项不超过首个舍去项的 1/(1 - x²/((2n+2)(2n+3))) < 2 倍，
+    首个舍去项小于 ε/2（与 sin 的项数估计相同）即可
+    """
+    n = _sin_terms(x, epsilon)
+    x_squared = x * x
+    term = x
+    result = term
+    # x^(2k+1)/(2k+1)! = 前一项 · x^2 / ((2k)(2k+1))
+    for k in range(1, n):
+        term = term * x_squared / ((2 * k) * (2 * k + 1))
+        result += term
+    return result, n
+
+
+def _small_sinhcosh(x, epsilon):
+    """
+    |x| < SERIES_THRESHOLD 时的 (sinh(x), cosh(x))，满足误差限 epsilon
+
+    与 sincos1 相同，把 x 缩小为 y = x / 2^j 后展开 sinh(y)，cosh(y) = sqrt(1 + sinh²(y))，
+    再用 j 次倍角公式 sinh 2y = 2·sinh y·cosh y，cosh 2y = 1 + 2·sinh² y 还原；
+    每次倍角把误差至多放大 4 倍，展开的误差限取 ε/(2·4^j)，并多保留 j·log10(4) 位
+    """
+    j = _halvings(x, epsilon)
+    with localcontext() as ctx:
+        ctx.prec += (j * 61 + 99) // 100 + 2
+        y = x / (1 << j)
+        s, n = _sinh_series(y, epsilon / (2 * 4 ** j))
+        c = (1 + s * s).sqrt()
+        for _ in range(j):
+            s, c = 2 * s * c, 1 + 2 * s * s
+    if get_log_level() == "SUMMARY":
+        add_log("【sinh】|x| < {0}，缩小 2^{1} 倍后展开 sinh 的泰勒级数 {2} 项，再用 {1} 次倍角公式还原",
+                SERIES_THRESHOLD, j, n, level="SUMMARY")
+    return +s, +c
+
+
+def sinhcosh1(x, epsilon):
+    """
+    同时计算 sinh(x) 与 cosh(x)（x 为数值），满足误差限 epsilon
+
+    返回:
+    (s, c)，满足 |s - sinh(x)| < epsilon，|c - cosh(x)| < epsilon
+    """
+    x = Decimal(x)
+    epsilon = Decimal(epsilon)
+    if x.is_zero():
+        return Decimal(0), Decimal(1)
+
+    context = get_context()
+    key = (x, epsilon, getcontext().prec)
+    last = context.last_sinhcosh
+    if last is not None and last[0] == key:
+        return last[1]
+    result = _sinhcosh(x, epsilon)
+    context.last_sinhcosh = (key, result)
+    return result
+
+
+def _sinhcosh(x, epsilon):
+    if abs(x) < SERIES_THRESHOLD:
+        return _small_sinhcosh(x, epsilon)
+
+    # y 的误差 δ 经 1/y 传递后不超过 δ/y² ≤ δ，因此 (y ∓ 1/y)/2 的误差不超过 δ
+    y = Exp1(abs(x), epsilon / 2)
+    if get_log_level() == "SUMMARY":
+        add_log("【sinh/cosh】e^|x| 只计算一次，sinh = (y - 1/y)/2，cosh = (y + 1/y)/2", level="SUMMARY")
+    with localcontext() as ctx:
+        ctx.prec += GUARD_DIGITS
+        inverse = 1 / y
+        s = (y - inverse) / 2
+        c = (y + inverse) / 2
+    s, c = +s, +c  # 舍入回调用方的精度
+    return (s if x > 0 else -s), c
+
+
+def tanh1(x, epsilon):
+    """
+    计算 tanh(x)（x 为数值），满足误差限 epsilon
+    """
+    x = Decimal(x)
+    epsilon = Decimal(epsilon)
+    if x.is_zero():
+        return Decimal(0)
+
+    with localcontext() as ctx:
+        ctx.prec += GUARD_DIGITS
+        if abs(x) < SERIES_THRESHOLD:
+            # cosh ≥ 1，|tanh| < 1：sinh、cosh 的误差各为 ε/4 时 s/c 的误差不超过 ε/2
+            s, c = _small_sinhcosh(abs(x), epsilon / 4)
+            t = s / c
+        else:
+            # (1 - u)/(1 + u) 对 u 的导数绝对值 2/(1 + u)² ≤ 2，u 的误差取 ε/4
+            u = Exp1(-2 * abs(x), epsilon / 4)
+            t = (1 - u) / (1 + u)
+    t = +t
+    return t if x > 0 else -t
+
+
+def _argument(x, epsilon):
+    """
+    求 sinh、cosh 参数的近似值：两者的导数绝对值都不超过 e^|x|，
+    先粗算 x 以估计 e^|x| 的上界，再按该上界收紧 x 的误差限，使传播误差不超过 ε/2
+    """
+    from .main import Main
+
+    epsilon_prime = Decimal('0.1')
+    a_tilde = Decimal(Main(x, epsilon_prime))
+    epsilon_double_prime = Decimal('0.2')
+    upper = abs(a_tilde) + epsilon_prime
+    with scaled_context(epsilon_double_prime, _exp_magnitude(upper)):
+        bound = Exp1(upper, epsilon_double_prime) + epsilon_double_prime
+    return Decimal(Main(x, cons(epsilon / (2 * bound))))
+
+
+def sinhcosh(x, epsilon):
+    """
+    同时计算 sinh(x) 与 cosh(x)，x 可以是数值或表达式；表达式只按所需误差限求值一次
+    """
+    if isinstance(x, (int, float, Decimal)):
+        return sinhcosh1(Decimal(x), epsilon)
+    return sinhcosh1(_argument(x, epsilon), epsilon / 2)
+
+
+def sinh(x, epsilon):
+    """
+    计算 sinh(x)，满足误差限 epsilon
+    """
+    add_log("执行双曲正弦 sinh(x)", level="SUMMARY")
+    return sinhcosh(x, epsilon)[0]
+
+
+def cosh(x, epsilon):
+    """
+    计算 cosh(x)，满足误差限 epsilon
+    """
+    add_log("执行双曲余弦 cosh(x)", level="SUMMARY")
+    return sinhcosh(x, epsilon)[1]
+
+
+def tanh(x, epsilon):
+    """
+    计算 tanh(x)，满足误差限 epsilon；tanh 的导数 1 - tanh² ≤ 1，参数的误差限取 ε/2
+    """
+    from .main import Main
+
+    add_log("执行双曲正切 tanh(x)", level="SUMMARY")
+    if isinstance(x, (int, float, Decimal)):
+        return tanh1(Decimal(x), epsilon)
+    x_tilde = Decimal(Main(x, Decimal(epsilon / 2)))
+    return tanh1(x_tilde, epsilon / 2)
@@ -1,6 +1,7 @@
 import ast
 import re
 from decimal import Decimal, getcontext
+from .dag import intern
 
 def preprocess_decimal_constants(expr):
     """
@@ -13,7 +14,9 @@ def preprocess_decimal_constants(expr):
 
 def parse_expression(expr):
     """
-    解析用户输入的数学表达式，转换成数学操作树，部分表达式形式:log(a,b),ln(a),e^a,a^b
+    解析用户输入的数学表达式，转换成数学操作树，部分表达式形式:log(a,b),ln(a),e^a,a^b,sqrt(a),root(a,n)
+
+    返回的树经过哈希共享（见 dag.py）：表达式中重复出现的子树是同一个节点
     """
     expr = preprocess_decimal_constants(expr.replace("^", "**"))
     tree = ast.parse(expr, mode='eval')
@@ -47,9 +50,14 @@ def parse_expression(expr):
                 return Decimal(args[0])  # 处理 Decimal('...')
 
             if func_name in {"sin", "cos", "tan", "cot", "sec", "csc",
-                             "sinh", "cosh", "arcsin", "arccos", "arctan", "arccot",
-                             "ln"}:
+                             "sinh", "cosh", "tanh", "arcsin", "arccos", "arctan", "arccot",
+                             "ln", "sqrt"}:
                 return (func_name, *args)
+            elif func_name == "root":  # root(a, n) 转换成 ('root', a, n)，表示 a 的 n 次方根
+                if len(args) == 2:
+                    return ('root', args[0], args[1])
+                else:
+                    raise ValueError("root 函数需要两个参数")
             elif func_name == "log":  # log(a, b) 转换成 ('log', a, b)
                 if len(args) == 2:
                     return ('log', args[0], args[1])
@@ -90,7 +98,7 @@ def parse_expression(expr):
         else:
             raise ValueError(f"输入无法解析的表达式: {ast.dump(node)}")
 
-    return _parse(tree.body)
+    return intern(_parse(tree.body))
 
 
 # # === 测试代码 ===
@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_CEILING, localcontext
+import sys
+from .cache import ApproxCache, get_active_cache, set_active_cache
+from .input import parse_expression
+from .log_util import get_log_level, set_log_level
+from .main import adaptive_main, format_sig_digits, prepare_expression, log_rewrites
+from .precision import working_precision
+
+# 惰性实数：同一个表达式先要 50 位、再要 500 位时，不必从头计算。
+# LazyReal 持有一个跨多次求值保留的子树缓存，每次加深精度时，
+# 缓存中误差限已经足够的子树直接复用，只有不够精确的子树才重新计算。
+
+
+class RefinementCache(ApproxCache):
+    """
+    跨多次求值保留的子树缓存
+
+    每个子树只保留最紧的一个近似值，并把它舍入到与其误差限相称的有效数字位数
+    （按调用缩放的工作精度再多一位），因此单个节点占用的内存不超过
+    O(结果数量级 + 所需位数 + 保护位) 位十进制数字，精度加深时旧值被替换而不是累积。
+    舍入引入至多半个末位单位的误差，被舍入的值按 ε 加上这半个单位记录（向上取整），
+    缓存仍只对足够宽松的请求返回它；位数本就不多的值（按调用缩放精度算出的结果）照原样按 ε 记录。
+    """
+
+    def store(self, a, ε, value):
+        value = Decimal(value)
+        if not value.is_zero():
+            digits = working_precision(value.adjusted(), ε) + 1
+            if len(value.as_tuple().digits) > digits:
+                with localcontext() as ctx:
+                    ctx.prec = digits
+                    value = +value
+                    ctx.rounding = ROUND_CEILING
+                    ε = ε + Decimal(5).scaleb(value.as_tuple().exponent - 1)
+        super().store(a, ε, value)
+
+    def reset_stats(self):
+        """清零命中统计，保留缓存条目"""
+        self.hits = 0
+        self.misses = 0
+
+    def memory_report(self):
+        """
+        返回缓存的内存占用：条目数、总字节数、单个节点的最大字节数与最多位数
+        """
+        sizes = []
+        digits = []
+        for key, (ε, value) in self._entries.items():
+            sizes.append(sys.getsizeof(ε) + sys.getsizeof(value))
+            digits.append(len(value.as_tuple().digits))
+        return {
+            "entries": len(sizes),
+            "bytes": sum(sizes),
+            "max_node_bytes": max(sizes, default=0),
+            "max_node_digits": max(digits, default=0),
+        }
+
+
+class LazyReal:
+    """
+    可逐步加深精度的实数
+
+    用法:
+        x = LazyReal("e^(sin(2)*3)")
+        x.digits(50)    # 50 位有效数字
+        x.digits(500)   # 复用 50 位时已算出的子树，只细化不够精确的部分
+    """
+
+    def __init__(self, expr):
+        expr = parse_expression(expr) if isinstance(expr, str) else expr
+        # 缓存由本对象持有，Main 不再是顶层调用，因此在这里做一次求值前的折叠与化简
+        self.expr, self.rewrites = prepare_expression(expr)
+        self.cache = RefinementCache()
+        self.sig_digits = 0  # 目前算到的最多有效数字位数
+        self.value = None  # 对应的近似值
+        self.epsilon = None  # 对应的误差限
+
+    @contextmanager
+    def _activated(self):
+        """求值期间把本对象的缓存设为当前缓存，Main 会直接使用它而不是新建"""
+        previous = get_active_cache()
+        set_active_cache(self.cache)
+        try:
+            yield
+        finally:
+            set_active_cache(None)  # 保存本次的命中统计
+            set_active_cache(previous)
+
+    def evaluate(self, sig_digits, mode="compute"):
+        """
+        按 sig_digits 位有效数字求值，返回 (近似值, 误差限 ε)；
+        位数不超过之前的请求时，根节点的缓存值已足够精确，几乎不需要计算
+        """
+        self.cache.reset_stats()
+        if mode == "explain":
+            previous_level = get_log_level()
+            set_log_level("SUMMARY")
+            log_rewrites(self.rewrites)
+            set_log_level(previous_level)
+        with self._activated():
+            result, ε = adaptive_main(self.expr, sig_digits, mode=mode)
+        if sig_digits >= self.sig_digits:
+            self.sig_digits, self.value, self.epsilon = sig_digits, result, ε
+        return result, ε
+
+    def digits(self, sig_digits):
+        """
+        返回保留 sig_digits 位有效数字的字符串
+        """
+        result, _ = self.evaluate(sig_digits)
+        return format_sig_digits(result, sig_digits)
+
+    def refine(self, sig_digits=None, mode="compute"):
+        """
+        加深精度：默认把有效数字位数加倍，返回 (近似值, 误差限 ε)
+        """
+        if sig_digits is None:
+            sig_digits = max(2 * self.sig_digits, 1)
+        return self.evaluate(sig_digits, mode=mode)
+
+    def memory_report(self):
+        return self.cache.memory_report()
+
+    def __repr__(self):
+        return f"LazyReal({self.expr!r}, sig_digits={self.sig_digits})"
@@ -1,10 +1,12 @@
-from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN, localcontext
 import math
 from .log_util import add_log, get_log_level
+from .series import log_abs, terms_needed
+from .precision import working_precision
+from .constants import get_ln2
 
 def ln(a, epsilon):
     from .main import Main
-    math_e = Decimal(str(math.e))
     """
     计算 ln(a)，如果 a 是常数，则直接计算，如果是表达式则通过 main 进行处理。
 
@@ -15,15 +17,10 @@ def ln(a, epsilon):
     返回:
     近似值 y ≈ ln(a)，满足 |y - ln(a)| < epsilon
     """
-    # 处理ln(e)特例：直接返回1
-
     # 如果 a 是常数，直接计算 ln(a)
     if isinstance(a, (int, float, Decimal)):  # 判断是否为常数
         a = Decimal(a)  # 转为 Decimal 类型
         # add_log(f"【ln】ln({a}) a是常数")
-        if abs(a - math_e) < epsilon:
-            # add_log(f"特例：ln(e) ≈ 1")
-            return Decimal(1)
         return ln1(a, epsilon)
     else:
         # 如果 a 是表达式，通过 Main 函数计算近似值
@@ -43,10 +40,50 @@ def ln(a, epsilon):
         return ln1(a_tilde, epsilon / 2)
 
 
+def _ln_terms(c, epsilon):
+    """
+    ln(c) 对称展开所需的项数 n：2|z|^(2n+1)(c+1)^2 / ((2n+1)·4c) < ε，z = (c-1)/(c+1)
+    """
+    log_z = log_abs(c - 1) - log_abs(c + 1)
+    log_rest = math.log(2) + 2 * log_abs(c + 1) - log_abs(4 * c) - log_abs(epsilon)
+
+    def log_bound(n):
+        return (2 * n + 1) * log_z - math.log(2 * n + 1) + log_rest
+
+    return terms_needed(log_bound, 1)
+
+
+def _ln_series(c, epsilon):
+    """
+    对称展开 ln(c) = 2·Σ z^(2k-1)/(2k-1)，z = (c-1)/(c+1)，满足误差限 epsilon
+
+    c 越接近 1 收敛越快，返回 (近似值, 项数)
+    """
+    # 由余项上界 R_n ≤ 2|z|^(2n+1) / ((2n+1)(1-z^2)) < ε 直接估计项数 n，其中 z = (c-1)/(c+1)
+    n = _ln_terms(c, epsilon)
+
+    # 初始化项：z^(2k-1) 由前一项乘以 z^2 递推
+    z = (c - 1) / (c + 1)
+    z_squared = z * z
+    power = z
+    result = z  # 第一项是 (c - 1) / (c + 1)，最后统一乘 2
+    # add_log(f"【ln1】ln({c}) 使用泰勒展开，初始项: {2 * z}")
+
+    for k in range(2, n + 1):
+        power *= z_squared
+        result += power / (2 * k - 1)  # 累加每一项
+        # add_log(f"第 {k} 项: {2 * power / (2 * k - 1)}，累计结果: {2 * result}")
+    return 2 * result, n
+
+
 def ln1(c, epsilon):
     # from .main import Main
     """
-    计算自然对数 ln(c)，使用泰勒展开，满足误差限 epsilon。
+    计算自然对数 ln(c)，先做参数约简再泰勒展开，满足误差限 epsilon。
+
+    约简：c = m·2^k，k = round(log2 c)，m ∈ [1/√2, √2]，
+    ln(c) = ln(m) + k·ln2。对称展开只作用于 m（|z| ≤ 0.172），
+    ln2 取自常数缓存，其误差经 k 放大后不超过 ε/4。
 
     参数:
     c -- 输入值，可能是一个数值或表达式
@@ -67,32 +104,26 @@ def ln1(c, epsilon):
 # ========== 日志（摘要级） ==========
     log_level = get_log_level()
     if log_level != "NONE":
-        # 【修改】截断过长的 c
-        c_str = str(c)
-        if len(c_str) > 20:
-            c_str = c_str[:20] + "..."
-        add_log(f"【ln】使用对称泰勒展开计算 ln({c_str})", level="SUMMARY")
+        add_log("【ln】使用对称泰勒展开计算 ln({})", c, level="SUMMARY")
 
 # ========== 算法实现 ==========
 
-    # 初始化 n 和项
-    n = 1
-    term = (2 * (c - 1)) / (c + 1)  # 第一项是 (2 * (c - 1)) / (c + 1)
-    result = term  # 初始化结果为第一项
-    # add_log(f"【ln1】ln({c}) 使用泰勒展开，初始项: {term}")
-
-    # 循环计算每一项，直到满足误差条件
-    while 2 * abs(c - 1) ** (2 * n + 1) >= 4 * n * c * (c + 1) ** (2 * n - 1) * epsilon:  # 判断当前项是否满足精度要求
-        n += 1
-        current_term = (2 * (c - 1) ** (2 * n - 1)) / ((2 * n - 1) * (c + 1) ** (2 * n - 1))
-        result += current_term  # 累加每一项
-        # add_log(f"第 {n} 项: {current_term}，累计结果: {result}")
+    k = round(log_abs(c) / math.log(2))
+    epsilon = Decimal(epsilon)
+    if k == 0:
+        result, n = _ln_series(c, epsilon)
+    else:
+        with localcontext() as ctx:
+            # 结果的整数位约为 log10(|k|·ln2)，再加上 ε/4 对应的小数位
+            ctx.prec = working_precision(len(str(abs(k))), epsilon / 4)
+            m = c / Decimal(2) ** k
+            series, n = _ln_series(m, epsilon / 2)
+            result = series + k * get_ln2(epsilon / (4 * abs(k)))
+        if log_level != "NONE":
+            add_log("【ln】参数约简：c = m·2^{0}，ln(c) = ln(m) + {0}·ln2", k, level="SUMMARY")
 
 # ========== 日志：只记录项数 ==========
     if log_level == "SUMMARY":
-        add_log(
-            f"【ln】展开 {n} 项，满足 |最后一项| < ε/2，结果已收敛",
-            level="SUMMARY"
-        )
+        add_log("【ln】展开 {} 项，满足 |最后一项| < ε/2，结果已收敛", n, level="SUMMARY")
 
-    return Decimal(result)
\ No newline at end of file
+    return Decimal(result)
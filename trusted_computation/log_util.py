@@ -1,26 +1,37 @@
-log_steps = []
+from decimal import Decimal
+from fractions import Fraction
+from string import Formatter
+from .context import get_context
+
+# 计算日志：记录的是结构化的 TraceEvent（模板 + 参数），不是格式化好的字符串。
+# 参数（可能是上千位的 Decimal 或很大的表达式树）只在读取日志时才转换为字符串，
+# 日志等级不记录某一级时，add_log 只做一次集合查找就返回。
+#
+# 日志和日志等级保存在当前的求值上下文中（见 context.py），不同线程、任务中的计算各自记录。
 
 # 日志等级：
 # NONE     - 不记录任何日志（用于高精度计算）
 # SUMMARY  - 仅记录关键步骤（用于解释）
 # DETAIL   - 记录详细步骤（调试用）
-LOG_LEVEL = "DETAIL"
 
 
 def set_log_level(level: str):
     """
-    设置日志等级: NONE / SUMMARY / DETAIL
+    设置当前求值上下文的日志等级: NONE / SUMMARY / DETAIL
     """
-    global LOG_LEVEL
-    if level not in ("NONE", "SUMMARY", "DETAIL"):
-        raise ValueError("Invalid log level")
-    LOG_LEVEL = level
+    get_context().set_log_level(level)
 
 def get_log_level():
     """
     获取当前日志等级
     """
-    return LOG_LEVEL
+    return get_context().log_level
+
+def log_enabled(level: str = "DETAIL"):
+    """
+    当前日志等级是否记录 level 级的事件（构造日志参数本身有开销时先检查）
+    """
+    return level in get_context().recorded
 
 # === 新增：数值格式化函数 ===
 def format_val(val):
@@ -30,26 +41,78 @@ def format_val(val):
         return s[:15] + "..." + s[-3:]
     return s
 
-def add_log(message: str, level: str = "DETAIL"):
+
+class _TraceFormatter(Formatter):
     """
-    添加一步计算日志
+    数值与表达式树（可能很长）用 format_val 截断，其他参数（规则名、异常信息等）原样显示；
+    有格式说明（如 {:.1e}）的字段按说明格式化
     """
-    if LOG_LEVEL == "NONE":
-        return
-    if LOG_LEVEL == "SUMMARY" and level == "DETAIL":
+
+    def format_field(self, value, format_spec):
+        if format_spec:
+            return format(value, format_spec)
+        if isinstance(value, (Decimal, Fraction, tuple)):
+            return format_val(value)
+        return str(value)
+
+
+_formatter = _TraceFormatter()
+
+
+class TraceEvent:
+    """
+    一条计算日志
+
+    template -- str.format 风格的模板，字段按位置引用 args
+    args     -- 模板参数，原样保存，渲染时才格式化
+    level    -- SUMMARY / DETAIL
+    """
+    __slots__ = ("template", "args", "level")
+
+    def __init__(self, template, args, level):
+        self.template = template
+        self.args = args
+        self.level = level
+
+    def render(self):
+        if not self.args:
+            return self.template
+        return _formatter.format(self.template, *self.args)
+
+    __str__ = render
+
+    def __repr__(self):
+        return f"TraceEvent({self.template!r}, level={self.level!r})"
+
+
+def add_log(template: str, *args, level: str = "DETAIL"):
+    """
+    添加一步计算日志：template 中的 {} 字段依次对应 args，读取日志时才格式化
+
+        add_log("【Mul】执行乘法 {} × {}", a1, a2, level="SUMMARY")
+    """
+    context = get_context()
+    if level not in context.recorded:
         return
-    log_steps.append(message)
+    context.log_steps.append(TraceEvent(template, args, level))
 
 
 def clear_log():
     """
     清空日志（每次计算前调用）
     """
-    log_steps.clear()
+    get_context().log_steps.clear()
+
+
+def get_trace():
+    """
+    获取所有日志事件（未格式化）
+    """
+    return get_context().log_steps[:]
 
 
 def get_log():
     """
-    获取所有日志（最终用于 LLM）
+    获取所有日志的文本（最终用于 LLM）
     """
-    return log_steps[:]
+    return [event.render() for event in get_context().log_steps]
@@ -1,16 +1,31 @@
-from decimal import Decimal, getcontext
+from decimal import Decimal, getcontext, localcontext, InvalidOperation
 from .input import parse_expression  # 导入 input.py 解析函数
 from .mul import mul
 from .div import div
 from .sin import sin
+from .trig import cos, ratio
+from .hyperbolic import sinh, cosh, tanh
 from .arctan import arctan
 from .ln import ln
 from .Exp import Exp
 from .Exp2 import Exp2
+from .root import root, sqrt
+from .ball import ball_main
+from .planner import plan_main
 from .pi import get_pi
+from .constants import get_e
 from .log_util import add_log, set_log_level, get_log_level
+from .cache import ApproxCache, get_active_cache, set_active_cache, is_cacheable
+from .context import check_interrupt
+from .parallel import SPLIT_OPS, parallel_enabled, parallel_main
+from .cons import cons
+from .dag import intern, count_parents, is_shared
+from .rational import fold_rationals, rational_value
+from .simplify import simplify_with_trace
+from .precision import (GUARD_DIGITS, ESTIMATE_PREC, MAX_ESCALATIONS, ZERO_SEARCH_DIGITS,
+                        decimal_magnitude, epsilon_for_sig_digits, working_precision,
+                        MAGNITUDE_ALLOWANCE, scaled_context, call_precision_enabled)
 
-import math
 
 def format_sig_digits(val, sig_digits):
     """
@@ -27,7 +42,11 @@ def format_sig_digits(val, sig_digits):
         return f"{val:.{sig_digits - 1}e}"
 
 # === 论文算法1：Main 主计算函数 ===
-def Main(a, ε, mode="compute"):
+ENGINES = ("backprop", "ball", "plan")  # 可选的求值引擎
+SHARED_EPSILON_FACTOR = Decimal("0.1")  # 共享节点的误差限相对请求收紧的倍数
+
+
+def Main(a, ε, mode="compute", engine="backprop"):
     # ε = standardize_epsilon(ε)  #  精度标准化处理
     """
      主可信计算函数
@@ -36,14 +55,34 @@ def Main(a, ε, mode="compute"):
      expr    : 解析后的表达式树
      epsilon : 误差上界
      mode    : "compute" | "explain"
+     engine  : "backprop" | "ball" | "plan"
 
     mode:
      - "compute": 高精度计算，关闭日志 (NONE)
      - "explain": 解释模式，记录摘要日志 (SUMMARY)
+
+    engine:
+     - "backprop": 论文算法，ε 自顶向下分配给子节点（默认）
+     - "ball": 中点-半径球算术，整棵树前向求值一次，半径过大时加倍精度重算（见 ball.py）
+     - "plan": 静态误差预算，先估界再一次性给每个节点分配 ε 与精度，每个节点只求值一次（见 planner.py）
+
+    同一次顶层求值内的子树近似值会被缓存（见 cache.py），
+    命中统计可通过 cache.get_cache_stats() 查看
      """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的求值引擎: {engine}")
+    check_interrupt()  # 超过截止时间或被取消时在这里中止整个求值
+
     # 1. 保存当前的日志等级
     previous_level = get_log_level()
 
+    # 顶层调用负责创建本次求值的子树缓存，递归调用共享同一个缓存
+    cache = get_active_cache()
+    owns_cache = cache is None
+    if owns_cache:
+        cache = ApproxCache()
+        set_active_cache(cache)
+
     try:
         # 2. 根据模式设置新的日志等级
         if mode == "compute":
@@ -54,12 +93,169 @@ def Main(a, ε, mode="compute"):
             # 如果没有指定 mode（或为 None），保持当前等级不变（用于递归调用）
             pass
 
-        return _Main(a, ε)
+        # 改写规则或外部调用传入的普通元组并入共享表，结构相同的子树对应同一个节点
+        if type(a) is tuple:
+            a = intern(a)
+        if owns_cache:
+            a, rewrites = prepare_expression(a)
+            log_rewrites(rewrites)
+
+        if engine == "ball":
+            return ball_main(a, ε)
+        if engine == "plan":
+            return plan_main(a, ε)
+
+        if not is_cacheable(a):
+            return _Main(a, ε)
+
+        # 缓存中已有不宽于 ε 的近似值时直接返回，否则重新计算并记录
+        cached = cache.lookup(a, ε)
+        if cached is not None:
+            return cached
+        count_parents(a, cache.parents)
+        if is_shared(a, cache.parents):
+            # 被多个父节点引用的节点：一次算到比当前请求紧一位的误差限，
+            # 其他父节点随后的请求（通常只比当前请求紧几倍）直接命中缓存
+            ε = cons(ε) * SHARED_EPSILON_FACTOR
+        if isinstance(a, tuple):
+            result = _Main_scaled(a, ε, cache.approximation(a))
+        else:
+            result = _Main(a, ε)
+        cache.store(a, ε, result)
+        return result
 
     finally:
         # 3. 函数执行完毕后，务必恢复之前的日志等级
         # 这样内部的 compute 调用不会永久关闭外部的 explain 日志
         set_log_level(previous_level)
+        if owns_cache:
+            set_active_cache(None)
+
+def prepare_expression(a):
+    """
+    求值前的预处理，返回 (处理后的表达式, 改写轨迹)：
+    把纯有理运算子树折叠为常数（按所需 ε 只舍入一次），再按恒等式化简
+    （π/2 倍数的三角函数、ln(e^x) 等），化简产生的有理子树再折叠一次
+    """
+    a, rewrites = simplify_with_trace(fold_rationals(a))
+    return fold_rationals(a), rewrites
+
+
+def log_rewrites(rewrites):
+    """把化简的改写轨迹写入解释日志，使日志与实际求值的表达式一致"""
+    for name, before, after in rewrites:
+        add_log("【化简】{}：{} → {}", name, before, after, level="SUMMARY")
+
+
+def _Main_scaled(a, ε, previous=None):
+    """
+    在与 ε 相称的局部精度下计算子树 a
+
+    previous 为该子树此前（以更宽松误差限）算出的近似值，用于预知结果数量级；
+    没有时先假设结果数量级不超过 MAGNITUDE_ALLOWANCE 位整数。若算出的结果更大
+    （低精度下舍入误差可能超过 ε），按实际数量级提高精度重算。
+    子树的子节点已在缓存中，重算代价很小。
+    """
+    if not call_precision_enabled():
+        return _Main(a, ε)
+
+    outer_prec = getcontext().prec
+    magnitude = decimal_magnitude(previous) if previous is not None else None
+    if magnitude is None:
+        magnitude = MAGNITUDE_ALLOWANCE
+    with scaled_context(ε, magnitude + 1) as ctx:
+        prec = ctx.prec
+        try:
+            result = _Main(a, ε)
+        except InvalidOperation:
+            # 精度不足导致的非法运算（如大数取模），改用更高的精度重试一次
+            if prec >= outer_prec:
+                raise
+            result = None
+
+    if result is not None:
+        needed = working_precision(decimal_magnitude(result), ε)
+        if needed <= prec:
+            return result
+        prec = needed
+    else:
+        prec = outer_prec
+
+    with localcontext() as ctx:
+        ctx.prec = prec
+        return _Main(a, ε)
+
+
+def estimate_magnitude(a, sig_digits):
+    """
+    以低工作精度粗略计算表达式，估计结果的数量级
+
+    依次缩小误差限，直到近似值能与 0 区分开（|ã| > 2ε′），
+    此时真值与 ã 同号且数量级至多相差 1。
+    很小的非零结果（如 e^(-300)）需要比所需位数更小的误差限才能与 0 区分：
+    越过 10^-(sig_digits+guard) 后每次收紧的位数加倍，
+    若直到 10^-max(sig_digits+guard, ZERO_SEARCH_DIGITS) 仍无法与 0 区分，返回 None。
+    """
+    epsilon_prime = Decimal('0.1')
+    needed = sig_digits + GUARD_DIGITS
+    floor = Decimal(10) ** (-max(needed, ZERO_SEARCH_DIGITS))
+    step = GUARD_DIGITS
+    prec = ESTIMATE_PREC
+    while True:
+        with localcontext() as ctx:
+            ctx.prec = prec
+            a_tilde = Decimal(Main(a, epsilon_prime, mode="compute"))
+        if abs(a_tilde) > 2 * epsilon_prime:
+            return decimal_magnitude(a_tilde)
+        if epsilon_prime <= floor:
+            return None
+        if -epsilon_prime.adjusted() >= needed:
+            step *= 2
+        epsilon_prime = max(epsilon_prime * Decimal(10) ** (-step), floor)
+        prec += step
+
+
+def adaptive_main(a, sig_digits, mode="compute", engine="backprop"):
+    """
+    按所需有效数字位数自适应求值
+
+    1. 低精度估计结果的数量级
+    2. 由数量级推导误差限 ε 和 Decimal 工作精度，在局部上下文中调用 Main
+    3. 若 [ỹ - ε, ỹ + ε] 两端舍入到 sig_digits 位后不一致（过于接近舍入边界），
+       缩小 ε、提高精度后重算
+
+    结果在 10^-max(sig_digits+guard, ZERO_SEARCH_DIGITS) 的误差限下仍与 0 无法区分时，
+    无法保证相对的有效数字：按这个绝对误差限计算，返回的 ε 即为实际的保证，并写入日志。
+
+    返回:
+    (近似值, 实际使用的误差限 ε)
+    """
+    magnitude = estimate_magnitude(a, sig_digits)
+    if magnitude is None:
+        ε = Decimal(10) ** (-max(sig_digits + GUARD_DIGITS, ZERO_SEARCH_DIGITS))
+        add_log("结果与 0 无法区分，无法保证 {} 位有效数字，只保证绝对误差小于 {}", sig_digits, ε, level="SUMMARY")
+        with localcontext() as ctx:
+            ctx.prec = working_precision(0, ε)
+            return Decimal(Main(a, ε, mode=mode, engine=engine)), ε
+
+    ε = epsilon_for_sig_digits(magnitude, sig_digits)
+    prec = working_precision(magnitude, ε)
+
+    for _ in range(MAX_ESCALATIONS + 1):
+        with localcontext() as ctx:
+            ctx.prec = prec
+            result = Decimal(Main(a, ε, mode=mode, engine=engine))
+            lower = format_sig_digits(result - ε, sig_digits)
+            upper = format_sig_digits(result + ε, sig_digits)
+        if lower == upper or result.is_zero():
+            break
+        add_log("结果接近舍入边界，提高精度重新计算", level="SUMMARY")
+        ε *= Decimal(10) ** (-GUARD_DIGITS)
+        prec += GUARD_DIGITS
+    else:
+        add_log("已达到最大提升次数，结果仍位于舍入边界附近，末位可能相差 1", level="SUMMARY")
+
+    return result, ε
 
 def _Main(a, ε):
     # ε = standardize_epsilon(ε)  #  精度标准化处理
@@ -73,16 +269,21 @@ def _Main(a, ε):
     if isinstance(a, str):
         if a.lower() == 'pi':
             add_log("读取常数 π", level="SUMMARY")
-            return get_pi(Decimal('1E-1000'))
+            return get_pi(ε)
         elif a.lower() == 'e':
             add_log("读取常数 e", level="SUMMARY")
-            return Decimal(str(math.e))  # 直接使用 math.e 计算 e
+            return get_e(ε)
 
         raise ValueError(f"计算时无法解析的表达式: {a}")
 
     elif isinstance(a, tuple):
         op = a[0]
 
+        if op in SPLIT_OPS and parallel_enabled():  # 开启并行求值时，独立的重子树交给进程池（见 parallel.py）
+            result = parallel_main(a, ε)
+            if result is not None:
+                return result
+
         if op == '+':  # 加法
             add_log("执行加法运算", level="SUMMARY")
             # print(f"操作符: +, 精度: {ε}")
@@ -100,6 +301,10 @@ def _Main(a, ε):
                 result = Decimal(Main(a[1], ε / 2) - Main(a[2], ε / 2))
                 return Decimal(result)
 
+        elif op == 'rational':  # 折叠后的精确有理数常数
+            add_log("舍入精确有理数常数", level="SUMMARY")
+            return rational_value(a[1], ε)
+
         elif op == '*':  # 乘法
             # print(f"操作符: *, 精度: {ε}")
             add_log("执行乘法运算", level="SUMMARY")
@@ -125,15 +330,25 @@ def _Main(a, ε):
             result = Decimal(Exp2(a[1], a[2], ε))
             return Decimal(result)
 
+        elif op == 'sqrt':  # sqrt(a)
+            add_log("执行平方根运算 sqrt(x)", level="SUMMARY")
+            result = Decimal(sqrt(a[1], ε))
+            return Decimal(result)
+
+        elif op == 'root':  # root(a, n) = a^(1/n)
+            add_log("执行开方运算 root(x, n)", level="SUMMARY")
+            result = Decimal(root(a[1], a[2], ε))
+            return Decimal(result)
+
         elif op == 'ln':  # ln(a)
             # print(f"操作符: ln a1, 精度: {ε} {a[1]}")
-            add_log(f"执行自然对数计算：ln({a[1]})")  # 日志记录
+            add_log("执行自然对数计算：ln({})", a[1])  # 日志记录
             result = Decimal(ln(Main(a[1], ε), ε))
             return Decimal(result)
 
         elif op == 'log':  # log(a, b)
             add_log("执行对数换底公式", level="SUMMARY")
-            result = Main(('/', ('ln', a[2]), ('ln', a[1])), ε)
+            result = Main(intern(('/', ('ln', a[2]), ('ln', a[1]))), ε)
             return Decimal(result)
 
         elif op == 'sin':
@@ -142,80 +357,14 @@ def _Main(a, ε):
             result = Decimal(sin(a[1], ε))  # 调用 sin 计算sin函数
             return Decimal(result)
 
-        elif op == 'cos':  # cos(a) = sin(π/2 - a)
-            add_log("执行余弦函数 cos(x)", level="SUMMARY")
-            result = Decimal(sin(('-', ('/', 'pi', 2), a[1]), ε))  # 调用 sin 计算cos函数
+        elif op == 'cos':  # sin 与 cos 由同一次归约和展开得到
+            result = cos(a[1], ε)
             return Decimal(result)
 
-        elif op == 'tan':  # tan(a) = sin(a) / cos(a)
-            # return Decimal(div(sin(a[1], ε), sin(('-', ('/', 'pi', 2), a[1]), ε), ε)).quantize(ε)
-            x = a[1]
-            x_val = Decimal(Main(x, ε))  # 获取 x 的近似值
-
-            pi_val = get_pi(ε)
-            half_pi = pi_val / 2
-            mod_val = x_val % pi_val  # 计算 x mod π
-
-            # 检查是否接近 π/2（tan(x) 的极点）
-            if abs(mod_val - half_pi) < ε:
-                raise ValueError(f"tan({x_val}) 未定义：x ≈ π/2 + nπ")
-
-            # 正常计算 tan(x) = sin(x) / cos(x)
-            add_log("执行正切函数 tan(x)", level="SUMMARY")
-            sin_val = sin(x, ε)
-            cos_val = sin(('-', ('/', 'pi', 2), x), ε)
-            result = Decimal(div(sin_val, cos_val, ε))
-            return Decimal(result)
-
-        elif op == 'cot':  # cot(a) = cos(a) / sin(a)
-            # return Decimal(div(sin(('-', ('/', 'pi', 2), a[1]), ε), sin(a[1], ε), ε)).quantize(ε)
-            x = a[1]
-            x_val = Decimal(Main(x, ε))  # 计算 x 的近似值
-
-            pi_val = get_pi(ε)
-            mod_val = x_val % pi_val  # 计算 x mod π
-
-            # 检查是否接近 nπ，即 sin(x) ≈ 0，会导致 cot(x) 发散
-            if abs(mod_val) < ε or abs(mod_val - pi_val) < ε:
-                raise ValueError(f"cot({x_val}) 未定义：x ≈ nπ")
-
-            # cot(x) = cos(x) / sin(x) = sin(π/2 - x) / sin(x)
-            add_log("执行余切函数 cot(x)", level="SUMMARY")
-            cos_val = sin(('-', ('/', 'pi', 2), x), ε)
-            sin_val = sin(x, ε)
-            result = Decimal(div(cos_val, sin_val, ε))
-            return Decimal(result)
-
-        elif op == 'sec':  # sec(a) = 1 / cos(a)
-            x = a[1]
-            x_val = Decimal(Main(x, ε))
-            pi_val = get_pi(ε)
-            half_pi = pi_val / 2
-            mod_val = x_val % pi_val
-
-            # 极点判断：x ≈ π/2 + nπ，即 cos(x) ≈ 0
-            if abs(mod_val - half_pi) < ε:
-                raise ValueError(f"sec({x_val}) 未定义：x ≈ π/2 + nπ")
-
-            # 正常计算
-            add_log("执行正割函数 sec(x)", level="SUMMARY")
-            cos_val = sin(('-', ('/', 'pi', 2), x), ε)
-            result = Decimal(div(1, cos_val, ε))
-            return Decimal(result)
-
-        elif op == 'csc':  # csc(a) = 1 / sin(a)
-            x = a[1]
-            x_val = Decimal(Main(x, ε))
-            pi_val = get_pi(ε)
-            mod_val = x_val % pi_val
-
-            # 极点判断：x ≈ nπ，即 sin(x) ≈ 0
-            if abs(mod_val) < ε or abs(mod_val - pi_val) < ε:
-                raise ValueError(f"csc({x_val}) 未定义：x ≈ nπ")
-
-            add_log("执行余割函数 tan(x)", level="SUMMARY")
-            sin_val = sin(x, ε)
-            result = Decimal(div(1, sin_val, ε))
+        elif op in ('tan', 'cot', 'sec', 'csc'):
+            # tan = sin/cos，cot = cos/sin，sec = 1/cos，csc = 1/sin；
+            # 参数只求值一次，分母不能与 0 区分时按极点报错
+            result = ratio(op, a[1], ε)
             return Decimal(result)
 
         elif op == 'arcsin':  # arcsin(a)
@@ -224,7 +373,8 @@ def _Main(a, ε):
                 raise ValueError(f"arcsin 输入值超出定义域：{val}")
 
             add_log("执行反正弦函数 arcsin(x)", level="SUMMARY")
-            result = Decimal(Main(('*', 2, ('arctan', ('/', a[1], ('+', 1, ('exp', ('-', 1, ('exp', a[1], 2)), ('/', 1, 2)))))), ε))
+            # arcsin(x) = 2 * arctan(x / (1 + sqrt(1 - x^2)))
+            result = Decimal(Main(intern(('*', 2, ('arctan', ('/', a[1], ('+', 1, ('sqrt', ('-', 1, ('exp', a[1], 2)))))))), ε))
             return Decimal(result)
 
         elif op == 'arccos':  # arccos(a) = π/2 - arcsin(a)
@@ -233,7 +383,7 @@ def _Main(a, ε):
                 raise ValueError(f"arccos 输入值超出定义域：{val}")
 
             add_log("执行反余弦函数 arccos(x)", level="SUMMARY")
-            result = Decimal(Main(('-', ('/', 'pi', 2), ('arcsin', a[1])), ε))
+            result = Decimal(Main(intern(('-', ('/', 'pi', 2), ('arcsin', a[1]))), ε))
             return Decimal(result)
 
         elif op == 'arctan':  # arctan(a)
@@ -243,17 +393,19 @@ def _Main(a, ε):
 
         elif op == 'arccot':  # arccot(a) = π/2 - arctan(a)
             add_log("执行反余切函数 arcot(x)", level="SUMMARY")
-            result = Decimal(Main(('-', ('/', 'pi', 2), ('arctan', a[1])), ε))
+            result = Decimal(Main(intern(('-', ('/', 'pi', 2), ('arctan', a[1]))), ε))
             return Decimal(result)
 
-        elif op == 'sinh':  # sinh(a) = (e^a - e^(-a)) / 2
-            add_log("执行双曲正弦 sinh(x)", level="SUMMARY")
-            result = Decimal(Main(('/', ('-', ('exp1', a[1]), ('exp1', ('-', a[1]))), 2), ε))
+        elif op == 'sinh':  # sinh(a) = (e^a - e^(-a)) / 2，e^|a| 只计算一次
+            result = Decimal(sinh(a[1], ε))
             return Decimal(result)
 
         elif op == 'cosh':  # cosh(a) = (e^a + e^(-a)) / 2
-            add_log("执行双曲余弦 cosh(x)", level="SUMMARY")
-            result = Decimal(Main(('/', ('+', ('exp1', a[1]), ('exp1', ('-', a[1]))), 2), ε))
+            result = Decimal(cosh(a[1], ε))
+            return Decimal(result)
+
+        elif op == 'tanh':  # tanh(a) = sinh(a) / cosh(a)
+            result = Decimal(tanh(a[1], ε))
             return Decimal(result)
 
         else:
@@ -272,16 +424,11 @@ if __name__ == "__main__":
         try:
             sig_digits = input("请输入保留有效数字位数(默认100位): ")
             sig_digits = int(sig_digits.strip()) if sig_digits.strip() else 100
-            # ε = Decimal(10) ** (-sig_digits)  # ε 仍用于误差控制
-            ε = Decimal(10) ** (-1000)  # ε 仍用于误差控制
-            print(f"计算精度: ε = {ε}")
-            getcontext().prec = sig_digits + 1000  # Decimal 内部计算精度
-
-            get_pi(ε)  # 缓存pi值，避免死循环
 
             parsed_expr = parse_expression(user_input)
             print(f"转换后的数学操作树: {parsed_expr}")
-            result = Main(parsed_expr, ε)
+            # ε 与 Decimal 内部精度由有效数字位数自适应推导
+            result, ε = adaptive_main(parsed_expr, sig_digits)
 
             # print(f"转换后的数学操作树: {parsed_expr}")
             print(f"计算结果: {result}")
@@ -0,0 +1,205 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from decimal import Decimal, getcontext
+from .cache import get_active_cache
+from .cons import cons
+from .context import evaluation_context, get_context
+from .dag import Node
+from .log_util import log_enabled
+
+# 并行求值：把表达式中互相独立的重子树分给进程池，在多个核上同时计算。
+#
+# +、-、*、/ 的两个操作数互不依赖，只是误差限的分配需要操作数的粗略值。
+# 调度器先在本进程中算出这些粗略值（误差限 0.1，很便宜），一次性确定每个重子树的误差限，
+# 再沿 +、-、*、/ 向下拆分，把估计耗时足够大的子树作为独立的任务提交，最后按原来的运算合并：
+#   x ± y：两边的误差限各为 ε/2（与 _Main 相同）；
+#   x · y：ε1 = ε / (2(|ỹ₀| + 0.1))，ε2 = ε / (2(|x̃₀| + 0.2))，其中 x̃₀、ỹ₀ 为粗略值且 ε1 ≤ 0.1，
+#          |x̃ỹ - xy| ≤ |x̃|·|ỹ - y| + |y|·|x̃ - x| < ε/2 + ε/2；
+#   x / y：先把 ỹ 与 0 分开得到下界 L ≤ |y|，|x| 的上界为 A，ε1 = ε·L/8，ε2 = min(L/2, ε·L²/(8A))，
+#          商的误差不超过 ε/4 + ε/4，再留 ε/2 给最后一次除法的舍入（与 div 相同）。
+# 因此并行求值的结果与顺序求值满足同样的误差限。
+#
+# 耗时估计：超越函数节点的权重为 1，算术节点几乎为 0；按工作精度 p 位估计
+# 每个权重单位约 UNIT_MS · (p/1000)² 毫秒。估计不足 min_cost_ms 的子树不值得付出进程间传递的开销，
+# 留在本进程计算。只有一个重子树时不使用进程池。
+#
+# 并行求值只在日志关闭时（compute 模式）进行：工作进程中的计算步骤不会写入解释日志。
+
+UNIT_MS = 15  # 1000 位时一个超越函数节点的大致耗时（毫秒）
+MIN_OFFLOAD_MS = 20  # 估计耗时低于此值的子树不提交给进程池
+SPLIT_OPS = ('+', '-', '*', '/')  # 操作数可以并行求值的运算
+
+# 各运算节点自身的权重，未列出的运算（超越函数）为 1
+_OP_WEIGHT = {'+': 0.01, '-': 0.01, '*': 0.01, '/': 0.01, 'rational': 0.01, 'sqrt': 0.1}
+
+_pool = None
+_workers = 0
+_min_cost_ms = MIN_OFFLOAD_MS
+
+
+def _init_worker(warm_digits):
+    """工作进程的 initializer：进程池对象不能在子进程中使用，子进程内关闭并行求值"""
+    from .worker import init_worker
+    global _pool
+    _pool = None
+    init_worker(warm_digits)
+
+
+def set_parallel(workers, min_cost_ms=MIN_OFFLOAD_MS, warm_digits=None):
+    """
+    开启并行求值，使用 workers 个工作进程（None 表示 CPU 核数）；workers 为 0 时关闭
+
+    min_cost_ms 为提交给进程池的子树的最小估计耗时，warm_digits 为工作进程预热的常数位数。
+    工作进程在返回前启动并完成预热，第一次求值不必等待
+    """
+    from .worker import WARM_DIGITS
+    global _pool, _workers, _min_cost_ms
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool, _workers = None, 0
+    _min_cost_ms = min_cost_ms
+    if workers == 0:
+        return
+    _workers = workers or os.cpu_count() or 1
+    _pool = ProcessPoolExecutor(max_workers=_workers, initializer=_init_worker,
+                                initargs=(WARM_DIGITS if warm_digits is None else warm_digits,))
+    wait([_pool.submit(int) for _ in range(_workers)])  # 每次提交时没有空闲进程就启动一个
+
+
+def parallel_enabled():
+    return _pool is not None
+
+
+def parallel_workers():
+    return _workers
+
+
+def _weight(a):
+    """子树的权重（超越函数节点的个数加上算术节点的少量权重），记录在共享节点上"""
+    if not isinstance(a, tuple):
+        return 0
+    weight = getattr(a, "weight", None)
+    if weight is None:
+        weight = _OP_WEIGHT.get(a[0], 1)
+        if a[0] != 'rational':
+            weight += sum(_weight(x) for x in a[1:])
+        if isinstance(a, Node):
+            a.weight = weight
+    return weight
+
+
+def estimate_cost(a):
+    """
+    按当前工作精度估计求值子树 a 的耗时（毫秒）
+    """
+    return _weight(a) * UNIT_MS * (getcontext().prec / 1000) ** 2
+
+
+def _evaluate_subtree(a, ε, prec, deadline, options):
+    """在工作进程中求值一个子树（进程池的任务），沿用调用方的工作精度、截止时间与求值选项"""
+    from .main import Main
+    with evaluation_context(log_level="NONE", prec=prec, deadline=deadline, options=options):
+        return Main(a, ε)
+
+
+def _separate(a, η=Decimal("0.1")):
+    """逐步收紧误差限，直到 a 的近似值与 0 的距离超过 2η，返回 (近似值, η)（与 div 的 Step 3 相同）"""
+    from .main import Main
+    value = Decimal(Main(a, η))
+    while abs(value) <= 2 * η:
+        η *= Decimal("0.1")
+        value = Decimal(Main(a, η))
+    return value, η
+
+
+def _plan(a, ε, units):
+    """
+    拆分子树 a（误差限 ε），返回合并计划；需要单独计算的重子树追加到 units，
+    计划中以 ('unit', 下标) 引用，留在本进程计算的子树为 ('local', a, ε)
+    """
+    from .main import Main
+    cost = estimate_cost(a)
+    if not isinstance(a, tuple) or cost < _min_cost_ms:
+        return ('local', a, ε)
+
+    op = a[0]
+    children = a[1:]
+    if op not in SPLIT_OPS or max(estimate_cost(x) for x in children) < _min_cost_ms:
+        units.append((a, ε, cost))
+        return ('unit', len(units) - 1)
+
+    if op == '-' and len(a) == 2:
+        return ('neg', _plan(a[1], ε, units))
+    if op in ('+', '-'):
+        return (op, _plan(a[1], ε / 2, units), _plan(a[2], ε / 2, units))
+    if op == '*':
+        coarse = Decimal("0.1")
+        x0 = abs(Decimal(Main(a[1], coarse)))
+        y0 = abs(Decimal(Main(a[2], coarse)))
+        ε1 = cons(min(ε / (2 * (y0 + coarse)), coarse))
+        ε2 = cons(ε / (2 * (x0 + 2 * coarse)))
+        return ('*', _plan(a[1], ε1, units), _plan(a[2], ε2, units))
+    # op == '/'
+    if isinstance(a[2], (int, float, Decimal)) and Decimal(a[2]) == 0:
+        return ('local', a, ε)  # 由 div 报告除数为 0
+    upper = abs(Decimal(Main(a[1], Decimal("0.1")))) + Decimal("0.1")
+    y0, η = _separate(a[2])
+    lower = abs(y0) - η
+    ε1 = cons(ε * lower / 8)
+    ε2 = cons(min(lower / 2, ε * lower * lower / (8 * upper)))
+    return ('/', _plan(a[1], ε1, units), _plan(a[2], ε2, units), ε)
+
+
+def _join(plan, values):
+    """按计划合并结果；values[i] 为第 i 个重子树的值"""
+    from .main import Main
+    kind = plan[0]
+    if kind == 'local':
+        return Decimal(Main(plan[1], plan[2]))
+    if kind == 'unit':
+        return values[plan[1]]
+    if kind == 'neg':
+        return -_join(plan[1], values)
+    x = _join(plan[1], values)
+    y = _join(plan[2], values)
+    if kind == '+':
+        return x + y
+    if kind == '-':
+        return x - y
+    if kind == '*':
+        return x * y
+    return Decimal(Main(x / y, plan[3] / 2))
+
+
+def parallel_main(a, ε):
+    """
+    用进程池并行求值 a（运算为 +、-、*、/），满足误差限 ε；
+    未开启并行、日志开启或可并行的重子树不足两个时返回 None，由调用方顺序求值
+    """
+    if _pool is None or log_enabled("SUMMARY") or estimate_cost(a) < 2 * _min_cost_ms:
+        return None
+    units = []
+    plan = _plan(a, ε, units)
+    if len(units) < 2:
+        return None
+
+    # 估计耗时从大到小提交，最小的一个在本进程中先算（之后本进程合并结果并计算轻的子树）
+    from .main import Main
+    order = sorted(range(len(units)), key=lambda i: -units[i][2])
+    prec = getcontext().prec
+    context = get_context()
+    futures = {i: _pool.submit(_evaluate_subtree, units[i][0], units[i][1], prec, context.deadline, context.options)
+               for i in order[:-1]}
+    cache = get_active_cache()
+    values = [None] * len(units)
+    try:
+        local = order[-1]
+        values[local] = Decimal(Main(units[local][0], units[local][1]))
+        for i, future in futures.items():
+            values[i] = future.result()
+            if cache is not None:
+                cache.store(units[i][0], units[i][1], values[i])
+    finally:
+        for future in futures.values():
+            future.cancel()  # 出错时不再计算尚未开始的子树
+    return _join(plan, values)
@@ -1,37 +1,41 @@
-from decimal import Decimal, getcontext, localcontext
-from .log_util import add_log
+from decimal import Decimal
+import math
+from .binsplit import series_sum
+from .constants import get_constant, reset_constant_cache
+
+# Chudnovsky 公式：1/π = 12 Σ (-1)^n (6n)! (13591409 + 545140134n) / ((3n)! (n!)^3 640320^(3n+3/2))
+# 即 π = 426880·sqrt(10005) / S，S = Σ (13591409 + 545140134n) · Π p(k)/q(k)，
+# p(k) = -(6k-5)(2k-1)(6k-1)，q(k) = k³·640320³/24，每一项约增加 14.18 位有效数字
+_CHUDNOVSKY_C3_OVER_24 = 640320 ** 3 // 24
+_CHUDNOVSKY_DIGITS_PER_TERM = math.log10(640320 ** 3 / 1728)
 
-_PRECOMPUTED_PRECISION = Decimal('1E-1000')
-_pi_cached = None  # 用于缓存高精度 π 的值
 
 def reset_pi_cache():
-    global _pi_cached
-    _pi_cached = None
+    reset_constant_cache("pi")
+
+def _chudnovsky_p(k):
+    return -(6 * k - 5) * (2 * k - 1) * (6 * k - 1) if k else 1
 
-def _compute_high_precision_pi():
-    from .main import Main
-    """仅在首次调用时计算高精度 π 值并缓存"""
-    global _pi_cached
+def _chudnovsky_q(k):
+    return k * k * k * _CHUDNOVSKY_C3_OVER_24 if k else 1
 
+def _compute_pi(epsilon):
     """
-    使用公式计算 π：
-    π = 16 * arctan(1/5) - 4 * arctan(1/239)
-    支持任意精度计算
+    使用 Chudnovsky 公式和二分拆分计算 π，满足误差限 epsilon（在调用方给定的精度下进行）
+
+    级数部分在整数上精确求和，最后只做一次除法和一次开方；
+    截断误差由项数保证（多取一项余量），舍入误差由保护位吸收
     """
-    # add_log("【pi】首次调用，使用 Machin 公式计算 π")
-    # getcontext().prec = abs(_PRECOMPUTED_PRECISION.as_tuple().exponent) + 100  # 多留10位避免误差
-    pi_expr = ('-', ('*', 16, ('arctan', ('/', 1, 5))), ('*', 4, ('arctan', ('/', 1, 239))))
-    # 只计算一次
-    pi_val = Main(pi_expr, _PRECOMPUTED_PRECISION)
-    _pi_cached = Decimal(pi_val)
-    # add_log(f"计算完成，缓存 π ≈ {_pi_cached}")
+    digits = max(-Decimal(epsilon).adjusted(), 1) + 1
+    terms = int(digits / _CHUDNOVSKY_DIGITS_PER_TERM) + 2
+    s = series_sum(lambda n: 13591409 + 545140134 * n, lambda n: 1,
+                   _chudnovsky_p, _chudnovsky_q, terms)
+    return 426880 * Decimal(10005).sqrt() / s
 
 def get_pi(ε):
-    # from main import safe_decimal_quantize
-
-    """返回指定精度的 π，但不重新计算，仅从缓存中截取"""
-    if _pi_cached is None:
-        _compute_high_precision_pi()
-    # add_log(f"【pi】返回缓存的 π 值（精度要求 ε = {ε}）")
+    """
+    返回满足误差限 ε 的 π
 
-    return Decimal(_pi_cached)
\ No newline at end of file
+    由常数缓存按需计算：缓存值足够精确时直接返回，请求更多位数时才重新计算并扩展缓存
+    """
+    return get_constant("pi", ε)
@@ -0,0 +1,362 @@
+from collections import OrderedDict
+import threading
+from decimal import Decimal, localcontext, Context, ROUND_CEILING, ROUND_FLOOR, MAX_EMAX, MIN_EMIN
+from .ball import BallEvaluator, BallPrecisionError, _REWRITES
+from .cons import cons
+from .log_util import add_log
+from .precision import GUARD_DIGITS, ESTIMATE_PREC, working_precision
+
+# 静态误差预算规划：把表达式树编译成一次遍历即可完成的求值计划。
+#
+# 1. 降级：把派生运算改写为基本运算（+ - * / exp1 ln sin arctan root 整数次幂）
+# 2. 估界：以 ESTIMATE_PREC 位精度做一次球算术求值，得到每个节点 |值| 的上界和下界
+# 3. 分配：自顶向下按各节点的界给子节点分配误差限 ε（共享子树取各处要求的最小值），
+#    由 ε 和上界推导每个节点的工作精度
+# 4. 执行：按拓扑序每个节点只计算一次，没有探测求值，也没有收紧 ε 的循环
+#
+# 每个节点的误差预算：传播自子节点的误差 ≤ ε/2（算术运算为 3ε/4），
+# 内核截断误差或本节点的舍入误差 ≤ ε/4。
+
+PLAN_CACHE_SIZE = 128  # 缓存的计划数
+MAX_BOUND_ATTEMPTS = 3  # 估界时球太宽则把精度乘以 4 重试的次数
+
+_UP = Context(prec=10, rounding=ROUND_CEILING, Emax=MAX_EMAX, Emin=MIN_EMIN)
+_DOWN = Context(prec=10, rounding=ROUND_FLOOR, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+_plan_cache = OrderedDict()  # (表达式, ε) -> EvaluationPlan
+_plan_cache_lock = threading.Lock()  # 计划本身只读，可被多个线程同时执行；LRU 的调整需要加锁
+
+
+class PlanningError(ValueError):
+    """
+    无法为表达式静态分配误差（如除数或对数参数的界无法与 0 分开）
+    """
+
+
+def lower(a):
+    """
+    把表达式改写为只含基本运算的树；a^b 按指数拆成整数次幂、开方后的整数次幂或 exp(b·ln a)
+    """
+    from .Exp2 import _MAX_ROOT_DEGREE
+    from .rational import exact_rational
+    if not isinstance(a, tuple):
+        return a
+
+    op, args = a[0], a[1:]
+    if op in _REWRITES:
+        return lower(_REWRITES[op](*args))
+    if op == 'sqrt':
+        return ('root', lower(args[0]), Decimal(2))
+    if op == 'root':
+        return ('root', lower(args[0]), Decimal(args[1]))
+    if op == 'exp':
+        base, exponent = args
+        if isinstance(base, str) and base.lower() == 'e':
+            return ('exp1', lower(exponent))
+        fraction = exact_rational(exponent)
+        if fraction is not None and fraction.denominator == 1:
+            n = fraction.numerator
+            if n == 0:
+                return Decimal(1)
+            if n < 0:
+                return ('/', 1, ('exp', lower(base), Decimal(-n)))
+            return ('exp', lower(base), Decimal(n))
+        if fraction is not None and fraction.denominator <= _MAX_ROOT_DEGREE:
+            rooted = ('root', lower(base), Decimal(fraction.denominator))
+            return lower(('exp', rooted, Decimal(fraction.numerator)))
+        return ('exp1', ('*', lower(exponent), ('ln', lower(base))))
+    return (op,) + tuple(lower(x) for x in args)
+
+
+def _children(a):
+    """节点的子表达式（开方次数、整数次幂的指数与有理数常数的值不算子节点）"""
+    if not isinstance(a, tuple) or a[0] == 'rational':
+        return ()
+    if a[0] in ('root', 'exp'):
+        return (a[1],)
+    return a[1:]
+
+
+class PlanStep:
+    """
+    计划中的一步：对一个（去重后的）子树求值
+
+    upper/lower 为 |值| 的上下界，epsilon 为该节点的误差限，
+    kernel_epsilon 为内核截断误差或舍入误差的预算，prec 为执行时的工作精度
+    """
+    __slots__ = ("index", "expr", "op", "children", "upper", "lower",
+                 "epsilon", "kernel_epsilon", "prec")
+
+    def __init__(self, index, expr, children, upper, lower):
+        self.index = index
+        self.expr = expr
+        self.op = expr[0] if isinstance(expr, tuple) else ('const' if not isinstance(expr, str) else expr)
+        self.children = children
+        self.upper = upper
+        self.lower = lower
+        self.epsilon = None
+        self.kernel_epsilon = None
+        self.prec = None
+
+
+class EvaluationPlan:
+    """
+    编译好的求值计划：steps 按拓扑序排列（子节点在前），最后一步是根节点
+    """
+
+    def __init__(self, expr, epsilon, steps):
+        self.expr = expr
+        self.epsilon = epsilon
+        self.steps = steps
+
+    def execute(self):
+        """
+        按计划逐步求值，每个节点只计算一次，返回根节点的近似值
+        """
+        values = []
+        for step in self.steps:
+            with localcontext() as ctx:
+                ctx.prec = step.prec
+                values.append(_execute_step(step, [values[i] for i in step.children]))
+        return values[-1]
+
+    def dump(self):
+        """
+        返回计划的文本表示：每一步的运算、|值| 上界、误差限与工作精度
+        """
+        lines = [f"计划: ε = {self.epsilon:.0e}，{len(self.steps)} 步，"
+                 f"工作精度合计 {sum(step.prec for step in self.steps)} 位"]
+        lines.append(f"{'#':>4}  {'运算':<8}{'子节点':<12}{'|值| ≤':>10}{'ε':>10}{'内核 ε':>10}{'精度':>7}  表达式")
+        for step in self.steps:
+            children = ",".join(str(i) for i in step.children)
+            expr = str(step.expr)
+            if len(expr) > 40:
+                expr = expr[:37] + "..."
+            lines.append(f"{step.index:>4}  {step.op:<8}{children:<12}{step.upper:>10.1e}"
+                         f"{step.epsilon:>10.0e}{step.kernel_epsilon:>10.0e}{step.prec:>7}  {expr}")
+        return "\n".join(lines)
+
+
+def _ball_bounds(lowered):
+    """
+    低精度球求值，返回 {子树: Ball}；球太宽时提高精度重试
+    """
+    prec = ESTIMATE_PREC
+    for _ in range(MAX_BOUND_ATTEMPTS):
+        evaluator = BallEvaluator(prec)
+        try:
+            with localcontext() as ctx:
+                ctx.prec = prec + GUARD_DIGITS
+                evaluator.evaluate(lowered)
+            return evaluator.memo
+        except BallPrecisionError:
+            prec *= 4
+    raise PlanningError(f"以 {prec // 4} 位精度估界仍无法把除数或对数参数与 0 分开")
+
+
+def _leaf_value(a, epsilon):
+    """常数叶子的值：数值精确转换，π 与 e 按误差限读取常数缓存"""
+    from .constants import get_pi, get_e
+    if isinstance(a, str):
+        return {'pi': get_pi, 'e': get_e}[a.lower()](epsilon)
+    return Decimal(str(a)) if isinstance(a, float) else Decimal(a)
+
+
+def _collect_steps(lowered, balls):
+    """
+    后序遍历（去重）得到拓扑序的步骤列表
+    """
+    index_of = {}
+    steps = []
+
+    def visit(a):
+        key = a if isinstance(a, (tuple, str)) else ('const', Decimal(str(a)) if isinstance(a, float) else Decimal(a))
+        if key in index_of:
+            return index_of[key]
+        children = tuple(visit(x) for x in _children(a))
+        if isinstance(a, tuple):
+            ball = balls[a]
+            upper = _UP.add(abs(ball.mid), ball.rad)
+            lower = max(_DOWN.subtract(abs(ball.mid), ball.rad), Decimal(0))
+        else:
+            # 数值叶子是精确的，π 与 e 按估界精度读取
+            eta = Decimal(1).scaleb(-ESTIMATE_PREC) if isinstance(a, str) else Decimal(0)
+            value = abs(_leaf_value(a, eta or 1))
+            upper = _UP.add(value, eta)
+            lower = _DOWN.subtract(value, eta)
+        index_of[key] = len(steps)
+        steps.append(PlanStep(len(steps), a, children, upper, lower))
+        return index_of[key]
+
+    visit(lowered)
+    return steps
+
+
+def _require_positive(step, what):
+    if step.lower <= 0:
+        raise PlanningError(f"{what}的下界无法与 0 分开: {step.expr}")
+    return step.lower
+
+
+def _allocate(step, steps):
+    """
+    按节点 step 的误差限 ε 给子节点分配误差限，返回 [(子节点, ε), ...]
+    """
+    ε = step.epsilon
+    op = step.op
+    kids = [steps[i] for i in step.children]
+    one = Decimal(1)
+
+    if op in ('+', '-'):
+        share = ε * 3 / 8 if len(kids) == 2 else ε * 3 / 4
+        return [(kid, share) for kid in kids]
+    if op == '*':
+        x, y = kids
+        # |xy - x'y'| ≤ |x|·δy + |y'|·δx ≤ ε/4 + ε/4
+        return [(x, _DOWN.divide(ε, _UP.multiply(4, _UP.add(y.upper, one)))),
+                (y, min(one, _DOWN.divide(ε, _UP.multiply(4, _UP.add(x.upper, one)))))]
+    if op == '/':
+        x, y = kids
+        # |x/y - x'/y'| ≤ (δx + Q·δy) / (L - δy)，δy ≤ L/2 时不超过 2(δx + Q·δy)/L ≤ ε/2
+        low = _require_positive(y, "除数")
+        quotient = _UP.divide(x.upper, low)
+        return [(x, _DOWN.divide(_DOWN.multiply(ε, low), 8)),
+                (y, min(low / 2, _DOWN.divide(_DOWN.multiply(ε, low), _UP.multiply(8, _UP.add(quotient, one)))))]
+    if op == 'exp1':
+        # e^x·(e^δ - 1) ≤ U·2δ（δ ≤ 1）
+        return [(kids[0], min(one, _DOWN.divide(ε, _UP.multiply(4, step.upper))))]
+    if op == 'ln':
+        # ln 在 [L - δ, ∞) 上的导数不超过 2/L（δ ≤ L/2）
+        low = _require_positive(kids[0], "对数参数")
+        return [(kids[0], min(low / 2, _DOWN.divide(_DOWN.multiply(ε, low), 4)))]
+    if op in ('sin', 'arctan'):
+        return [(kids[0], ε / 2)]
+    if op == 'root':
+        x = kids[0]
+        if x.upper.is_zero():
+            return [(x, ε)]
+        # 在 [L/2, ∞) 上 x^(1/n) 的导数不超过 2R/(n·L)，R 为结果的上界
+        n = int(step.expr[2])
+        low = _require_positive(x, "被开方数")
+        slope = _UP.divide(_UP.multiply(2, step.upper), _DOWN.multiply(n, low))
+        return [(x, min(low / 2, _DOWN.divide(ε, _UP.multiply(2, slope))))]
+    if op == 'exp':
+        # |a^n - b^n| ≤ n·(M + δ)^(n-1)·δ ≤ n·(M + 1)^(n-1)·δ（δ ≤ 1）
+        x = kids[0]
+        n = int(step.expr[2])
+        growth = _UP.multiply(2 * n, _UP.power(_UP.add(x.upper, one), n - 1))
+        return [(x, min(one, _DOWN.divide(ε, growth)))]
+    return []
+
+
+def _step_precision(step):
+    """
+    工作精度：容纳 |值| 的整数位和内核误差预算对应的小数位；整数次幂再为多次乘法的舍入多留几位
+    """
+    magnitude = step.upper.adjusted() if not step.upper.is_zero() else 0
+    prec = working_precision(magnitude, step.kernel_epsilon)
+    if step.op == 'exp':
+        prec += len(str(2 * int(step.expr[2]).bit_length()))
+    return prec
+
+
+def compile_plan(a, ε):
+    """
+    把表达式 a 编译为满足误差限 ε 的求值计划
+    """
+    ε = Decimal(ε)
+    lowered = lower(a)
+    steps = _collect_steps(lowered, _ball_bounds(lowered) if isinstance(lowered, tuple) else {})
+
+    # 逆拓扑序：节点的所有父节点都已分配完毕，共享子树取各处要求的最小值
+    steps[-1].epsilon = cons(ε)
+    for step in reversed(steps):
+        step.kernel_epsilon = cons(step.epsilon / 4)
+        step.prec = _step_precision(step)
+        for kid, kid_epsilon in _allocate(step, steps):
+            kid_epsilon = cons(kid_epsilon)
+            if kid.epsilon is None or kid_epsilon < kid.epsilon:
+                kid.epsilon = kid_epsilon
+    return EvaluationPlan(a, ε, steps)
+
+
+def get_plan(a, ε):
+    """
+    返回表达式 a 在误差限 ε 下的计划；相同的 (表达式, ε) 复用已编译的计划
+    """
+    key = (a, Decimal(ε))
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+    plan = compile_plan(a, ε)  # 编译不持锁，两个线程同时编译同一计划时保留后者
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_plan_cache():
+    with _plan_cache_lock:
+        _plan_cache.clear()
+
+
+def dump_plan(a, ε):
+    """
+    返回表达式 a 在误差限 ε 下的计划文本，查看精度预算花在哪些节点上
+    """
+    return get_plan(a, ε).dump()
+
+
+def _execute_step(step, args):
+    from .Exp import Exp1
+    from .Exp2 import _binary_power
+    from .ln import ln1
+    from .sin import sin1
+    from .arctan import arctan1
+    from .root import root1
+
+    op = step.op
+    kernel_epsilon = step.kernel_epsilon
+    if not isinstance(step.expr, tuple):
+        return _leaf_value(step.expr, step.epsilon)
+    if op == '+':
+        return +(args[0] + args[1])
+    if op == '-':
+        return -args[0] if len(args) == 1 else +(args[0] - args[1])
+    if op == '*':
+        return args[0] * args[1]
+    if op == '/':
+        return args[0] / args[1]
+    if op == 'rational':
+        value = step.expr[1]
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    if op == 'exp1':
+        return Decimal(Exp1(args[0], kernel_epsilon))
+    if op == 'ln':
+        return Decimal(ln1(args[0], kernel_epsilon))
+    if op == 'sin':
+        return Decimal(sin1(args[0], kernel_epsilon))
+    if op == 'arctan':
+        return Decimal(arctan1(args[0], kernel_epsilon))
+    if op == 'root':
+        return Decimal(root1(args[0], int(step.expr[2]), kernel_epsilon))
+    if op == 'exp':
+        return +_binary_power(args[0], int(step.expr[2]))
+    raise ValueError(f"无法解析的操作: {op}")
+
+
+def plan_main(a, ε):
+    """
+    按静态计划计算表达式 a；无法静态分配误差时改用球算术引擎
+    """
+    from .ball import ball_main
+    try:
+        plan = get_plan(a, ε)
+    except PlanningError as error:
+        add_log("【plan】无法编译求值计划（{}），改用球算术引擎", error, level="SUMMARY")
+        return ball_main(a, ε)
+    add_log("【plan】按计划求值：{} 步，每个节点计算一次", len(plan.steps), level="SUMMARY")
+    return plan.execute()
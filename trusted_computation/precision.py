@@ -0,0 +1,71 @@
+from decimal import Decimal, getcontext, localcontext
+from .context import get_option, set_option
+
+# 自适应精度：根据所需有效数字位数推导误差限 ε 与 Decimal 工作精度
+
+GUARD_DIGITS = 10  # 保护位数，吸收中间结果的舍入误差
+ESTIMATE_PREC = 30  # 粗略估计结果数量级时使用的工作精度
+MAX_ESCALATIONS = 4  # 结果过于接近舍入边界时的最大提升次数
+ZERO_SEARCH_DIGITS = 1000  # 估计数量级时与 0 区分的最小误差限 10^-ZERO_SEARCH_DIGITS
+
+
+def decimal_magnitude(value):
+    """
+    返回 |value| 的数量级 floor(log10|value|)，value 为 0 时返回 None
+    """
+    value = Decimal(value)
+    if value.is_zero():
+        return None
+    return value.adjusted()
+
+
+def epsilon_for_sig_digits(magnitude, sig_digits, guard=GUARD_DIGITS):
+    """
+    由结果的数量级推导保留 sig_digits 位有效数字所需的误差限 ε
+
+    magnitude 为结果的数量级（可能偏差 1），因此额外多留一位
+    """
+    return Decimal(10) ** (magnitude - sig_digits - guard - 1)
+
+
+def working_precision(magnitude, ε, guard=GUARD_DIGITS):
+    """
+    由结果数量级和误差限 ε 推导 Decimal 上下文精度（有效数字位数）
+
+    中间结果可能比最终结果大，因此数量级至少按 0 计
+    """
+    magnitude = max(magnitude if magnitude is not None else 0, 0)
+    return magnitude - Decimal(ε).adjusted() + 1 + guard
+
+
+# === 按调用缩放的工作精度 ===
+# 每次子求值（Main 的一次调用）只使用与其 ε 和结果数量级相称的精度，
+# 使 ε = 0.1 这类粗略估计不再以全局的上千位精度运行
+
+MAGNITUDE_ALLOWANCE = 10  # 结果数量级未知时预留的整数位数
+
+
+def set_call_precision(enabled: bool):
+    """
+    在当前求值上下文中开启/关闭按调用缩放的工作精度（关闭时所有子求值都使用调用方的全局精度）
+    """
+    set_option("call_precision", enabled)
+
+
+def call_precision_enabled():
+    return get_option("call_precision")
+
+
+def scaled_context(ε, magnitude=MAGNITUDE_ALLOWANCE):
+    """
+    返回一个局部 Decimal 上下文，其精度由 ε 和结果数量级推导
+
+    精度只取决于本次调用的 ε，不受调用方上下文精度的限制：子节点的误差限
+    可能比父节点紧得多（如幂的底数），若被父节点的缩放精度截断，
+    舍入误差会超过子节点承诺的 ε 并被写入缓存。
+    关闭按调用缩放精度时返回与当前精度相同的局部上下文
+    """
+    ctx = getcontext().copy()
+    if get_option("call_precision"):
+        ctx.prec = working_precision(magnitude, ε)
+    return localcontext(ctx)
@@ -0,0 +1,166 @@
+from fractions import Fraction
+from decimal import Decimal, localcontext
+from .context import get_option, set_option
+from .dag import Node, node
+from .precision import working_precision
+
+# 精确有理数折叠：只由数值常数和 + - * / 及整数次幂构成的子树的值是精确的有理数，
+# 求值前把这样的子树折叠成一个常数节点，不再经过 mul/div 的多步 ε 分配。
+#
+# 折叠结果是有限小数（分母只含因子 2 和 5）时直接给出精确的 Decimal 常数，
+# 否则给出 ('rational', Fraction) 节点，求值时按所需 ε 只舍入一次。
+# 分子或分母超过 MAX_RATIONAL_BITS 位的子树不折叠（避免大整数膨胀），其较小的子树仍会折叠。
+
+MAX_RATIONAL_BITS = 8192  # 折叠结果分子、分母的最大二进制位数（约 2466 位十进制数字）
+
+def set_rational_folding(enabled: bool):
+    """
+    在当前求值上下文中开启或关闭有理数折叠（关闭时按原来的 mul/div 协议逐个节点求值，用于基准对比）
+    """
+    set_option("rational_folding", enabled)
+
+
+def rational_folding_enabled():
+    return get_option("rational_folding")
+
+
+def _within_cap(value):
+    return (value.numerator.bit_length() <= MAX_RATIONAL_BITS
+            and value.denominator.bit_length() <= MAX_RATIONAL_BITS)
+
+
+def _rational_power(base, n):
+    """
+    base^n（n 为整数）；0 的负整数次幂或结果超出大小上限时返回 None
+    """
+    if base == 0:
+        return None if n < 0 else Fraction(0 if n else 1)
+    size = max(base.numerator.bit_length(), base.denominator.bit_length())
+    if size * abs(n) > MAX_RATIONAL_BITS + size:
+        return None
+    return base ** n
+
+
+def _apply(op, operands):
+    """
+    对精确操作数做一次有理运算；不是有理运算、除以 0 或结果超出大小上限时返回 None
+    """
+    result = None
+    if op == '-' and len(operands) == 1:
+        result = -operands[0]
+    elif op == '+':
+        result = operands[0] + operands[1]
+    elif op == '-':
+        result = operands[0] - operands[1]
+    elif op == '*':
+        result = operands[0] * operands[1]
+    elif op == '/' and operands[1] != 0:
+        result = operands[0] / operands[1]
+    elif op == 'exp' and operands[1].denominator == 1:
+        result = _rational_power(operands[0], operands[1].numerator)
+    if result is None or not _within_cap(result):
+        return None
+    return result
+
+
+def exact_rational(a):
+    """
+    若 a 是只由数值常数和 + - * / 及整数次幂构成的子树（含已折叠的 rational 节点），
+    返回其精确的 Fraction，否则（或结果超出大小上限时）返回 None
+    """
+    if isinstance(a, (int, Decimal)):
+        return Fraction(a)
+    if not isinstance(a, tuple):
+        return None
+    if a[0] == 'rational':
+        return a[1]
+
+    operands = [exact_rational(x) for x in a[1:]]
+    if any(x is None for x in operands):
+        return None
+    return _apply(a[0], operands)
+
+
+def _terminating_decimal(value):
+    """
+    分母只含因子 2 和 5 时返回与 value 精确相等的 Decimal，否则返回 None
+    """
+    denominator = value.denominator
+    twos = fives = 0
+    while denominator % 2 == 0:
+        denominator //= 2
+        twos += 1
+    while denominator % 5 == 0:
+        denominator //= 5
+        fives += 1
+    if denominator != 1:
+        return None
+    k = max(twos, fives)
+    digits = abs(value.numerator) * (10 ** k // value.denominator)
+    sign = 1 if value < 0 else 0
+    # 由符号、数字和指数直接构造，不受上下文精度影响
+    return Decimal((sign, Decimal(digits).as_tuple().digits, -k))
+
+
+def rational_constant(value):
+    """
+    把精确有理数表示为表达式树中的常数：有限小数为 Decimal，否则为 ('rational', Fraction) 节点
+    """
+    exact = _terminating_decimal(value)
+    if exact is not None:
+        return exact
+    return node('rational', value)
+
+
+def _fold(a):
+    """
+    自底向上折叠，返回 (折叠后的子树, 精确值)；子树不是精确有理数时精确值为 None。
+    整棵子树可折叠时子树部分为 None，由第一个不可折叠的父节点（或顶层）生成常数，
+    中间各层不必构造常数节点
+    """
+    if isinstance(a, (int, Decimal)):
+        return a, Fraction(a)
+    if not isinstance(a, tuple):
+        return a, None
+    if a[0] == 'rational':
+        return a, a[1]
+
+    children = [_fold(x) for x in a[1:]]
+    operands = [value for _, value in children]
+    if all(value is not None for value in operands):
+        result = _apply(a[0], operands)
+        if result is not None:
+            return None, result
+
+    folded = tuple(tree if tree is not None else rational_constant(value) for tree, value in children)
+    if all(x is y for x, y in zip(folded, a[1:])):
+        return a, None
+    return node(a[0], *folded), None
+
+
+def fold_rationals(a):
+    """
+    把表达式中所有可精确计算的 + - * / 与整数次幂子树折叠为常数（一次自底向上遍历）
+    """
+    if not get_option("rational_folding"):
+        return a
+    folded = getattr(a, "folded", None)  # 共享节点上记录的折叠结果，重复求值同一表达式时不必再折叠
+    if folded is not None:
+        return folded
+    tree, value = _fold(a)
+    folded = tree if tree is not None else rational_constant(value)
+    if isinstance(a, Node):
+        a.folded = folded
+    return folded
+
+
+def rational_value(value, ε):
+    """
+    返回有理数 value 的 Decimal 近似值，满足误差限 ε（只做一次除法）
+    """
+    if value.denominator == 1:
+        return Decimal(value.numerator)
+    magnitude = value.numerator.bit_length() - value.denominator.bit_length()
+    with localcontext() as ctx:
+        ctx.prec = working_precision(magnitude * 3 // 10 + 1, ε)
+        return Decimal(value.numerator) / Decimal(value.denominator)
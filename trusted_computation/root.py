@@ -0,0 +1,140 @@
+from decimal import Decimal, localcontext
+import math
+from .cons import cons
+from .log_util import add_log, get_log_level
+from .precision import GUARD_DIGITS, working_precision
+from .rational import exact_rational
+from .series import log_abs
+
+_FLOAT_DIGITS = 15  # 浮点初值的有效位数，Newton 迭代从这里开始倍增精度
+_DEGREE_EPSILON = Decimal('1e-20')  # 开方次数不是精确常数时求值的误差限
+
+
+def _root_degree(n):
+    """
+    检查并返回开方次数（正整数）。n 可以是表达式：精确的有理常数（含折叠关闭时的 2+1、
+    rational 节点）直接判断；否则（如 sqrt(9)）以 _DEGREE_EPSILON 求值，与最近整数的距离
+    小于误差限时取该整数
+    """
+    value = exact_rational(n)
+    if value is None:
+        from .main import Main
+        value = Decimal(Main(n, _DEGREE_EPSILON))
+        nearest = value.to_integral_value()
+        if abs(value - nearest) < _DEGREE_EPSILON:
+            value = nearest
+    if value != int(value) or value < 1:
+        raise ValueError(f"开方次数必须是正整数: {value}")
+    return int(value)
+
+
+def root(a, n, epsilon):
+    from .main import Main
+    """
+    计算 a 的 n 次方根，如果 a 是常数则直接计算，如果是表达式则通过 main 进行处理。
+
+    误差分配：先以 0.1 粗略估计 ã，若 |ã| - 0.1 = L > 0，
+    根函数在 [L, ∞) 上的导数不超过 1/(n·min(1, L))，按导数分配 a 的误差限；
+    否则 a 可能接近 0，改用 |a^(1/n) - b^(1/n)| ≤ |a - b|^(1/n) 分配。
+
+    参数:
+    a -- 输入值，可能是一个数值或表达式
+    n -- 开方次数（正整数）
+    epsilon -- 允许的误差限
+
+    返回:
+    近似值 y ≈ a^(1/n)，满足 |y - a^(1/n)| < epsilon
+    """
+    n = _root_degree(n)
+
+    # 如果 a 是常数，直接计算
+    if isinstance(a, (int, float, Decimal)):
+        return root1(Decimal(a), n, epsilon)
+
+    a_tilde = Decimal(Main(a, Decimal('0.1')))  # 粗略估计 ã
+    lower = abs(a_tilde) - Decimal('0.1')
+    if lower > 0:
+        epsilon_a = cons(Decimal(epsilon) / 2 * n * min(Decimal(1), lower))
+    else:
+        epsilon_a = cons((Decimal(epsilon) / 2) ** n / 2)
+    # add_log(f"【root】粗略估计 ã ≈ {a_tilde}，分配给 a 的误差限 ε′ = {epsilon_a}")
+
+    a_val = Decimal(Main(a, epsilon_a))
+    if a_val < 0 and n % 2 == 0:
+        if a_val + epsilon_a < 0:
+            raise ValueError(f"偶次方根的被开方数必须非负: {a_val}")
+        a_val = Decimal(0)  # 与 0 的距离不超过 2ε′，按 0 处理
+    return root1(a_val, n, epsilon / 2)
+
+
+def sqrt(a, epsilon):
+    """
+    计算 sqrt(a)，满足误差限 epsilon
+    """
+    return root(a, 2, epsilon)
+
+
+def _initial_root(c, n):
+    """
+    用浮点对数给出 c^(1/n) 的初值（c 可超出 float 范围）
+    """
+    log10_root = log_abs(c) / math.log(10) / n
+    exponent = math.floor(log10_root)
+    mantissa = 10 ** (log10_root - exponent)
+    return Decimal(repr(mantissa)).scaleb(exponent)
+
+
+def root1(c, n, epsilon):
+    """
+    计算 c 的 n 次方根（c 是数值），使用精度倍增的 Newton 迭代，满足误差限 epsilon。
+
+    迭代 y ← ((n-1)·y + c / y^(n-1)) / n，每一步把工作精度翻倍。
+    误差界：真值 c^(1/n) 总位于 y 与 c / y^(n-1) 之间，
+    因此 |y - c^(1/n)| ≤ |y - c / y^(n-1)|，不满足 ε/2 时继续迭代。
+
+    参数:
+    c -- 输入值（n 为偶数时必须非负）
+    n -- 开方次数（正整数）
+    epsilon -- 允许的误差限
+
+    返回:
+    近似值 y ≈ c^(1/n)，满足 |y - c^(1/n)| < epsilon
+    """
+    c = Decimal(c)
+    n = _root_degree(n)
+    epsilon = Decimal(epsilon)
+
+    if n == 1 or c.is_zero():
+        return c
+    if c < 0:
+        if n % 2 == 0:
+            raise ValueError(f"偶次方根的被开方数必须非负: {c}")
+        return -root1(-c, n, epsilon)
+
+    log_level = get_log_level()
+    if log_level != "NONE":
+        add_log("【root】使用 Newton 迭代计算 {} 的 {} 次方根", c, n, level="SUMMARY")
+
+    y = _initial_root(c, n)
+    target = working_precision(y.adjusted(), epsilon / 2)
+    prec = _FLOAT_DIGITS
+    iterations = 0
+
+    while True:
+        prec = min(2 * prec, target)
+        with localcontext() as ctx:
+            ctx.prec = prec + GUARD_DIGITS
+            y = ((n - 1) * y + c / y ** (n - 1)) / n
+            iterations += 1
+            if prec < target:
+                continue
+            # 误差界 |y - c / y^(n-1)|，再加上计算它本身的舍入误差
+            bound = abs(y - c / y ** (n - 1)) + Decimal(10) ** (y.adjusted() - prec)
+        if bound < epsilon / 2:
+            break
+        target += GUARD_DIGITS  # 舍入误差成为瓶颈时提高目标精度
+
+    if log_level == "SUMMARY":
+        add_log("【root】Newton 迭代 {} 次，误差界 {:.1e} < ε/2", iterations, bound, level="SUMMARY")
+
+    return Decimal(y)
@@ -0,0 +1,39 @@
+import math
+from decimal import Decimal
+
+# 泰勒级数项数估计：在对数域用 lgamma 给出余项上界，避免在 Decimal 上反复求幂和阶乘
+
+_LN10 = math.log(10)
+
+
+def log_abs(x):
+    """
+    返回 ln|x| 的浮点近似，x 可以是超出 float 范围的 Decimal（如 1E-5000）
+    """
+    x = abs(Decimal(x))
+    if x.is_zero():
+        return -math.inf
+    exponent = x.adjusted()
+    mantissa = float(x.scaleb(-exponent))
+    return math.log(mantissa) + exponent * _LN10
+
+
+def terms_needed(log_bound, n0=0):
+    """
+    返回使 log_bound(n) < 0 的最小整数 n ≥ n0
+
+    log_bound(n) 是第 n 项之后余项上界与误差限之比的对数，
+    在 n ≥ n0 时单调递减。先倍增找到满足条件的上界，再二分。
+    """
+    if log_bound(n0) < 0:
+        return n0
+    low, high = n0, max(2 * n0, n0 + 1)
+    while log_bound(high) >= 0:
+        low, high = high, 2 * high
+    while high - low > 1:
+        middle = (low + high) // 2
+        if log_bound(middle) < 0:
+            high = middle
+        else:
+            low = middle
+    return high
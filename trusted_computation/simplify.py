@@ -0,0 +1,318 @@
+from fractions import Fraction
+from decimal import Decimal
+from .context import get_option, set_option
+from .dag import Node, node
+from .rational import rational_constant
+
+# 表驱动的代数化简：在解析之后、求值之前按恒等式改写表达式，整段跳过可以精确确定的超越函数求值。
+#
+# 规则按运算分组（RULES），每条规则是 (名称, 函数)，函数接收节点的参数，
+# 可以改写时返回新的子树，否则返回 None。化简自底向上进行，一个节点改写后
+# 对新节点继续套用规则，直到没有规则适用。每次改写都记录在改写轨迹中，
+# Main 把轨迹写入解释日志，使日志中的计算过程与实际求值的表达式一致。
+#
+# 只使用在参数有定义时严格成立的恒等式；e^(ln x) = x 只在 x 可确定为正时使用。
+# 会丢掉子树的规则（x - x = 0、x^0 = 1、1^x = 1）只在该子树处处有定义时使用，
+# 否则 ln(-1) - ln(-1) 这类表达式的定义域错误会被化简掉。
+# 化简在有理数折叠之后进行（见 Main），纯有理子树此时已是常数，判断常数只需看叶子。
+
+MAX_REWRITES = 1000  # 单个表达式的最大改写次数，防止规则之间来回改写
+
+ZERO = Decimal(0)
+ONE = Decimal(1)
+
+
+def set_simplification(enabled: bool):
+    """
+    在当前求值上下文中开启或关闭求值前的代数化简（用于对比与调试）
+    """
+    set_option("simplification", enabled)
+
+
+def simplification_enabled():
+    return get_option("simplification")
+
+
+def _is_pi(a):
+    return isinstance(a, str) and a.lower() == 'pi'
+
+
+def _is_e(a):
+    return isinstance(a, str) and a.lower() == 'e'
+
+
+def _constant(a):
+    """常数叶子（数值或折叠后的 rational 节点）的精确值，其他表达式返回 None"""
+    if isinstance(a, (int, Decimal)):
+        return Fraction(a)
+    if isinstance(a, tuple) and a[0] == 'rational':
+        return a[1]
+    return None
+
+
+def _equals(a, value):
+    r = _constant(a)
+    return r is not None and r == value
+
+
+# 在任何实数参数上都有定义的运算：只由常数和这些运算组成的子树一定有值
+_TOTAL_OPS = {'+', '-', '*', 'exp1', 'sin', 'cos', 'arctan', 'sinh', 'cosh', 'tanh'}
+
+
+def _defined(a):
+    """能否不经数值计算确定子树 a 有定义（不会在求值时报定义域错误）"""
+    if _constant(a) is not None or _is_pi(a) or _is_e(a):
+        return True
+    if not isinstance(a, tuple) or not all(_defined(x) for x in a[1:]):
+        return False
+    if a[0] in ('ln', 'sqrt'):
+        return _positive(a[1])
+    return a[0] in _TOTAL_OPS
+
+
+def _neg(a):
+    if a is None:
+        return None
+    if isinstance(a, tuple) and a[0] == '-' and len(a) == 2:
+        return a[1]
+    return node('-', a)
+
+
+def _add(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return node('+', a, b)
+
+
+def _positive(a):
+    """能否不经数值计算确定 a > 0"""
+    if _is_pi(a) or _is_e(a):
+        return True
+    value = _constant(a)
+    if value is not None:
+        return value > 0
+    return isinstance(a, tuple) and a[0] in ('exp1', 'cosh')
+
+
+# === 三角函数参数中的 π 的倍数 ===
+
+def _pi_split(a):
+    """
+    把 a 拆成 k·π + rest（k 为精确有理数），rest 为 None 表示没有其余部分
+    """
+    if _is_pi(a):
+        return Fraction(1), None
+    if not isinstance(a, tuple) or _constant(a) is not None:
+        return Fraction(0), a
+
+    op = a[0]
+    if op == '-' and len(a) == 2:
+        k, rest = _pi_split(a[1])
+        if k == 0:
+            return k, a
+        return -k, _neg(rest)
+    if op in ('+', '-'):
+        k1, rest1 = _pi_split(a[1])
+        k2, rest2 = _pi_split(a[2])
+        if k1 == 0 and k2 == 0:  # 不含 π 的子树原样返回，不构造新节点
+            return k1, a
+        if op == '-':
+            k2, rest2 = -k2, _neg(rest2)
+        return k1 + k2, _add(rest1, rest2)
+    if op == '*':
+        for coefficient, other in ((a[1], a[2]), (a[2], a[1])):
+            c = _constant(coefficient)
+            if c is not None:
+                k, rest = _pi_split(other)
+                if rest is None:
+                    return k * c, None
+                if k:
+                    return k * c, node('*', coefficient, rest)
+    if op == '/':
+        c = _constant(a[2])
+        if c:
+            k, rest = _pi_split(a[1])
+            if rest is None:
+                return k / c, None
+            if k:
+                return k / c, node('/', rest, a[2])
+    return Fraction(0), a
+
+
+def _pi_multiple(k):
+    """k·π 的表达式"""
+    if k == 1:
+        return 'pi'
+    return node('*', rational_constant(k), 'pi')
+
+
+def _quarter_turns(x, period):
+    """
+    若参数 x = rest + m·π/2（m 为整数，m ≠ 0），返回 (m mod period, rest)，否则返回 None
+    """
+    k, rest = _pi_split(x)
+    m = 2 * k
+    if k == 0 or m.denominator != 1:
+        return None
+    return int(m.numerator) % period, rest
+
+
+def _reduce_period(x, period):
+    """
+    参数中 π 的非半整数倍系数按周期（以 π 为单位）约简到 [0, period)，没有变化时返回 None
+    """
+    k, rest = _pi_split(x)
+    if (2 * k).denominator == 1 or 0 <= k < period:
+        return None
+    return _add(rest, _pi_multiple(k % period))
+
+
+# 平移 m·π/2 后的结果：(函数, 符号)；rest 为 None 时给出精确值
+_SHIFTED = {
+    'sin': [('sin', 1), ('cos', 1), ('sin', -1), ('cos', -1)],
+    'cos': [('cos', 1), ('sin', -1), ('cos', -1), ('sin', 1)],
+    'sec': [('sec', 1), ('csc', -1), ('sec', -1), ('csc', 1)],
+    'csc': [('csc', 1), ('sec', 1), ('csc', -1), ('sec', -1)],
+    'tan': [('tan', 1), ('cot', -1)],
+    'cot': [('cot', 1), ('tan', -1)],
+}
+# 参数为 0 时各函数的值（None 表示无定义，留给求值时报错）
+_AT_ZERO = {'sin': ZERO, 'cos': ONE, 'sec': ONE, 'csc': None, 'tan': ZERO, 'cot': None}
+
+
+def _trig_shift(op):
+    table = _SHIFTED[op]
+
+    def rule(x):
+        turns = _quarter_turns(x, len(table))
+        if turns is None:
+            return None
+        m, rest = turns
+        func, sign = table[m]
+        if rest is None:
+            value = _AT_ZERO[func]
+            if value is None:
+                return None
+            return -value if sign < 0 and value else value
+        result = node(func, rest)
+        return result if sign > 0 else node('-', result)
+    return rule
+
+
+def _trig_period(op):
+    period = 2 if op in ('sin', 'cos', 'sec', 'csc') else 1
+
+    def rule(x):
+        reduced = _reduce_period(x, period)
+        return node(op, reduced) if reduced is not None else None
+    return rule
+
+
+def _trig_rules(op):
+    return [(f"{op}(x + m·π/2) 的诱导公式", _trig_shift(op)),
+            (f"{op} 参数中 π 的倍数按周期约简", _trig_period(op))]
+
+
+# === 规则表 ===
+
+RULES = {
+    '+': [
+        ("x + 0 = x", lambda x, y: x if _equals(y, 0) else (y if _equals(x, 0) else None)),
+    ],
+    '-': [
+        ("-(-x) = x", lambda x, y=None: x[1] if y is None and isinstance(x, tuple) and x[0] == '-' and len(x) == 2 else None),
+        ("x - 0 = x", lambda x, y=None: x if y is not None and _equals(y, 0) else None),
+        ("0 - x = -x", lambda x, y=None: node('-', y) if y is not None and _equals(x, 0) else None),
+        ("x - x = 0", lambda x, y=None: ZERO if y is not None and x == y and _defined(x) else None),
+    ],
+    '*': [
+        ("x·1 = x", lambda x, y: x if _equals(y, 1) else (y if _equals(x, 1) else None)),
+        ("x·(-1) = -x", lambda x, y: node('-', x) if _equals(y, -1) else (node('-', y) if _equals(x, -1) else None)),
+    ],
+    '/': [
+        ("x / 1 = x", lambda x, y: x if _equals(y, 1) else None),
+    ],
+    'exp': [
+        ("x^1 = x", lambda x, y: x if _equals(y, 1) else None),
+        ("x^0 = 1", lambda x, y: ONE if _equals(y, 0) and _defined(x) else None),
+        ("1^x = 1", lambda x, y: ONE if _equals(x, 1) and _defined(y) else None),
+        ("e^x 改用指数函数", lambda x, y: node('exp1', y) if _is_e(x) else None),
+    ],
+    'exp1': [
+        ("e^0 = 1", lambda x: ONE if _equals(x, 0) else None),
+        ("e^(ln x) = x（x > 0）", lambda x: x[1] if isinstance(x, tuple) and x[0] == 'ln' and _positive(x[1]) else None),
+    ],
+    'ln': [
+        ("ln(1) = 0", lambda x: ZERO if _equals(x, 1) else None),
+        ("ln(e) = 1", lambda x: ONE if _is_e(x) else None),
+        ("ln(e^x) = x", lambda x: x[1] if isinstance(x, tuple) and x[0] == 'exp1' else None),
+    ],
+    'sqrt': [
+        ("sqrt(0) = 0, sqrt(1) = 1", lambda x: x if _equals(x, 0) or _equals(x, 1) else None),
+    ],
+    'arctan': [
+        ("arctan(0) = 0", lambda x: ZERO if _equals(x, 0) else None),
+    ],
+    'arcsin': [
+        ("arcsin(0) = 0", lambda x: ZERO if _equals(x, 0) else None),
+    ],
+    'sinh': [
+        ("sinh(0) = 0", lambda x: ZERO if _equals(x, 0) else None),
+    ],
+    'cosh': [
+        ("cosh(0) = 1", lambda x: ONE if _equals(x, 0) else None),
+    ],
+    'tanh': [
+        ("tanh(0) = 0", lambda x: ZERO if _equals(x, 0) else None),
+    ],
+}
+for _op in _SHIFTED:
+    RULES[_op] = _trig_rules(_op)
+
+
+def _apply_rules(a, trace):
+    """对单个节点套用规则直到没有规则适用；参数已化简"""
+    while isinstance(a, tuple) and len(trace) < MAX_REWRITES:
+        for name, rule in RULES.get(a[0], ()):
+            result = rule(*a[1:])
+            if result is not None:
+                trace.append((name, a, result))
+                a = _simplify(result, trace)
+                break
+        else:
+            return a
+    return a
+
+
+def _simplify(a, trace):
+    if not isinstance(a, tuple) or a[0] == 'rational':
+        return a
+    args = tuple(_simplify(x, trace) for x in a[1:])
+    if not all(x is y for x, y in zip(args, a[1:])):
+        a = node(a[0], *args)
+    return _apply_rules(a, trace)
+
+
+def simplify_with_trace(a):
+    """
+    化简表达式 a，返回 (化简后的表达式, 改写轨迹)；轨迹中每一项为 (规则名称, 改写前, 改写后)
+    """
+    if not get_option("simplification"):
+        return a, []
+    cached = getattr(a, "simplified", None)  # 共享节点上记录的化简结果
+    if cached is not None:
+        return cached
+    trace = []
+    result = (_simplify(a, trace), trace)
+    if isinstance(a, Node):
+        a.simplified = result
+    return result
+
+
+def simplify(a):
+    """
+    化简表达式 a（不需要改写轨迹时使用）
+    """
+    return simplify_with_trace(a)[0]
@@ -1,11 +1,16 @@
 from decimal import Decimal, getcontext
-from .factorial import factorial
+import math
+from .series import log_abs, terms_needed
 from .pi import get_pi
 from .log_util import add_log, get_log_level
+from .precision import working_precision
+
+SHORT_ARGUMENT_DIGITS = 20  # 有效数字不超过此位数的参数直接展开，不做缩小
 
 def sin(x, epsilon):
     """
     sin(pi/2-pi/2-pi)不精确，测试用例：sin(pi/2+pi) sin(pi/2+pi/2)
+    （参数为 π/2 的精确倍数时，求值前已由 simplify.py 化简为精确值）
 
     计算 sin(x) 函数，依据输入是常数还是表达式来进行不同的处理。
 
@@ -31,6 +36,36 @@ def sin(x, epsilon):
         # add_log(f"【sin】sin({x}) 是表达式，粗略求得 x̃ ≈ {x_tilde}（ε′ = {Decimal(epsilon/2)}）")
         return sin1(x_tilde, epsilon / 2)  # 用 Sin1 计算 sin(x_tilde)
 
+def _sin_terms(x, epsilon):
+    """
+    sin(x)（|x| ≤ π）泰勒展开的首个可舍去项序号 n：|x|^(2n+1)/(2n+1)! < ε/2
+    """
+    log_x = log_abs(x)
+    log_eps = log_abs(Decimal(epsilon) / 2)
+
+    def log_bound(n):
+        return (2 * n + 1) * log_x - math.lgamma(2 * n + 2) - log_eps
+
+    return terms_needed(log_bound, 1)
+
+def _sin_series(x, epsilon):
+    """
+    sin(x) 的泰勒展开（|x| ≤ π，x ≠ 0），返回 (近似值, 项数)，截断误差小于 ε/2
+    """
+    # 由 |x^(2n+1)/(2n+1)!| < ε/2 直接估计项数 n（交错级数，余项不超过首个舍去项）
+    n = _sin_terms(x, epsilon)
+
+    # 初始化变量
+    x_squared = x * x
+    term = x  # 初始项是 x
+    result = term  # 初始化结果为第一项
+
+    # 每一项通过前一项递推：(-1)^k x^(2k+1)/(2k+1)! = 前一项 · (-x^2) / ((2k)(2k+1))
+    for k in range(1, n):
+        term = -term * x_squared / ((2 * k) * (2 * k + 1))
+        result += term  # 累加当前项
+    return result, n
+
 def sin1(x, epsilon):
     """
     计算正弦函数 sin(x)，使用泰勒展开，满足误差限 epsilon。
@@ -45,19 +80,19 @@ def sin1(x, epsilon):
     # from main import Main  # **在函数内部导入 Main，避免循环导入**
     from decimal import localcontext
 
-    # epsilon_high = epsilon.scaleb(-1000)
-    epsilon_high = Decimal('1E-1000')
     # 将输入值转换为 Decimal 类型，以便进行高精度计算
     x = Decimal(x)
     log_level = get_log_level()
 
     # **归一化 x 到 [-π, π]**
-    # pi_value = Main('pi', Decimal(epsilon))  # 计算 π
-    pi_value = get_pi(epsilon_high)
-    two_pi = 2 * pi_value  # 2π
+    # 归约减去 k·2π（|k| ≤ |x|/(2π) + 1），π 的误差被放大 2|k| 倍，
+    # 因此 π 只需满足 ε / (4·(|x| + 4))，使归约误差不超过 ε/4
+    pi_value = get_pi(Decimal(epsilon) / (4 * (abs(x) + 4)))
 
     with localcontext() as ctx:
-        # ctx.prec += 20  # 增加上下文精度，避免精度不足
+        # 归约需要容纳 x 的整数部分和 ε 对应的小数位，调用方的精度可能只按结果 (|sin| ≤ 1) 缩放
+        ctx.prec = max(ctx.prec, working_precision(x.adjusted(), epsilon))
+        two_pi = 2 * pi_value  # 2π
         x = x.remainder_near(two_pi)
         if x > pi_value:
             x -= two_pi  # 归一化到 [-π, π]
@@ -65,37 +100,105 @@ def sin1(x, epsilon):
 
     # ========= 日志（摘要） =========
     if log_level != "NONE":
-        # 【修改】打印截断后的 x，方便调试和解释
-        x_str = str(x)
-        if len(x_str) > 20:
-            x_str = x_str[:20] + "..."
+        add_log("【sin】对输入进行区间归一化至 [-π, π]", level="SUMMARY")
+        add_log("【sin】使用泰勒展开计算 sin({})", x, level="SUMMARY")
 
-        add_log(f"【sin】对输入进行区间归一化至 [-π, π]", level="SUMMARY")
-        add_log(f"【sin】使用泰勒展开计算 sin({x_str})", level="SUMMARY")
+    if x.is_zero():
+        return Decimal(0)
 
-    # 初始化变量
-    n = 1  # 当前项数
-    term = x  # 初始项是 x
-    result = term  # 初始化结果为第一项
-    # add_log(f"使用泰勒展开 sin({x})，初始项为 x = {x}")
-
-    # 使用给定的公式计算每一项，直到满足误差条件
-    while abs(x ** (2 * n + 1)/factorial(2 * n + 1)) >= epsilon / 2:
-        # n += 1
-        # term *= -x ** 2 / ((2 * n) * (2 * n + 1))  # 每一项通过前一项递推
-        # print(f"term, {term}")
-        term = Decimal((-1) ** n * x ** (2 * n + 1) / factorial(2 * n + 1))  # 计算当前项：(-1)^n * x^(2n+1) / (2n+1)!
-        result += term  # 累加当前项
-        # add_log(f"第 {n} 项: {term}，累计结果: {result}")
-        n += 1
+    result, n = _sin_series(x, epsilon)
 
 # ========= 日志：只记录项数 =========
     if log_level == "SUMMARY":
-        add_log(
-            f"【sin】展开 {n} 项，满足 |最后一项| < ε/2，结果已收敛",
-            level="SUMMARY"
-        )
+        add_log("【sin】展开 {} 项，满足 |最后一项| < ε/2，结果已收敛", n, level="SUMMARY")
 
     # 最终结果通过 main 函数调用得到
     # add_log(f"sin({x}) ≈ {result}，共展开 {n} 项")
     return Decimal(result)
+
+def _halvings(x, epsilon):
+    """
+    sincos1 中把参数缩小 2^j 倍的次数 j：取 j ≈ (2/3)·sqrt(位数)，
+    使展开项数的减少与 j 次倍角公式的开销大致平衡；
+    x 只有几位有效数字时，展开中乘以 x² 的代价很低，缩小后反而变成满精度的数，不做缩小
+    """
+    if len(x.as_tuple().digits) <= SHORT_ARGUMENT_DIGITS:
+        return 0
+    digits = max(-Decimal(epsilon).adjusted(), 1)
+    return math.isqrt(digits) * 2 // 3
+
+def sincos1(x, epsilon):
+    """
+    同时计算 sin(x) 与 cos(x)：只做一次区间归约和一次泰勒展开。
+
+    x 归约为 x = q·π/2 + r（|r| ≤ π/4），再把 r 缩小为 y = r / 2^j，
+    对 y 展开 sin(y)，cos(y) = sqrt(1 - sin²(y)) 由一次开方得到（cos(y) 接近 1，没有相消），
+    用 j 次倍角公式 sin 2y = 2·sin y·cos y，cos 2y = 1 - 2·sin² y 还原到 r，
+    最后按 q mod 4 交换、变号得到 sin(x) 与 cos(x)。
+
+    参数:
+    x -- 输入值，是一个数值
+    epsilon -- 允许的误差限
+
+    返回:
+    (s, c)，满足 |s - sin(x)| < epsilon，|c - cos(x)| < epsilon
+    """
+    from decimal import localcontext
+
+    x = Decimal(x)
+    epsilon = Decimal(epsilon)
+
+    # 减去 q·π/2（|q|/2 ≤ |x|/π + 1），π 的误差被放大 |q|/2 倍，
+    # 与 sin1 相同，π 只需满足 ε / (4·(|x| + 4))，使归约误差不超过 ε/4
+    pi_value = get_pi(epsilon / (4 * (abs(x) + 4)))
+
+    with localcontext() as ctx:
+        ctx.prec = max(ctx.prec, working_precision(x.adjusted(), epsilon))
+        half_pi = pi_value / 2
+        q = int((x / half_pi).to_integral_value())
+        r = x - q * half_pi
+
+    if get_log_level() != "NONE":
+        add_log("【sincos】将 x 归约为 {}·π/2 + r，|r| ≤ π/4", q, level="SUMMARY")
+
+    if r.is_zero():
+        s, c = Decimal(0), Decimal(1)
+    else:
+        # 每次倍角把 (sin, cos) 的误差至多放大 4 倍，j 次共 4^j 倍：
+        # 展开的截断误差取 ε/(8·4^j)，并多保留 j·log10(4) 位
+        j = _halvings(r, epsilon)
+        amplification = 4 ** j
+        with localcontext() as ctx:
+            ctx.prec += (j * 61 + 99) // 100 + 2
+            y = r / (1 << j)
+            s, n = _sin_series(y, epsilon / (4 * amplification))
+            c = (1 - s * s).sqrt()
+            for _ in range(j):
+                s, c = 2 * s * c, 1 - 2 * s * s
+        s, c = +s, +c  # 舍入回调用方的精度
+        if get_log_level() == "SUMMARY":
+            add_log("【sincos】参数缩小 2^{0} 倍后展开 {1} 项，再用 {0} 次倍角公式还原", j, n, level="SUMMARY")
+
+    # sin(r + q·π/2)、cos(r + q·π/2)
+    quadrant = q % 4
+    if quadrant == 1:
+        s, c = c, -s
+    elif quadrant == 2:
+        s, c = -s, -c
+    elif quadrant == 3:
+        s, c = -c, s
+    return s, c
+
+def sincos(x, epsilon):
+    """
+    同时计算 sin(x) 与 cos(x)，x 可以是数值或表达式；表达式只求值一次。
+
+    返回:
+    (s, c)，满足 |s - sin(x)| < epsilon，|c - cos(x)| < epsilon
+    """
+    from .main import Main  # **在函数内部导入 Main，避免循环导入**
+
+    if isinstance(x, (int, float, Decimal)):
+        return sincos1(Decimal(x), epsilon)
+    x_tilde = Decimal(Main(x, Decimal(epsilon / 2)))
+    return sincos1(x_tilde, epsilon / 2)
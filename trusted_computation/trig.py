@@ -0,0 +1,74 @@
+from decimal import Decimal, localcontext
+from .sin import sincos
+from .cons import cons
+from .log_util import add_log
+from .precision import GUARD_DIGITS, working_precision
+
+# cos、tan、cot、sec、csc：都由 sincos 一次算出的 sin 与 cos 得到。
+#
+# 参数只求值一次、只归约一次；tan 等比值先用粗的误差限确定分母远离 0（同时完成极点判断），
+# 再按分母的下界一次性分配 sin、cos 所需的误差限，最后做一次除法，
+# 不再经过 div 的逐步收紧（那会对分子、分母两棵子树反复调用 Main）。
+
+SIN, COS = 0, 1
+
+# 函数名: (分子, 分母, 极点说明)；分子为 None 表示 1
+_RATIOS = {
+    'tan': (SIN, COS, "x ≈ π/2 + nπ"),
+    'cot': (COS, SIN, "x ≈ nπ"),
+    'sec': (None, COS, "x ≈ π/2 + nπ"),
+    'csc': (None, SIN, "x ≈ nπ"),
+}
+
+
+def cos(x, epsilon):
+    """
+    计算 cos(x)，满足误差限 epsilon
+    """
+    add_log("执行余弦函数 cos(x)", level="SUMMARY")
+    return sincos(x, epsilon)[COS]
+
+
+def _separated(name, x, epsilon, denominator, pole):
+    """
+    逐步收紧误差限 η，直到分母与 0 的距离超过 2η，返回 ((sin, cos), η)；
+    η 已小于 ε 时分母仍不能与 0 区分，视为极点
+    """
+    from .main import Main
+
+    eta = Decimal("0.1")
+    step = Decimal(10) ** -GUARD_DIGITS
+    while True:
+        values = sincos(x, eta)
+        if abs(values[denominator]) > 2 * eta:
+            return values, eta
+        if eta < epsilon:
+            x_val = x if isinstance(x, Decimal) else Decimal(Main(x, eta))
+            raise ValueError(f"{name}({x_val}) 未定义：{pole}")
+        eta = max(eta * step, cons(epsilon) / 10)
+
+
+def ratio(name, x, epsilon):
+    """
+    计算 tan、cot、sec、csc 之一，满足误差限 epsilon
+
+    若 sin、cos 的误差都不超过 δ，分母的下界为 L、比值的上界为 T，则
+    |n/d - N/D| ≤ δ·(1 + T)/(L - δ)，取 δ = ε·L / (4·(1 + T)) 即可使误差不超过 ε/2
+    """
+    numerator, denominator, pole = _RATIOS[name]
+    epsilon = Decimal(epsilon)
+
+    values, eta = _separated(name, x, epsilon, denominator, pole)
+    lower = abs(values[denominator]) - eta
+    upper = 1 + eta if numerator is None else abs(values[numerator]) + eta
+    bound = upper / lower
+
+    delta = cons(min(epsilon * lower / (4 * (1 + bound)), lower / 2))
+    if delta < eta:
+        values = sincos(x, delta)
+
+    add_log("执行 {}(x)：分母下界 {:.3e}，sin、cos 的误差限 {}", name, lower, delta, level="SUMMARY")
+    n = Decimal(1) if numerator is None else values[numerator]
+    with localcontext() as ctx:
+        ctx.prec = working_precision(bound.adjusted(), epsilon)
+        return n / values[denominator]
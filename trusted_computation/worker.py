@@ -0,0 +1,83 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from .constants import get_constant, _CONSTANT_COMPUTERS
+from .context import evaluation_context, check_interrupt
+from .input import parse_expression
+from .log_util import get_log
+from .main import adaptive_main, format_sig_digits
+from .precision import GUARD_DIGITS
+
+# 工作进程：批量求值和本地计算服务共用的进程池。
+#
+# 每个工作进程启动时先预热——导入全部算子模块，并按 warm_digits 位计算（或从磁盘的数字文件读取）
+# π、e、ln2、ln10 放入本进程的常数缓存，之后不超过这个位数的请求不再为常数付出时间。
+# 单个表达式在独立的求值上下文中计算，任何异常都作为该条结果的错误返回，不会使工作进程退出。
+#
+# 请求可以带截止时间（time.monotonic() 的值，同一台机器上各进程共用单调时钟）和取消槽位：
+# 创建进程池时传入共享的标志数组 cancel_flags，父进程把某个槽位置 1 即可让正在计算该请求的工作进程中止。
+
+DEFAULT_DIGITS = 100  # 请求未给出位数时的有效数字位数
+WARM_DIGITS = 1000  # 工作进程启动时预热的常数位数
+
+_cancel_flags = None  # 与父进程共享的取消标志数组（multiprocessing.Array），由 init_worker 设置
+
+
+def warm_up(digits=WARM_DIGITS):
+    """
+    在当前进程中预热常数缓存：每个常数按 digits 位（另加保护位）计算一次
+    """
+    epsilon = Decimal(10) ** -(digits + GUARD_DIGITS)
+    for name in _CONSTANT_COMPUTERS:
+        get_constant(name, epsilon)
+
+
+def init_worker(warm_digits=WARM_DIGITS, cancel_flags=None):
+    """
+    进程池的 initializer
+    """
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+    if warm_digits:
+        warm_up(warm_digits)
+
+
+def evaluate(expr, digits=DEFAULT_DIGITS, explain=False, deadline=None, slot=None):
+    """
+    求值一个表达式，返回可以直接序列化为 JSON 的字典：
+
+    成功: {"ok": True, "result": 结果字符串, "epsilon": 误差限, "elapsed_ms": 耗时[, "log": 计算日志]}
+    失败: {"ok": False, "error": 错误说明, "error_type": 异常类名, "elapsed_ms": 耗时}
+
+    explain 为真时按 explain 模式计算并附上 SUMMARY 级别的计算日志；
+    deadline 为截止时间，slot 为取消标志数组中该请求的槽位
+    """
+    start = time.perf_counter()
+    cancelled = None
+    if slot is not None and _cancel_flags is not None:
+        cancelled = lambda: _cancel_flags[slot]
+    try:
+        digits = int(digits)
+        if digits <= 0:
+            raise ValueError("有效数字位数必须为正整数")
+        with evaluation_context(deadline=deadline, cancelled=cancelled):
+            check_interrupt()  # 在队列中等待期间已经超时或被取消的请求不再计算
+            result, ε = adaptive_main(parse_expression(expr), digits, mode="explain" if explain else "compute")
+            response = {
+                "ok": True,
+                "result": format_sig_digits(result, digits),
+                "epsilon": f"{ε:.0e}",
+            }
+            if explain:
+                response["log"] = get_log()
+    except Exception as e:
+        response = {"ok": False, "error": f"{type(e).__name__}: {e}", "error_type": type(e).__name__}
+    response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return response
+
+
+def create_pool(workers=None, warm_digits=WARM_DIGITS, cancel_flags=None):
+    """
+    创建预热的工作进程池；workers 为 None 时使用 CPU 核数
+    """
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(warm_digits, cancel_flags))